@@ -0,0 +1,113 @@
+"""Requests and load time for one gallery page, with and without sprite sheets.
+
+Builds an archive of clips with real JPEG thumbnails, serves it through the real
+app, and loads the first gallery page the way a browser would: fetch the HTML,
+then every image it references over a small pool of connections, each request
+paying a round trip and the link's throughput.
+
+    PYTHONPATH=src python benchmarks/gallery_requests.py --mbit 8 --rtt-ms 60
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from motion_cam import sprites
+from motion_cam.config import StorageConfig, WebConfig
+from motion_cam.server import WebServer
+from motion_cam.storage import StorageManager
+from motion_cam.web import create_app
+
+_MEDIA_RE = re.compile(r"""(?:src="|url\(')(/media/[^"']+)""")
+
+
+def make_archive(data_dir: Path, clips: int, size: tuple[int, int]) -> None:
+    rng = np.random.default_rng(0)
+    date_dir = data_dir / "2026-02-15"
+    date_dir.mkdir(parents=True)
+    for i in range(clips):
+        ts = f"20260215_{i // 3600:02d}{i // 60 % 60:02d}{i % 60:02d}"
+        (date_dir / f"{ts}.mp4").write_bytes(b"\x00" * 1024)
+        # Thumbnails come straight from ffmpeg at the recording resolution
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8), (31, 31), 0)
+        cv2.imwrite(str(date_dir / f"{ts}_thumb.jpg"), frame)
+
+
+def fetch(port: int, path: str, bytes_per_s: float, rtt: float) -> int:
+    time.sleep(rtt)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path)
+    body = conn.getresponse().read()
+    conn.close()
+    time.sleep(len(body) / bytes_per_s)
+    return len(body)
+
+
+def load_page(port: int, bytes_per_s: float, rtt: float, connections: int) -> tuple[int, int, float]:
+    """(image requests, bytes, seconds) to load / and everything it references."""
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", "/")
+    html = conn.getresponse().read().decode()
+    conn.close()
+    time.sleep(rtt + len(html) / bytes_per_s)
+
+    queue = list(dict.fromkeys(_MEDIA_RE.findall(html)))
+    total = [len(html)]
+    lock = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            with lock:
+                if not queue:
+                    return
+                path = queue.pop(0)
+            # Each connection gets its share of the link
+            size = fetch(port, path, bytes_per_s / connections, rtt)
+            with lock:
+                total[0] += size
+
+    requests = len(queue)
+    threads = [threading.Thread(target=worker) for _ in range(connections)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return requests, total[0], time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=60)
+    parser.add_argument("--mbit", type=float, default=8.0, help="link throughput")
+    parser.add_argument("--rtt-ms", type=float, default=60.0)
+    parser.add_argument("--connections", type=int, default=6, help="browser connections per host")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_archive(Path(tmp), args.clips, (1280, 720))
+        config = WebConfig(host="127.0.0.1", port=0)
+        app = create_app(StorageManager(StorageConfig(data_dir=tmp)), config, data_dir=tmp)
+        server = WebServer(app, config)
+        server.start()
+        print(f"{args.clips} clips, {args.mbit} Mbit/s, {args.rtt_ms:.0f} ms RTT, {args.connections} connections")
+        for label in ("thumbnails", "sprites"):
+            if label == "sprites":
+                sprites.backfill(tmp)
+            requests, size, seconds = load_page(
+                server.port, args.mbit * 1e6 / 8, args.rtt_ms / 1000, args.connections
+            )
+            print(f"{label:10s} {requests:3d} image requests  {size / 1024:7.0f} KiB  {seconds * 1000:6.0f} ms")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Local load test for the web portal.
+
+Serves the real app in-process, keeps one tuner stream open, and hammers the
+gallery and a media file from concurrent clients.
+
+    PYTHONPATH=src python benchmarks/loadtest.py --server waitress
+    PYTHONPATH=src python benchmarks/loadtest.py --server dev
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import logging
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from motion_cam.config import StorageConfig, WebConfig
+from motion_cam.server import WebServer
+from motion_cam.storage import StorageManager
+from motion_cam.web import create_app
+
+
+class FakeCamera:
+    """Stands in for CameraService: a fixed JPEG with a simulated encode cost."""
+
+    def __init__(self) -> None:
+        frame = np.random.default_rng(0).integers(0, 255, (240, 320), dtype=np.uint8)
+        self._jpeg = cv2.imencode(".jpg", frame)[1].tobytes()
+
+    def capture_jpeg_frame(self, profile=None) -> bytes:
+        time.sleep(0.005)
+        return self._jpeg
+
+
+def make_archive(data_dir: Path, clips: int, mp4_size: int) -> str:
+    date_dir = data_dir / "2026-02-15"
+    date_dir.mkdir(parents=True)
+    for i in range(clips):
+        ts = f"20260215_{i // 3600:02d}{i // 60 % 60:02d}{i % 60:02d}"
+        (date_dir / f"{ts}.mp4").write_bytes(b"\x00" * mp4_size)
+        (date_dir / f"{ts}_snap.jpg").write_bytes(b"\xff" * 20_000)
+        (date_dir / f"{ts}_thumb.jpg").write_bytes(b"\xff" * 8_000)
+    return f"/media/2026-02-15/{ts}.mp4"
+
+
+def hold_stream(port: int, stop: threading.Event, frames: list[int]) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/tuner/stream?profile=low")
+    resp = conn.getresponse()
+    while not stop.is_set():
+        chunk = resp.read1(65536)
+        if not chunk:
+            break
+        frames[0] += chunk.count(b"--frame")
+    conn.close()
+
+
+def client(port: int, path: str, duration: float, latencies: list[float]) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(server_mode: str, clients: int, duration: float, clips: int, mp4_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        media_path = make_archive(Path(tmp), clips, mp4_size)
+        storage = StorageManager(StorageConfig(data_dir=tmp))
+        config = WebConfig(host="127.0.0.1", port=0, server=server_mode)
+        app = create_app(storage, config, data_dir=tmp, camera=FakeCamera())
+        server = WebServer(app, config)
+        server.start()
+
+        stop = threading.Event()
+        frames = [0]
+        streamer = threading.Thread(target=hold_stream, args=(server.port, stop, frames))
+        streamer.start()
+        time.sleep(0.2)
+
+        for label, path in (("gallery", "/"), ("media", media_path)):
+            latencies: list[float] = []
+            threads = [
+                threading.Thread(target=client, args=(server.port, path, duration, latencies))
+                for _ in range(clients)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            latencies.sort()
+            print(
+                f"{server.mode:8s} {label:8s} {len(latencies) / duration:8.1f} req/s  "
+                f"p50 {statistics.median(latencies) * 1000:6.1f} ms  "
+                f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f} ms"
+            )
+
+        stop.set()
+        streamer.join()
+        print(f"{server.mode:8s} stream   {frames[0]} frames delivered during the run")
+        server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", default="waitress", choices=["waitress", "dev"])
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--clips", type=int, default=200)
+    parser.add_argument("--mp4-size", type=int, default=2_000_000)
+    args = parser.parse_args()
+    # Waitress warns on every queued request, which is the point of this test
+    logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+    run(args.server, args.clients, args.duration, args.clips, args.mp4_size)
+
+
+if __name__ == "__main__":
+    main()
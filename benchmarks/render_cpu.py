@@ -0,0 +1,64 @@
+"""Per-request CPU for the gallery and clip API with 1000 indexed clips.
+
+Drives the app through Flask's test client (no sockets) so the numbers are the
+server's own work: routing, index lookup, template rendering and compression.
+The index is warmed first, as it would be on a running camera.
+
+    PYTHONPATH=src python benchmarks/render_cpu.py --clips 1000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from motion_cam.config import StorageConfig, WebConfig
+from motion_cam.storage import StorageManager
+from motion_cam.web import GALLERY_TEMPLATE, create_app
+
+
+def make_archive(data_dir: Path, clips: int) -> None:
+    for i in range(clips):
+        day = data_dir / f"2026-02-{10 + i // 200:02d}"
+        day.mkdir(exist_ok=True)
+        ts = f"202602{10 + i // 200:02d}_{i % 200 // 60:02d}{i % 60:02d}00"
+        (day / f"{ts}.mp4").write_bytes(b"\x00" * 1024)
+        (day / f"{ts}_thumb.jpg").write_bytes(b"\xff" * 64)
+
+
+def measure(client, path: str, encoding: str | None, requests: int) -> tuple[float, int]:
+    """(CPU ms per request, response bytes)."""
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    size = len(client.get(path, headers=headers).data)
+    started = time.process_time()
+    for _ in range(requests):
+        client.get(path, headers=headers).data
+    return (time.process_time() - started) / requests * 1000, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_archive(Path(tmp), args.clips)
+        app = create_app(StorageManager(StorageConfig(data_dir=tmp)), WebConfig(), data_dir=tmp)
+        client = app.test_client()
+
+        started = time.process_time()
+        for _ in range(args.requests):
+            app.jinja_env.from_string(GALLERY_TEMPLATE)
+        compile_ms = (time.process_time() - started) / args.requests * 1000
+        print(f"gallery template compile: {compile_ms:.2f} ms CPU")
+
+        for path in ("/", "/api/clips", "/api/clips?limit=500"):
+            for encoding in (None, "gzip"):
+                cpu_ms, size = measure(client, path, encoding, args.requests)
+                print(f"{path:22s} {encoding or 'identity':8s} {cpu_ms:6.2f} ms CPU  {size:7d} bytes")
+
+
+if __name__ == "__main__":
+    main()
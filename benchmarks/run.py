@@ -0,0 +1,244 @@
+"""Benchmark suite for the detector, storage and web hot paths.
+
+Runs on any Linux box (no camera needed) and writes timings as JSON, so a
+change can be compared against a stored baseline:
+
+    PYTHONPATH=src python benchmarks/run.py --output baseline.json
+    PYTHONPATH=src python benchmarks/run.py --baseline baseline.json --threshold 0.15
+
+Each benchmark reports the median and p95 wall time of one call in
+milliseconds. A benchmark regresses when its median exceeds the baseline's by
+more than the threshold and by at least ``--min-delta-ms``; any regression
+makes the exit status 1. Storage archives of 1k and 10k clips are built by
+default; ``--full`` adds 100k.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from motion_cam.config import DetectionConfig, StorageConfig, WebConfig
+from motion_cam.detector import MotionDetector
+from motion_cam.storage import StorageManager
+from motion_cam.web import create_app
+
+SUITES = ("detector", "storage", "web")
+DEFAULT_THRESHOLD = 0.15
+# Sub-0.1 ms differences are timer and scheduler noise, not regressions
+DEFAULT_MIN_DELTA_MS = 0.1
+
+RESOLUTIONS = ((320, 240), (640, 480))
+BLUR_KERNELS = (5, 21)
+# Fraction of the frame covered by moving objects
+MOTION_DENSITIES = (0.0, 0.01, 0.1)
+ARCHIVE_SIZES = (1_000, 10_000)
+FULL_ARCHIVE_SIZES = ARCHIVE_SIZES + (100_000,)
+CLIPS_PER_DAY = 500
+WEB_ARCHIVE_SIZE = 1_000
+WEB_PATHS = ("/", "/status", "/api/clips", "/api/clips?limit=500", "/api/clips/summary", "/api/status")
+
+WARMUP_FRAMES = 30
+
+
+def timed(fn: Callable[[], object], runs: int, warmup: int = 1) -> dict[str, float]:
+    """Median and p95 of ``runs`` calls to ``fn``, in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "runs": runs,
+    }
+
+
+# --- detector ---------------------------------------------------------------
+
+
+def synthetic_frames(size: tuple[int, int], density: float, count: int) -> list[np.ndarray]:
+    """Grey frames with sensor noise and square blobs covering ``density`` of the frame."""
+    w, h = size
+    rng = np.random.default_rng(0)
+    background = rng.integers(90, 110, (h, w), dtype=np.uint8)
+    blobs = 8
+    side = int((density * w * h / blobs) ** 0.5)
+    frames = []
+    for i in range(count):
+        frame = background + rng.integers(0, 4, (h, w), dtype=np.uint8)
+        if side:
+            for b in range(blobs):
+                # Each blob walks diagonally so it never settles into the background
+                x = (b * w // blobs + i * 7) % max(1, w - side)
+                y = (b * h // blobs + i * 5) % max(1, h - side)
+                frame[y:y + side, x:x + side] = 230
+        frames.append(frame)
+    return frames
+
+
+def bench_detector(runs: int) -> dict[str, dict]:
+    results = {}
+    for size in RESOLUTIONS:
+        for density in MOTION_DENSITIES:
+            frames = synthetic_frames(size, density, WARMUP_FRAMES + runs)
+            for kernel in BLUR_KERNELS:
+                detector = MotionDetector(DetectionConfig(blur_kernel_size=kernel))
+                for frame in frames[:WARMUP_FRAMES]:
+                    detector.process_frame(frame)
+                stream = iter(frames[WARMUP_FRAMES:])
+                name = f"detector.process_frame[{size[0]}x{size[1]},blur={kernel},motion={density:g}]"
+                results[name] = timed(lambda: detector.process_frame(next(stream)), runs, warmup=0)
+    return results
+
+
+# --- storage ----------------------------------------------------------------
+
+
+def make_archive(data_dir: Path, clips: int, mp4_size: int = 1024) -> None:
+    """``clips`` clips with snapshot and thumbnail, CLIPS_PER_DAY to a day, ending today."""
+    payload = b"\x00" * mp4_size
+    days = -(-clips // CLIPS_PER_DAY)
+    first_day = datetime.now() - timedelta(days=days - 1)
+    for i in range(clips):
+        day = first_day + timedelta(days=i // CLIPS_PER_DAY)
+        n = i % CLIPS_PER_DAY
+        ts = f"{day:%Y%m%d}_{n // 3600:02d}{n // 60 % 60:02d}{n % 60:02d}"
+        day_dir = data_dir / f"{day:%Y-%m-%d}"
+        if n == 0:
+            day_dir.mkdir(parents=True, exist_ok=True)
+        (day_dir / f"{ts}.mp4").write_bytes(payload)
+        (day_dir / f"{ts}_snap.jpg").write_bytes(b"\xff" * 64)
+        (day_dir / f"{ts}_thumb.jpg").write_bytes(b"\xff" * 32)
+    # Age the day directories past the index's racy window, as on a running
+    # camera; otherwise every query would rescan them
+    settled = time.time() - 60
+    for day_dir in data_dir.iterdir():
+        os.utime(day_dir, (settled, settled))
+
+
+def bench_storage(sizes: tuple[int, ...], runs: int) -> dict[str, dict]:
+    results = {}
+    for clips in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            make_archive(Path(tmp), clips)
+            # Limits that nothing exceeds: this is the steady-state check run
+            # after every clip, which must stay cheap however large the archive
+            config = StorageConfig(data_dir=tmp, max_age_days=3650, max_disk_usage_mb=1 << 20)
+            storage = StorageManager(config)
+            # A fresh manager pays for the first scan; time that separately
+            results[f"storage.get_clips.cold[{clips}]"] = timed(
+                lambda: StorageManager(config).get_clips(), max(1, runs // 10), warmup=0
+            )
+            results[f"storage.get_clips[{clips}]"] = timed(storage.get_clips, runs)
+            results[f"storage.get_disk_usage[{clips}]"] = timed(storage.get_disk_usage, max(1, runs // 10))
+            results[f"storage.enforce_retention[{clips}]"] = timed(storage.enforce_retention, max(1, runs // 10))
+    return results
+
+
+# --- web --------------------------------------------------------------------
+
+
+def bench_web(runs: int) -> dict[str, dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        make_archive(Path(tmp), WEB_ARCHIVE_SIZE)
+        storage = StorageManager(StorageConfig(data_dir=tmp))
+        client = create_app(storage, WebConfig(), data_dir=tmp).test_client()
+        for path in WEB_PATHS:
+            for encoding in ("identity", "gzip"):
+                headers = {"Accept-Encoding": encoding}
+                results[f"web.GET {path} [{encoding}]"] = timed(
+                    lambda: client.get(path, headers=headers).data, runs
+                )
+    return results
+
+
+# --- reporting --------------------------------------------------------------
+
+
+def environment() -> dict[str, object]:
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict]) -> list[tuple[str, float, float, float]]:
+    """(name, baseline ms, current ms, ratio) for every benchmark present in both."""
+    rows = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None or not before["median_ms"]:
+            continue
+        rows.append((name, before["median_ms"], current["median_ms"], current["median_ms"] / before["median_ms"]))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=SUITES, help="run only this suite (repeatable)")
+    parser.add_argument("--runs", type=int, default=50, help="timed calls per benchmark")
+    parser.add_argument("--full", action="store_true", help="include the 100k-clip storage archive")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="allowed median slowdown before a benchmark counts as a regression (0.15 = 15%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+        help="ignore slowdowns smaller than this many milliseconds",
+    )
+    args = parser.parse_args()
+    suites = args.suite or SUITES
+
+    results: dict[str, dict] = {}
+    if "detector" in suites:
+        results.update(bench_detector(args.runs))
+    if "storage" in suites:
+        results.update(bench_storage(FULL_ARCHIVE_SIZES if args.full else ARCHIVE_SIZES, args.runs))
+    if "web" in suites:
+        results.update(bench_web(args.runs))
+
+    for name, r in results.items():
+        print(f"{name:64s} {r['median_ms']:9.3f} ms  p95 {r['p95_ms']:9.3f} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps({"environment": environment(), "results": results}, indent=2) + "\n")
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = 0
+    print(f"\nAgainst {args.baseline} (threshold {args.threshold:.0%}):")
+    for name, before, after, ratio in compare(results, baseline):
+        regressed = ratio > 1 + args.threshold and after - before >= args.min_delta_ms
+        regressions += regressed
+        flag = "REGRESSION" if regressed else ("faster" if ratio < 1 - args.threshold else "")
+        print(f"{name:64s} {before:9.3f} -> {after:9.3f} ms  {ratio:5.2f}x  {flag}")
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Boot-path timings: import cost of the entry point and time to first detection.
+
+Runs ``motion_cam.main`` against the simulated camera in a subprocess and
+times, from process spawn, the log lines for the first analyzed frame and
+for the web portal coming up. Also reports ``-X importtime`` for the entry
+module and its slowest imports:
+
+    PYTHONPATH=src python benchmarks/startup.py --runs 5
+
+tests/test_startup.py keeps the import budget and the startup order.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ENTRY = "motion_cam.main"
+FIRST_FRAME_LOG = "First frame analyzed"
+PORTAL_LOG = "Web portal started on"
+
+
+def import_times(module: str = ENTRY) -> dict[str, tuple[int, int]]:
+    """{module: (self us, cumulative us)} from ``python -X importtime -c 'import module'``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+        check=True,
+    )
+    times: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def boot(data_dir: str, timeout: float = 60.0) -> tuple[float, float]:
+    """Seconds from spawn to the first analyzed frame and to the portal listening."""
+    env = {
+        **os.environ,
+        "CAMERA_BACKEND": "sim",
+        "STORAGE_DATA_DIR": data_dir,
+        "WEB_PORT": "0",
+        "WEB_HOST": "127.0.0.1",
+    }
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", ENTRY],
+        env=env,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        text=True,
+    )
+    first_frame = portal = None
+    try:
+        for line in proc.stderr:
+            now = time.monotonic() - started
+            if first_frame is None and FIRST_FRAME_LOG in line:
+                first_frame = now
+            elif portal is None and PORTAL_LOG in line:
+                portal = now
+            if (first_frame is not None and portal is not None) or now > timeout:
+                break
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    if first_frame is None or portal is None:
+        raise RuntimeError(f"{ENTRY} did not log both startup milestones within {timeout:.0f}s")
+    return first_frame, portal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    cumulative = min(r[ENTRY][1] for r in runs) / 1000
+    print(f"import {ENTRY}: {cumulative:.1f} ms (best of {args.runs})")
+    slowest = sorted(runs[0].items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+    for name, (own, _) in slowest:
+        print(f"  {own / 1000:7.1f} ms  {name}")
+
+    frames, portals = [], []
+    with tempfile.TemporaryDirectory() as data_dir:
+        for _ in range(args.runs):
+            first_frame, portal = boot(data_dir)
+            frames.append(first_frame)
+            portals.append(portal)
+    print(f"spawn -> first analyzed frame: {statistics.median(frames):.2f} s (median of {args.runs})")
+    print(f"spawn -> web portal listening: {statistics.median(portals):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
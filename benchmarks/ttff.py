@@ -0,0 +1,150 @@
+"""Time-to-first-frame for a clip before and after the faststart rewrite.
+
+Writes a synthetic 60-second clip, serves it through the real /media route and
+plays the part of a browser's media loader over a throttled link: read from
+the start, and if the index is not there, seek to the tail for it, then fetch
+the first sample.
+
+    PYTHONPATH=src python benchmarks/ttff.py --mbit 4 --rtt-ms 40
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import shutil
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from motion_cam.config import StorageConfig, WebConfig
+from motion_cam.faststart import _iter_boxes, faststart
+from motion_cam.server import WebServer
+from motion_cam.storage import StorageManager
+from motion_cam.web import create_app
+
+
+def write_clip(path: Path, seconds: int, fps: int, size: tuple[int, int]) -> None:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8), (31, 31), 0)
+    for i in range(seconds * fps):
+        frame = base.copy()
+        x = (i * 7) % size[0]
+        cv2.circle(frame, (x, size[1] // 2), 40, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def first_sample(moov: bytes) -> tuple[int, int]:
+    """(offset, size) of the first video sample, from stco/co64 and stsz."""
+    found: dict[bytes, int] = {}
+
+    def walk(start: int, end: int) -> None:
+        for box_type, offset, header, size in _iter_boxes(moov, start, end):
+            body = offset + header
+            if box_type in (b"moov", b"trak", b"mdia", b"minf", b"stbl"):
+                walk(body, offset + size)
+            elif box_type == b"stco" and b"offset" not in found:
+                found[b"offset"] = struct.unpack(">I", moov[body + 8:body + 12])[0]
+            elif box_type == b"co64" and b"offset" not in found:
+                found[b"offset"] = struct.unpack(">Q", moov[body + 8:body + 16])[0]
+            elif box_type == b"stsz" and b"size" not in found:
+                fixed = struct.unpack(">I", moov[body + 4:body + 8])[0]
+                found[b"size"] = fixed or struct.unpack(">I", moov[body + 12:body + 16])[0]
+
+    walk(0, len(moov))
+    return found[b"offset"], found[b"size"]
+
+
+class ThrottledClient:
+    def __init__(self, port: int, bytes_per_s: float, rtt: float) -> None:
+        self._port = port
+        self._rate = bytes_per_s
+        self._rtt = rtt
+        self.requests = 0
+        self.transferred = 0
+
+    def fetch(self, path: str, start: int, length: int | None = None) -> bytes:
+        """Range-fetch ``length`` bytes (or to EOF) at link speed."""
+        self.requests += 1
+        time.sleep(self._rtt)
+        conn = http.client.HTTPConnection("127.0.0.1", self._port)
+        end = "" if length is None else str(start + length - 1)
+        conn.request("GET", path, headers={"Range": f"bytes={start}-{end}"})
+        resp = conn.getresponse()
+        data = b""
+        while length is None or len(data) < length:
+            chunk = resp.read1(16384)
+            if not chunk:
+                break
+            time.sleep(len(chunk) / self._rate)
+            data += chunk
+            if length is None and len(data) >= 65536:
+                # A real loader reads ahead in pieces; stop once we have a probe's worth
+                break
+        conn.close()
+        self.transferred += len(data)
+        return data
+
+    def time_to_first_frame(self, path: str, file_size: int) -> float:
+        started = time.perf_counter()
+        head = self.fetch(path, 0)
+        moov = None
+        for box_type, offset, _, size in _iter_boxes(head, 0, len(head)):
+            if box_type == b"moov":
+                moov = head[offset:offset + size]
+                if len(moov) < size:
+                    moov += self.fetch(path, offset + len(moov), size - len(moov))
+                break
+            if box_type == b"mdat":
+                # Index is behind the sample data: seek to the end of the file for it
+                tail = self.fetch(path, offset + size, file_size - offset - size)
+                moov = next(
+                    tail[o:o + s] for t, o, _, s in _iter_boxes(tail, 0, len(tail)) if t == b"moov"
+                )
+                break
+        sample_offset, sample_size = first_sample(moov)
+        if sample_offset + sample_size > len(head):
+            self.fetch(path, sample_offset, sample_size)
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--fps", type=int, default=15)
+    parser.add_argument("--mbit", type=float, default=4.0, help="link throughput")
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        day = Path(tmp) / "2026-02-15"
+        day.mkdir()
+        before = day / "20260215_100000.mp4"
+        after = day / "20260215_100001.mp4"
+        write_clip(before, args.seconds, args.fps, (1280, 720))
+        faststart(str(before), str(after))
+        shutil.copystat(before, after)
+
+        config = WebConfig(host="127.0.0.1", port=0)
+        app = create_app(StorageManager(StorageConfig(data_dir=tmp)), config, data_dir=tmp)
+        server = WebServer(app, config)
+        server.start()
+        size = before.stat().st_size
+        print(f"{args.seconds}s clip, {size / 1e6:.1f} MB, {args.mbit} Mbit/s, {args.rtt_ms:.0f} ms RTT")
+        for label, clip in (("moov last", before), ("faststart", after)):
+            client = ThrottledClient(server.port, args.mbit * 1e6 / 8, args.rtt_ms / 1000)
+            ttff = client.time_to_first_frame(f"/media/2026-02-15/{clip.name}", size)
+            print(
+                f"{label:10s} time to first frame {ttff * 1000:7.0f} ms  "
+                f"({client.requests} requests, {client.transferred / 1024:.0f} KiB)"
+            )
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
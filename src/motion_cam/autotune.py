@@ -0,0 +1,335 @@
+"""Offline search for detection settings over labeled footage.
+
+Clips and the spans in them that contain real motion are listed in a JSON
+file::
+
+    {"clips": [{"path": "20250101_120000.mp4", "motion": [[3.0, 7.5], [41.2, 44.0]]}]}
+
+Relative paths are resolved against the labels file. Each clip is decoded
+once, converted to grayscale at the lores resolution, and cached as an
+``.npy`` file. Every worker memory-maps that file, so all of them share
+one copy in the page cache and none of them decodes video.
+
+Each candidate ``DetectionConfig`` is run through a fresh ``MotionDetector``
+per clip, in a process pool that uses every core. Frames are scored against
+the labels, skipping the warm-up and a tolerance around each labeled edge,
+where neither a human nor MOG2 is exact. Candidates are ranked by F-score,
+then by CPU time per frame. The result is written out as a ``.env`` snippet.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+import cv2
+import numpy as np
+
+from motion_cam.config import DetectionConfig
+from motion_cam.detector import MotionDetector
+
+logger = logging.getLogger(__name__)
+
+# Seconds at the start of a clip while MOG2 learns the scene; not scored
+WARMUP = 2.0
+# Seconds either side of a labeled start or end that are not scored
+TOLERANCE = 0.5
+
+DEFAULT_SPACE: dict[str, tuple] = {
+    "min_contour_area": (250, 500, 1000, 2000),
+    "blur_kernel_size": (11, 21, 31),
+    "learning_rate": (-1.0, 0.001, 0.005, 0.02),
+}
+
+ENV_KEYS = {
+    "min_contour_area": "DETECTION_MIN_CONTOUR_AREA",
+    "blur_kernel_size": "DETECTION_BLUR_KERNEL_SIZE",
+    "learning_rate": "DETECTION_LEARNING_RATE",
+    "cooldown": "DETECTION_COOLDOWN",
+    "max_clip_duration": "DETECTION_MAX_CLIP_DURATION",
+}
+
+
+@dataclass(frozen=True)
+class LabeledClip:
+    path: str
+    motion: tuple[tuple[float, float], ...]  # (start, end) seconds
+
+
+@dataclass(frozen=True)
+class CachedClip:
+    """A decoded clip: ``frames_path`` holds a (frames, height, width) uint8 array."""
+
+    frames_path: str
+    fps: float
+    motion: tuple[tuple[float, float], ...]
+
+
+@dataclass(frozen=True)
+class Score:
+    config: DetectionConfig
+    true_positives: int
+    false_positives: int
+    false_negatives: int
+    frames: int  # frames run through the detector, scored or not
+    cpu_seconds: float
+
+    @property
+    def precision(self) -> float:
+        detected = self.true_positives + self.false_positives
+        return self.true_positives / detected if detected else 0.0
+
+    @property
+    def recall(self) -> float:
+        actual = self.true_positives + self.false_negatives
+        return self.true_positives / actual if actual else 0.0
+
+    def f_score(self, beta: float = 1.0) -> float:
+        p, r = self.precision, self.recall
+        if not p and not r:
+            return 0.0
+        return (1 + beta**2) * p * r / (beta**2 * p + r)
+
+    @property
+    def cpu_ms_per_frame(self) -> float:
+        return self.cpu_seconds / self.frames * 1000 if self.frames else 0.0
+
+
+def load_labels(path: str) -> list[LabeledClip]:
+    """Read a labels file; raises ValueError if it is malformed."""
+    base = Path(path).parent
+    with open(path) as f:
+        data = json.load(f)
+    clips = []
+    try:
+        for entry in data["clips"]:
+            motion = tuple(sorted((float(start), float(end)) for start, end in entry.get("motion", ())))
+            if any(end < start for start, end in motion):
+                raise ValueError(f"Motion span ends before it starts in {entry['path']!r}")
+            clips.append(LabeledClip(path=str(base / entry["path"]), motion=motion))
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed labels file {path!r}: {e}") from e
+    if not clips:
+        raise ValueError(f"No clips in labels file {path!r}")
+    return clips
+
+
+def _cache_key(path: str, size: tuple[int, int]) -> str:
+    stat = os.stat(path)
+    source = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{size[0]}x{size[1]}"
+    return hashlib.sha1(source.encode()).hexdigest()[:16]
+
+
+def cache_clip(clip: LabeledClip, cache_dir: str, size: tuple[int, int]) -> CachedClip:
+    """Decode ``clip`` to grayscale frames at ``size`` (w, h), unless already cached.
+
+    Frames are streamed to a raw file while decoding, so a long clip never has
+    to fit in memory, then copied behind an ``.npy`` header.
+    """
+    w, h = size
+    stem = f"{Path(clip.path).stem}-{_cache_key(clip.path, size)}"
+    frames_path = Path(cache_dir) / f"{stem}.npy"
+    meta_path = Path(cache_dir) / f"{stem}.json"
+    if frames_path.exists() and meta_path.exists():
+        fps = json.loads(meta_path.read_text())["fps"]
+        return CachedClip(str(frames_path), fps, clip.motion)
+
+    capture = cv2.VideoCapture(clip.path)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video {clip.path!r}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 15.0
+    frames_path.parent.mkdir(parents=True, exist_ok=True)
+    raw_path = frames_path.with_suffix(".raw")
+    count = 0
+    try:
+        with open(raw_path, "wb") as raw:
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                if frame.ndim == 3:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                if (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                raw.write(np.ascontiguousarray(frame).tobytes())
+                count += 1
+        capture.release()
+        if not count:
+            raise ValueError(f"Video {clip.path!r} has no frames")
+        decoded = np.memmap(raw_path, dtype=np.uint8, mode="r", shape=(count, h, w))
+        tmp = frames_path.with_name(frames_path.name + ".tmp")
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint8, shape=(count, h, w))
+        out[:] = decoded
+        out.flush()
+        del out, decoded
+        os.replace(tmp, frames_path)
+    finally:
+        raw_path.unlink(missing_ok=True)
+    meta_path.write_text(json.dumps({"fps": fps, "frames": count, "source": clip.path}))
+    logger.info("Cached %d frames of %s", count, clip.path)
+    return CachedClip(str(frames_path), fps, clip.motion)
+
+
+def _labels(clip: CachedClip, count: int, warmup: float, tolerance: float) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame ground truth, and which frames are scored."""
+    t = np.arange(count) / clip.fps
+    truth = np.zeros(count, dtype=bool)
+    scored = t >= warmup
+    for start, end in clip.motion:
+        truth |= (t >= start) & (t <= end)
+        for edge in (start, end):
+            scored &= np.abs(t - edge) > tolerance
+    return truth, scored
+
+
+def evaluate(
+    config: DetectionConfig,
+    clips: Sequence[CachedClip],
+    framerate: float | None = None,
+    warmup: float = WARMUP,
+    tolerance: float = TOLERANCE,
+) -> Score:
+    """Run ``config`` over every clip and count per-frame hits and misses.
+
+    ``framerate`` is the camera's frame rate. If a clip was recorded at a
+    different rate, the learning rate is scaled to match, as it is live.
+    """
+    tp = fp = fn = frames = 0
+    cpu = 0.0
+    for clip in clips:
+        pixels = np.load(clip.frames_path, mmap_mode="r")
+        interval = 1.0 / framerate if framerate else None
+        detector = MotionDetector(config, frame_interval=interval)
+        dt = 1.0 / clip.fps
+        detected = np.zeros(len(pixels), dtype=bool)
+        started = time.process_time()
+        for i, frame in enumerate(pixels):
+            detected[i] = detector.process_frame(frame, dt=dt).detected
+        cpu += time.process_time() - started
+        truth, scored = _labels(clip, len(pixels), warmup, tolerance)
+        tp += int(np.count_nonzero(detected & truth & scored))
+        fp += int(np.count_nonzero(detected & ~truth & scored))
+        fn += int(np.count_nonzero(~detected & truth & scored))
+        frames += len(pixels)
+    return Score(config, tp, fp, fn, frames, cpu)
+
+
+def grid(space: Mapping[str, Iterable], base: DetectionConfig | None = None) -> list[DetectionConfig]:
+    """Every combination of the values in ``space``, skipping invalid ones."""
+    base = base or DetectionConfig()
+    names = list(space)
+    configs = []
+    for values in itertools.product(*(space[name] for name in names)):
+        try:
+            configs.append(replace(base, **dict(zip(names, values))))
+        except ValueError:
+            continue
+    return configs
+
+
+def _cores() -> int:
+    # Cores this process may run on, which is fewer than cpu_count() under taskset or a container
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _init_worker() -> None:
+    # One process per core already; OpenCV's own threads would only contend
+    cv2.setNumThreads(1)
+
+
+def search(
+    configs: Sequence[DetectionConfig],
+    clips: Sequence[CachedClip],
+    framerate: float | None = None,
+    workers: int | None = None,
+    warmup: float = WARMUP,
+    tolerance: float = TOLERANCE,
+) -> list[Score]:
+    """Evaluate ``configs`` across a process pool (one worker per core by default)."""
+    workers = workers or _cores()
+    jobs = [(config, clips, framerate, warmup, tolerance) for config in configs]
+    if workers == 1:
+        return [evaluate(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(evaluate, *zip(*jobs)))
+
+
+def rank(scores: Iterable[Score], beta: float = 1.0) -> list[Score]:
+    """Best F-score first; ties go to the cheaper config."""
+    return sorted(scores, key=lambda s: (-s.f_score(beta), s.cpu_ms_per_frame))
+
+
+def format_env(ranked: Sequence[Score], top: int = 5, beta: float = 1.0) -> str:
+    """The best config as ``.env`` lines, then the runners-up commented out."""
+    names = [name for name in ENV_KEYS if name in DEFAULT_SPACE]
+    lines = []
+    for place, score in enumerate(ranked[:top], start=1):
+        lines.append(
+            f"# {place}. F{beta:g} {score.f_score(beta):.3f}  precision {score.precision:.3f}"
+            f"  recall {score.recall:.3f}  CPU {score.cpu_ms_per_frame:.2f} ms/frame"
+        )
+        prefix = "" if place == 1 else "# "
+        for name in names:
+            value = getattr(score.config, name)
+            lines.append(f"{prefix}{ENV_KEYS[name]}={value if isinstance(value, int) else f'{value:g}'}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _list_of(kind: type):
+    def parse(text: str) -> tuple:
+        return tuple(kind(v) for v in text.split(","))
+
+    parse.__name__ = kind.__name__  # argparse names it in errors: "invalid int value"
+    return parse
+
+
+def main() -> None:
+    from motion_cam.config import load_config
+
+    parser = argparse.ArgumentParser(description="Grid-search detection settings over labeled clips.")
+    parser.add_argument("labels", help="JSON file listing clips and their motion spans")
+    parser.add_argument("--cache-dir", help="decoded frames (default: .frames next to the labels file)")
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--top", type=int, default=5, help="configs to list")
+    parser.add_argument("--beta", type=float, default=1.0, help="F-score beta; above 1 favours recall")
+    parser.add_argument("--warmup", type=float, default=WARMUP, help="unscored seconds at clip start")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="unscored seconds around labels")
+    for name, values in DEFAULT_SPACE.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=_list_of(type(values[0])),
+            default=values,
+            help=f"comma-separated values (default: {','.join(f'{v:g}' for v in values)})",
+        )
+    parser.add_argument("--output", help="write the .env snippet here instead of stdout")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    camera = load_config().camera
+    cache_dir = args.cache_dir or str(Path(args.labels).parent / ".frames")
+    clips = [cache_clip(clip, cache_dir, camera.lores_resolution) for clip in load_labels(args.labels)]
+    configs = grid({name: getattr(args, name) for name in DEFAULT_SPACE})
+    logger.info("Evaluating %d configs over %d clip(s)", len(configs), len(clips))
+    started = time.monotonic()
+    scores = search(configs, clips, camera.framerate, args.workers, args.warmup, args.tolerance)
+    logger.info("Done in %.1f s", time.monotonic() - started)
+    snippet = format_env(rank(scores, args.beta), args.top, args.beta)
+    if args.output:
+        Path(args.output).write_text(snippet)
+    else:
+        print(snippet)
+
+
+if __name__ == "__main__":
+    main()
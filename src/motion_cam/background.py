@@ -0,0 +1,53 @@
+"""Saved background model, so a restart doesn't begin with an empty MOG2.
+
+OpenCV can't serialize MOG2's per-pixel mixtures, so what is kept is its
+background image: the learned scene in the detector's blurred space, one byte
+per lores pixel (75 KB at 320x240). It is written on an interval and at
+shutdown. The detector replays it into a fresh model on the first frame,
+unless that frame shows the scene has changed since.
+"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKGROUND_NAME = ".background.npy"
+SAVE_INTERVAL = 60.0
+# A save older than this describes a scene too far removed (lighting, furniture) to trust
+MAX_AGE = 24 * 3600
+
+
+def background_path(data_dir: str) -> Path:
+    return Path(data_dir) / BACKGROUND_NAME
+
+
+def save_background(data_dir: str, image: np.ndarray) -> None:
+    """Atomically replace the saved background with ``image``."""
+    path = background_path(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, image, allow_pickle=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_background(
+    data_dir: str, shape: tuple[int, int], max_age: float = MAX_AGE, now: float | None = None
+) -> np.ndarray | None:
+    """The saved background if it exists, is recent and matches ``shape`` (rows, cols)."""
+    path = background_path(data_dir)
+    now = time.time() if now is None else now
+    try:
+        if now - path.stat().st_mtime > max_age:
+            return None
+        image = np.load(path, allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    if image.shape != shape or image.dtype != np.uint8:
+        return None
+    return image
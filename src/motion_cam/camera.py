@@ -1,26 +1,99 @@
 from __future__ import annotations
 
-from typing import Protocol
+import time
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Protocol
 
-import numpy as np
+from motion_cam.config import PREVIEW_PROFILES, CameraConfig, PreviewProfile
 
-from motion_cam.config import CameraConfig
+if TYPE_CHECKING:
+    # Annotations only; the detection loop imports numpy once the camera is running
+    import numpy as np
+
+
+@dataclass(frozen=True)
+class Frame:
+    """A lores frame with the metadata needed to spot skipped frames."""
+
+    pixels: np.ndarray  # Y plane
+    sequence: int  # camera frame counter; a jump of more than 1 means frames were missed
+    timestamp: float  # start of exposure, in seconds on the time.monotonic() clock
+
+
+class MappedFrame:
+    """A lores frame whose pixels are a view into the camera's own buffer.
+
+    Valid only inside the ``map_lores()`` block that produced it: on exit the
+    buffer goes back to the camera, and reading ``pixels`` raises instead of
+    returning memory that is being overwritten. Metadata stays readable.
+    """
+
+    __slots__ = ("_pixels", "sequence", "timestamp")
+
+    def __init__(self, pixels: np.ndarray, sequence: int, timestamp: float) -> None:
+        pixels.flags.writeable = False
+        self._pixels: np.ndarray | None = pixels
+        self.sequence = sequence
+        self.timestamp = timestamp
+
+    @property
+    def pixels(self) -> np.ndarray:
+        if self._pixels is None:
+            raise RuntimeError("Frame buffer was released; copy the pixels inside map_lores() to keep them")
+        return self._pixels
+
+    @property
+    def released(self) -> bool:
+        return self._pixels is None
+
+    def release(self) -> None:
+        self._pixels = None
+
+    def copy(self) -> Frame:
+        """A ``Frame`` that owns its pixels and outlives the buffer."""
+        return Frame(pixels=self.pixels.copy(), sequence=self.sequence, timestamp=self.timestamp)
 
 
 class CameraProtocol(Protocol):
     def start(self) -> None: ...
     def stop(self) -> None: ...
+    def map_lores(self) -> AbstractContextManager[MappedFrame]: ...
     def capture_lores_frame(self) -> np.ndarray: ...
     def capture_snapshot(self, path: str) -> None: ...
     def start_recording(self, path: str) -> None: ...
     def stop_recording(self) -> None: ...
 
 
+def encode_preview(arr: np.ndarray, profile: PreviewProfile) -> bytes:
+    """JPEG-encode a BGR or grayscale frame at the profile's size and quality."""
+    import cv2
+
+    if profile.size is not None and (arr.shape[1], arr.shape[0]) != profile.size:
+        arr = cv2.resize(arr, profile.size, interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", arr, [cv2.IMWRITE_JPEG_QUALITY, profile.quality])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return buf.tobytes()
+
+
+def create_camera(config: CameraConfig) -> CameraProtocol:
+    """The camera backend named by ``config.backend``."""
+    if config.backend == "picamera2":
+        return CameraService(config)
+    if config.backend == "sim":
+        from motion_cam.simulator import SimulatedCamera
+
+        return SimulatedCamera(config)
+    raise ValueError(f"Unknown camera backend {config.backend!r} (expected 'picamera2' or 'sim')")
+
+
 class CameraService:
     def __init__(self, config: CameraConfig) -> None:
         self._config = config
         self._picam2 = None
         self._encoder = None
+        self._last_meta: tuple[int, float] | None = None  # (sequence, timestamp)
 
     def start(self) -> None:
         from picamera2 import Picamera2
@@ -49,16 +122,54 @@ class CameraService:
         buf = self._picam2.capture_array("lores")
         return buf[:h, :w]
 
-    def capture_jpeg_frame(self) -> bytes:
-        import io
+    def _frame_meta(self, request) -> tuple[int, float]:
+        """(sequence, exposure timestamp) of a completed request."""
+        metadata = request.get_metadata()
+        sequence = getattr(getattr(request, "request", None), "sequence", None)
+        # SensorTimestamp is in nanoseconds on the same clock as time.monotonic_ns()
+        sensor_ns = metadata.get("SensorTimestamp")
+        timestamp = sensor_ns / 1e9 if sensor_ns else time.monotonic()
+        if not isinstance(sequence, int):
+            # No libcamera sequence number: count frame periods between timestamps
+            last = self._last_meta
+            periods = 1 if last is None else round((timestamp - last[1]) * self._config.framerate)
+            sequence = (0 if last is None else last[0]) + max(1, periods)
+        self._last_meta = (sequence, timestamp)
+        return self._last_meta
+
+    @contextmanager
+    def map_lores(self) -> Iterator[MappedFrame]:
+        """The next lores frame's Y plane as a view into the request buffer.
+
+        Nothing is copied: the view spans the first ``h`` rows of the mapped
+        YUV420 buffer with its row stride, so chroma is never touched. The
+        request is held, and the camera one buffer short, until the block
+        exits, so keep the block to the detector's work on the frame.
+        """
+        from picamera2 import MappedArray
 
-        from PIL import Image
-
-        arr = self._picam2.capture_array("main")
-        img = Image.fromarray(arr)
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=80)
-        return buf.getvalue()
+        w, h = self._config.lores_resolution
+        request = self._picam2.capture_request()
+        try:
+            sequence, timestamp = self._frame_meta(request)
+            with MappedArray(request, "lores") as mapped:
+                frame = MappedFrame(mapped.array[:h, :w], sequence, timestamp)
+                try:
+                    yield frame
+                finally:
+                    frame.release()
+        finally:
+            request.release()
+
+    def capture_jpeg_frame(self, profile: PreviewProfile | None = None) -> bytes:
+        profile = profile or PREVIEW_PROFILES["full"]
+        if profile.source == "lores":
+            # Grayscale luma only: no chroma conversion and a fraction of the pixels
+            arr = self.capture_lores_frame()
+        else:
+            # RGB888 from picamera2 is laid out B, G, R, which is what OpenCV expects
+            arr = self._picam2.capture_array("main")
+        return encode_preview(arr, profile)
 
     def set_controls(self, controls: dict) -> None:
         self._picam2.set_controls(controls)
@@ -71,7 +182,9 @@ class CameraService:
         from picamera2.outputs import FfmpegOutput
 
         self._encoder = H264Encoder()
-        output = FfmpegOutput(path)
+        # FfmpegOutput splits its argument into ffmpeg options; name the
+        # container explicitly since ".partial" paths carry no extension hint
+        output = FfmpegOutput(f"-f mp4 {path}")
         self._picam2.start_encoder(self._encoder, output)
 
     def stop_recording(self) -> None:
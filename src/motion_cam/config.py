@@ -1,6 +1,11 @@
+import math
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Mapping
+
+# Written by bootstrap.sh and loaded by systemd; re-read for detection settings on SIGHUP
+ENV_FILE = "/etc/motion-cam/.env"
 
 
 def _default_data_dir() -> str:
@@ -8,6 +13,10 @@ def _default_data_dir() -> str:
     return str(home / "motion-cam-data")
 
 
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 def _parse_resolution(value: str) -> tuple[int, int]:
     w, h = value.split("x")
     return (int(w), int(h))
@@ -18,6 +27,9 @@ class CameraConfig:
     main_resolution: tuple[int, int] = (1280, 720)
     lores_resolution: tuple[int, int] = (320, 240)
     framerate: int = 15
+    backend: str = "picamera2"  # "picamera2" or "sim" (SimulatedCamera, no hardware)
+    sim_source: str = ""  # video file to replay; empty for the synthetic scene
+    sim_speed: float = 1.0  # scene clock relative to wall time
 
 
 @dataclass(frozen=True)
@@ -28,18 +40,76 @@ class DetectionConfig:
     cooldown: int = 5
     max_clip_duration: int = 60
 
+    def __post_init__(self) -> None:
+        # float("nan") compares false to every bound below, so it would pass them all
+        if not math.isfinite(self.learning_rate):
+            raise ValueError("learning_rate must be a finite number")
+        if self.min_contour_area < 0:
+            raise ValueError("min_contour_area must be 0 or more")
+        if self.blur_kernel_size < 1 or self.blur_kernel_size % 2 == 0:
+            raise ValueError("blur_kernel_size must be a positive odd number")
+        if self.learning_rate > 1:
+            raise ValueError("learning_rate must be at most 1 (negative for automatic)")
+        if self.cooldown < 0:
+            raise ValueError("cooldown must be 0 or more")
+        if self.max_clip_duration < 1:
+            raise ValueError("max_clip_duration must be at least 1")
+
 
 @dataclass(frozen=True)
 class StorageConfig:
     data_dir: str = ""
     max_age_days: int = 7
     max_disk_usage_mb: int = 4096
+    scrub_interval: int = 2  # seconds between scrub preview frames; 0 disables them
+
+
+@dataclass(frozen=True)
+class PreviewProfile:
+    source: str  # "main" (RGB recording stream) or "lores" (Y plane of detection stream)
+    size: tuple[int, int] | None  # output size; None keeps the source size
+    quality: int
+    fps: float
+
+
+PREVIEW_PROFILES = {
+    "full": PreviewProfile(source="main", size=None, quality=80, fps=20),
+    "balanced": PreviewProfile(source="main", size=(640, 360), quality=70, fps=10),
+    "low": PreviewProfile(source="lores", size=None, quality=60, fps=5),
+}
 
 
 @dataclass(frozen=True)
 class WebConfig:
     port: int = 8080
     host: str = "0.0.0.0"
+    preview_profile: str = "balanced"
+    server: str = "waitress"  # "waitress" or "dev" (Werkzeug development server)
+    threads: int = 8
+    max_streams: int = 4  # open SSE feeds + tuner streams, each holding a worker
+    connection_limit: int = 32
+    keepalive_timeout: int = 30
+    compress_min_size: int = 1024  # bytes; smaller HTML/JSON is sent as-is, 0 disables
+
+    def __post_init__(self) -> None:
+        if self.max_streams < 0:
+            raise ValueError("max_streams must be 0 or more")
+        if self.preview_profile not in PREVIEW_PROFILES:
+            raise ValueError(
+                f"preview_profile must be one of {', '.join(PREVIEW_PROFILES)}, not {self.preview_profile!r}"
+            )
+
+    @property
+    def stream_limit(self) -> int:
+        """Streams allowed at once: ``max_streams``, but always leaving one worker free."""
+        return max(0, min(self.max_streams, self.threads - 1))
+
+
+@dataclass(frozen=True)
+class MonitoringConfig:
+    metrics_enabled: bool = True  # stage timings at /metrics; off removes all instrumentation
+    profile_token: str = ""  # enables /debug/profile for requests bearing this token
+    telemetry_enabled: bool = True  # 1 Hz host resource history for /status charts
 
 
 @dataclass(frozen=True)
@@ -48,6 +118,18 @@ class Config:
     detection: DetectionConfig = field(default_factory=DetectionConfig)
     storage: StorageConfig = field(default_factory=StorageConfig)
     web: WebConfig = field(default_factory=WebConfig)
+    monitoring: MonitoringConfig = field(default_factory=MonitoringConfig)
+
+
+def load_detection_config(env: Mapping[str, str]) -> DetectionConfig:
+    """Detection settings from ``env``; raises ValueError for malformed or out-of-range values."""
+    return DetectionConfig(
+        min_contour_area=int(env.get("DETECTION_MIN_CONTOUR_AREA", "500")),
+        blur_kernel_size=int(env.get("DETECTION_BLUR_KERNEL_SIZE", "21")),
+        learning_rate=float(env.get("DETECTION_LEARNING_RATE", "-1")),
+        cooldown=int(env.get("DETECTION_COOLDOWN", "5")),
+        max_clip_duration=int(env.get("DETECTION_MAX_CLIP_DURATION", "60")),
+    )
 
 
 def load_config() -> Config:
@@ -58,25 +140,38 @@ def load_config() -> Config:
         main_resolution=_parse_resolution(env.get("CAMERA_MAIN_RESOLUTION", "1280x720")),
         lores_resolution=_parse_resolution(env.get("CAMERA_LORES_RESOLUTION", "320x240")),
         framerate=int(env.get("CAMERA_FRAMERATE", "15")),
+        backend=env.get("CAMERA_BACKEND", "picamera2"),
+        sim_source=os.path.expanduser(env.get("CAMERA_SIM_SOURCE", "")),
+        sim_speed=float(env.get("CAMERA_SIM_SPEED", "1")),
     )
 
-    detection = DetectionConfig(
-        min_contour_area=int(env.get("DETECTION_MIN_CONTOUR_AREA", "500")),
-        blur_kernel_size=int(env.get("DETECTION_BLUR_KERNEL_SIZE", "21")),
-        learning_rate=float(env.get("DETECTION_LEARNING_RATE", "-1")),
-        cooldown=int(env.get("DETECTION_COOLDOWN", "5")),
-        max_clip_duration=int(env.get("DETECTION_MAX_CLIP_DURATION", "60")),
-    )
+    detection = load_detection_config(env)
 
     storage = StorageConfig(
         data_dir=os.path.expanduser(env.get("STORAGE_DATA_DIR", _default_data_dir())),
         max_age_days=int(env.get("STORAGE_MAX_AGE_DAYS", "7")),
         max_disk_usage_mb=int(env.get("STORAGE_MAX_DISK_USAGE_MB", "4096")),
+        scrub_interval=int(env.get("STORAGE_SCRUB_INTERVAL", "2")),
     )
 
     web = WebConfig(
         port=int(env.get("WEB_PORT", "8080")),
         host=env.get("WEB_HOST", "0.0.0.0"),
+        preview_profile=env.get("WEB_PREVIEW_PROFILE", "balanced"),
+        server=env.get("WEB_SERVER", "waitress"),
+        threads=int(env.get("WEB_THREADS", "8")),
+        max_streams=int(env.get("WEB_MAX_STREAMS", "4")),
+        connection_limit=int(env.get("WEB_CONNECTION_LIMIT", "32")),
+        keepalive_timeout=int(env.get("WEB_KEEPALIVE_TIMEOUT", "30")),
+        compress_min_size=int(env.get("WEB_COMPRESS_MIN_SIZE", "1024")),
     )
 
-    return Config(camera=camera, detection=detection, storage=storage, web=web)
+    monitoring = MonitoringConfig(
+        metrics_enabled=_parse_bool(env.get("METRICS_ENABLED", "true")),
+        profile_token=env.get("PROFILE_TOKEN", ""),
+        telemetry_enabled=_parse_bool(env.get("TELEMETRY_ENABLED", "true")),
+    )
+
+    return Config(
+        camera=camera, detection=detection, storage=storage, web=web, monitoring=monitoring
+    )
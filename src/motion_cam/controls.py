@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# libcamera applies controls per frame; more writes than this only queue up
+MAX_CONTROL_RATE = 10.0
+# Controls that start an action rather than set a value: each write of one is an event
+ONE_SHOT_CONTROLS = frozenset({"AfTrigger", "AePrecaptureTrigger"})
+
+
+def _plain(controls: dict[str, Any]) -> dict[str, Any]:
+    """JSON-safe copy: libcamera enum values are reported by name."""
+    return {
+        k: v if isinstance(v, (bool, int, float, str)) or v is None else str(v)
+        for k, v in controls.items()
+    }
+
+
+class ControlCoalescer:
+    """Funnels camera control writes through one thread at a bounded rate.
+
+    Updates submitted between writes are merged per control name, so dragging a
+    slider costs one ``set_controls`` call per interval carrying only the latest
+    value, however many requests the browser sent. One-shot controls such as
+    ``AfTrigger`` are never merged: each goes out in a write of its own, with
+    the values submitted before it, and is not remembered as applied state.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[dict[str, Any]], None],
+        max_rate: float = MAX_CONTROL_RATE,
+        name: str = "controls",
+    ) -> None:
+        self._apply = apply
+        self._interval = 1.0 / max_rate
+        self._name = name
+        self._pending: dict[str, Any] = {}
+        # Writes carrying a one-shot control, in submission order, ahead of _pending
+        self._actions: deque[dict[str, Any]] = deque()
+        self._applied: dict[str, Any] = {}
+        self._writes = 0
+        self._error = ""
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, controls: dict[str, Any]) -> dict[str, Any]:
+        """Queue ``controls`` and return immediately with the coalescer's state."""
+        with self._cond:
+            self._pending.update(controls)
+            if ONE_SHOT_CONTROLS.intersection(controls):
+                # Freeze this write; later values must not merge into it or reorder around it
+                self._actions.append(self._pending)
+                self._pending = {}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return self._state()
+
+    def state(self) -> dict[str, Any]:
+        with self._cond:
+            return self._state()
+
+    def _state(self) -> dict[str, Any]:
+        pending: dict[str, Any] = {}
+        for write in (*self._actions, self._pending):
+            pending.update(write)
+        return {
+            "pending": _plain(pending),
+            "applied": _plain(self._applied),
+            "writes": self._writes,
+            "error": self._error,
+        }
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued update has been written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._actions and not self._busy, timeout
+            )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._actions)
+                if self._actions:
+                    controls = self._actions.popleft()
+                else:
+                    controls, self._pending = self._pending, {}
+                self._busy = True
+            started = time.monotonic()
+            try:
+                self._apply(controls)
+                error = ""
+            except Exception as e:
+                logger.exception("Applying camera controls %s failed", controls)
+                error = str(e)
+            with self._cond:
+                self._writes += 1
+                self._error = error
+                if not error:
+                    self._applied.update(
+                        (k, v) for k, v in controls.items() if k not in ONE_SHOT_CONTROLS
+                    )
+                self._busy = False
+                self._cond.notify_all()
+            # Hold off the next write so bursts collapse into the pending dict
+            time.sleep(max(0.0, self._interval - (time.monotonic() - started)))
@@ -1,11 +1,26 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 
 import cv2
 import numpy as np
 
 from motion_cam.config import DetectionConfig
+from motion_cam.metrics import Histogram, Registry
+
+STAGE_SECONDS = "motion_cam_detector_stage_seconds"
+STAGE_HELP = "Time spent in each stage of processing one lores frame."
+# "capture" is observed by the main loop around entering camera.map_lores()
+STAGES = ("blur", "background", "morphology", "contours")
+
+# MOG2 labels every change as shadow for its first few frames, so a saved
+# background is replayed this many times before live frames are judged
+SEED_FRAMES = 10
+# A saved background is dropped if the first frame differs from it by more
+# than SEED_PIXEL_DELTA levels over more than this fraction of the frame
+SEED_MAX_CHANGED = 0.25
+SEED_PIXEL_DELTA = 25
 
 
 @dataclass
@@ -15,26 +30,125 @@ class MotionEvent:
     largest_area: int = 0
 
 
+def scaled_learning_rate(rate: float, dt: float, frame_interval: float) -> float:
+    """The per-frame rate that adapts as much over ``dt`` as ``rate`` does per interval.
+
+    A frame arriving after two intervals (one dropped) must absorb two
+    intervals' worth of change, so the background tracks wall-clock time
+    instead of frame count.
+    """
+    steps = dt / frame_interval
+    return min(1.0, 1.0 - (1.0 - rate) ** steps)
+
+
 class MotionDetector:
-    def __init__(self, config: DetectionConfig) -> None:
+    def __init__(
+        self,
+        config: DetectionConfig,
+        metrics: Registry | None = None,
+        frame_interval: float | None = None,
+    ) -> None:
         self._config = config
+        self._frame_interval = frame_interval
+        self._frames_seen = 0
+        self._learning_rate = -1.0
+        self._seed: np.ndarray | None = None
+        # True/False once a seed has been tried on the first frame; None if there was none
+        self.seeded: bool | None = None
         self._bg_subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=True)
         self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        # Each stage feeds the next; the last returns the MotionEvent
+        self._stages = (self._blur, self._subtract, self._clean, self._find_contours)
+        self._stage_timers: tuple[Histogram, ...] | None = None
+        if metrics is not None:
+            self._stage_timers = tuple(
+                metrics.histogram(STAGE_SECONDS, STAGE_HELP, stage=name) for name in STAGES
+            )
 
-    def process_frame(self, frame: np.ndarray) -> MotionEvent:
-        k = self._config.blur_kernel_size
-        blurred = cv2.GaussianBlur(frame, (k, k), 0)
+    @property
+    def config(self) -> DetectionConfig:
+        return self._config
+
+    def update_config(self, config: DetectionConfig) -> None:
+        """Use new thresholds from the next frame on, keeping the learned background."""
+        self._config = config
+
+    def seed(self, background: np.ndarray) -> None:
+        """Start from a saved ``background_image()`` instead of an empty model.
 
+        Applied on the next frame, and only if that frame still matches it:
+        after a lighting change or a moved camera, a cold start re-learns
+        faster than a wrong background is unlearned.
+        """
+        self._seed = background
+
+    def background_image(self) -> np.ndarray | None:
+        """The learned background, in blurred space; None before any frame."""
+        if self._frames_seen == 0:
+            return None
+        return self._bg_subtractor.getBackgroundImage()
+
+    def process_frame(self, frame: np.ndarray, dt: float | None = None) -> MotionEvent:
+        """Detect motion in one lores frame.
+
+        ``dt`` is the seconds since the previous frame's exposure. With it and a
+        ``frame_interval``, the background learning rate is scaled to the real
+        time step; without it, every frame counts as one interval.
+        """
+        self._learning_rate = self._rate_for(dt)
+        self._frames_seen += 1
+        result = frame
+        if self._stage_timers is None:
+            for stage in self._stages:
+                result = stage(result)
+            return result
+        for stage, timer in zip(self._stages, self._stage_timers):
+            started = time.perf_counter()
+            result = stage(result)
+            timer.observe(time.perf_counter() - started)
+        return result
+
+    def _rate_for(self, dt: float | None) -> float:
         lr = self._config.learning_rate
-        fg_mask = self._bg_subtractor.apply(blurred, learningRate=lr if lr >= 0 else -1)
+        if dt is None or self._frame_interval is None or dt <= 0:
+            return lr if lr >= 0 else -1
+        if lr < 0:
+            # What MOG2 picks automatically: fast at first, settling at 1/history
+            lr = 1.0 / min(2 * (self._frames_seen + 1), self._bg_subtractor.getHistory())
+        return scaled_learning_rate(lr, dt, self._frame_interval)
+
+    def _blur(self, frame: np.ndarray) -> np.ndarray:
+        k = self._config.blur_kernel_size
+        return cv2.GaussianBlur(frame, (k, k), 0)
+
+    def _apply_seed(self, blurred: np.ndarray) -> None:
+        seed, self._seed = self._seed, None
+        if seed.shape != blurred.shape:
+            self.seeded = False
+            return
+        changed = np.count_nonzero(cv2.absdiff(seed, blurred) > SEED_PIXEL_DELTA) / blurred.size
+        self.seeded = bool(changed <= SEED_MAX_CHANGED)
+        if not self.seeded:
+            return
+        for _ in range(SEED_FRAMES):
+            self._bg_subtractor.apply(seed)
+        # Time-normalized automatic rates continue from a settled model, not a new one
+        self._frames_seen = max(self._frames_seen, self._bg_subtractor.getHistory() // 2)
+
+    def _subtract(self, blurred: np.ndarray) -> np.ndarray:
+        if self._seed is not None:
+            self._apply_seed(blurred)
+        return self._bg_subtractor.apply(blurred, learningRate=self._learning_rate)
 
+    def _clean(self, fg_mask: np.ndarray) -> np.ndarray:
         # Remove shadows: MOG2 marks shadows as 127, foreground as 255
         _, fg_mask = cv2.threshold(fg_mask, 200, 255, cv2.THRESH_BINARY)
 
         # Morphological cleanup: erode to remove noise, dilate to fill gaps
         fg_mask = cv2.erode(fg_mask, self._kernel, iterations=1)
-        fg_mask = cv2.dilate(fg_mask, self._kernel, iterations=2)
+        return cv2.dilate(fg_mask, self._kernel, iterations=2)
 
+    def _find_contours(self, fg_mask: np.ndarray) -> MotionEvent:
         contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
         qualifying = [c for c in contours if cv2.contourArea(c) >= self._config.min_contour_area]
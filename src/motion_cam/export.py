@@ -0,0 +1,157 @@
+"""Stream clips as a ZIP or TAR archive built on the fly.
+
+Entries are stored uncompressed (H.264 and JPEG do not shrink) and file data is
+read in fixed-size chunks straight into the response, so memory stays flat no
+matter how large the export. TAR layout is fully determined by the file list
+and sizes, which gives a known Content-Length and lets any byte range be served
+directly; ZIP entries carry CRCs computed while streaming, so ZIP is
+sequential-only.
+"""
+from __future__ import annotations
+
+import hashlib
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+CHUNK_SIZE = 64 * 1024
+_TAR_BLOCK = 512
+
+
+@dataclass(frozen=True)
+class ExportEntry:
+    path: Path  # file on disk
+    name: str  # path inside the archive, mirroring the /media layout
+    size: int
+    mtime: int
+
+
+def collect_entries(files: list[tuple[Path, str]]) -> list[ExportEntry]:
+    """Stat each (path, archive name); files that have vanished are skipped."""
+    entries = []
+    for path, name in files:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append(ExportEntry(path=path, name=name, size=st.st_size, mtime=int(st.st_mtime)))
+    return entries
+
+
+def etag(entries: list[ExportEntry]) -> str:
+    """Strong validator: changes if any entry's name, size or mtime changes."""
+    digest = hashlib.sha1()
+    for e in entries:
+        digest.update(f"{e.name}\0{e.size}\0{e.mtime}\n".encode())
+    return digest.hexdigest()
+
+
+def _read_file(entry: ExportEntry, start: int = 0, length: int | None = None) -> Iterator[bytes]:
+    """Yield exactly ``length`` bytes of the file from ``start``, zero-padding if it shrank."""
+    remaining = entry.size - start if length is None else length
+    with open(entry.path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                # Keep archive offsets valid even if the file was truncated under us
+                chunk = b"\0" * min(CHUNK_SIZE, remaining)
+            remaining -= len(chunk)
+            yield chunk
+
+
+# --- TAR -------------------------------------------------------------------
+
+
+def _tar_header(entry: ExportEntry) -> bytes:
+    info = tarfile.TarInfo(entry.name)
+    info.size = entry.size
+    info.mtime = entry.mtime
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.GNU_FORMAT)
+
+
+def _tar_segments(entries: list[ExportEntry]) -> list[tuple[int, bytes | ExportEntry]]:
+    """(length, content) pieces of the archive in order; bytes or a file's data."""
+    segments: list[tuple[int, bytes | ExportEntry]] = []
+    for entry in entries:
+        header = _tar_header(entry)
+        segments.append((len(header), header))
+        segments.append((entry.size, entry))
+        padding = -entry.size % _TAR_BLOCK
+        if padding:
+            segments.append((padding, b"\0" * padding))
+    # End of archive: two zero blocks, then pad to tarfile's default record size
+    end = 2 * _TAR_BLOCK
+    total = sum(length for length, _ in segments) + end
+    end += -total % tarfile.RECORDSIZE
+    segments.append((end, b"\0" * end))
+    return segments
+
+
+def tar_size(entries: list[ExportEntry]) -> int:
+    return sum(length for length, _ in _tar_segments(entries))
+
+
+def stream_tar(entries: list[ExportEntry], start: int = 0, stop: int | None = None) -> Iterator[bytes]:
+    """Yield bytes [start, stop) of the TAR archive without building it."""
+    offset = 0
+    for length, content in _tar_segments(entries):
+        seg_start, seg_end = offset, offset + length
+        offset = seg_end
+        if seg_end <= start:
+            continue
+        if stop is not None and seg_start >= stop:
+            return
+        lo = max(start, seg_start) - seg_start
+        hi = (length if stop is None else min(stop, seg_end) - seg_start)
+        if isinstance(content, bytes):
+            yield content[lo:hi]
+        else:
+            yield from _read_file(content, lo, hi - lo)
+
+
+# --- ZIP -------------------------------------------------------------------
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands written bytes to a generator."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile records entry offsets from tell(); seek() is deliberately absent
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> list[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def stream_zip(entries: list[ExportEntry]) -> Iterator[bytes]:
+    """Yield a ZIP of ``entries`` with stored members, written front to back."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.name, datetime.fromtimestamp(entry.mtime).timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            info.file_size = entry.size
+            with zf.open(info, mode="w") as member:
+                for chunk in _read_file(entry):
+                    member.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
@@ -0,0 +1,153 @@
+"""Move an MP4's ``moov`` atom in front of ``mdat`` so playback can start immediately.
+
+This is the same rewrite as ffmpeg's ``qt-faststart`` tool: the sample data is
+copied as-is, the index is moved to the front and its chunk offsets are shifted
+by the size of the moved index. No re-encoding, one sequential pass.
+
+Backfill existing clips with ``python -m motion_cam.faststart``.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Boxes on the path from moov down to the chunk offset tables
+_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+_COPY_CHUNK = 1024 * 1024
+
+
+def _iter_boxes(data: BinaryIO | bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int, int]]:
+    """Yield (type, offset, header_size, total_size) for boxes in [start, end)."""
+    offset = start
+    while offset + 8 <= end:
+        if isinstance(data, bytes):
+            header = data[offset:offset + 16]
+        else:
+            data.seek(offset)
+            header = data.read(16)
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            raise ValueError(f"Malformed box {box_type!r} at offset {offset}")
+        yield box_type, offset, header_size, size
+        offset += size
+
+
+def _top_level_boxes(path: str) -> list[tuple[bytes, int, int, int]]:
+    with open(path, "rb") as f:
+        return list(_iter_boxes(f, 0, os.path.getsize(path)))
+
+
+def moov_first(path: str) -> bool | None:
+    """True if moov precedes mdat, False if it trails it, None if either is missing."""
+    order = [box[0] for box in _top_level_boxes(path) if box[0] in (b"moov", b"mdat")]
+    if b"moov" not in order or b"mdat" not in order:
+        return None
+    return order[0] == b"moov"
+
+
+def _shift_chunk_offsets(moov: bytearray, start: int, end: int, moved_from: int, shift: int) -> None:
+    """Add ``shift`` to every chunk offset that pointed before the old moov position."""
+    for box_type, offset, header_size, size in _iter_boxes(bytes(moov), start, end):
+        body = offset + header_size
+        if box_type in _CONTAINERS:
+            _shift_chunk_offsets(moov, body, offset + size, moved_from, shift)
+        elif box_type in (b"stco", b"co64"):
+            # Full box: version/flags (4 bytes), entry count (4 bytes), entries
+            count = struct.unpack(">I", moov[body + 4:body + 8])[0]
+            dtype = ">u4" if box_type == b"stco" else ">u8"
+            table = np.frombuffer(moov, dtype=dtype, count=count, offset=body + 8).copy()
+            moved = table < moved_from
+            if box_type == b"stco" and moved.any() and int(table[moved].max()) + shift >= 2**32:
+                raise ValueError("Chunk offsets overflow 32 bits; needs a co64 rewrite")
+            table[moved] += shift
+            moov[body + 8:body + 8 + table.nbytes] = table.tobytes()
+
+
+def faststart(src: str, dst: str) -> bool:
+    """Write a moov-first copy of ``src`` to ``dst``. Returns False if no rewrite was needed."""
+    boxes = _top_level_boxes(src)
+    moov = next((b for b in boxes if b[0] == b"moov"), None)
+    first_mdat = next((b for b in boxes if b[0] == b"mdat"), None)
+    if moov is None or first_mdat is None or moov[1] < first_mdat[1]:
+        return False
+
+    _, moov_offset, _, moov_size = moov
+    with open(src, "rb") as f:
+        f.seek(moov_offset)
+        moov_data = bytearray(f.read(moov_size))
+        _shift_chunk_offsets(moov_data, 8, moov_size, moov_offset, moov_size)
+
+        with open(dst, "wb") as out:
+            for box in boxes:
+                if box is moov:
+                    continue
+                if box is first_mdat:
+                    out.write(moov_data)
+                f.seek(box[1])
+                remaining = box[3]
+                while remaining:
+                    chunk = f.read(min(_COPY_CHUNK, remaining))
+                    if not chunk:
+                        raise ValueError("Unexpected end of file")
+                    out.write(chunk)
+                    remaining -= len(chunk)
+    return True
+
+
+def faststart_in_place(path: str) -> bool:
+    """Rewrite ``path`` moov-first via a temp file and atomic rename."""
+    tmp = path + ".faststart"
+    try:
+        changed = faststart(path, tmp)
+    except (OSError, ValueError, struct.error):
+        logger.exception("Faststart rewrite of %s failed", path)
+        changed = False
+    if changed:
+        os.replace(tmp, path)
+    else:
+        Path(tmp).unlink(missing_ok=True)
+    return changed
+
+
+def backfill(data_dir: str) -> int:
+    """Convert every existing clip that still has a trailing moov. Returns the count."""
+    converted = 0
+    for mp4 in sorted(Path(data_dir).rglob("*.mp4")):
+        try:
+            needs_rewrite = moov_first(str(mp4)) is False
+        except (OSError, ValueError, struct.error):
+            logger.warning("Skipping unreadable clip %s", mp4)
+            continue
+        if needs_rewrite and faststart_in_place(str(mp4)):
+            logger.info("Converted %s", mp4)
+            converted += 1
+    return converted
+
+
+def main() -> None:
+    from motion_cam.config import load_config
+
+    parser = argparse.ArgumentParser(description="Rewrite existing clips with moov first.")
+    parser.add_argument("--data-dir", help="defaults to STORAGE_DATA_DIR")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    data_dir = args.data_dir or load_config().storage.data_dir
+    logger.info("Converted %d clip(s)", backfill(data_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Per-second accounting of skipped frames and capture-to-result latency.
+
+The camera numbers and timestamps every frame it exposes. When the detection
+loop takes longer than a frame period, the camera moves on without it. The
+next frame's sequence number then jumps, and the jump is counted as dropped.
+Latency runs from the start of exposure to the end of motion detection for that
+frame. The gap between frame timestamps also gives the detector the real time
+step, so it can scale its learning rate.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from motion_cam.camera import Frame, MappedFrame
+from motion_cam.metrics import Registry
+
+WINDOW = 1.0
+
+LATENCY_SECONDS = "motion_cam_capture_latency_seconds"
+LATENCY_HELP = "Time from the start of a frame's exposure to the end of motion detection on it."
+DROPPED_TOTAL = "motion_cam_frames_dropped_total"
+DROPPED_HELP = "Camera frames skipped because the detection loop was busy."
+PROCESSED_TOTAL = "motion_cam_frames_processed_total"
+PROCESSED_HELP = "Camera frames run through motion detection."
+
+
+@dataclass(frozen=True)
+class FrameWindow:
+    """Summary of one accounting window."""
+
+    frames: int
+    dropped: int
+    fps: float
+    latency_ms: float  # mean
+    max_latency_ms: float
+
+
+class FrameStats:
+    """Tracks sequence gaps and latency, and rolls a ``FrameWindow`` every second."""
+
+    def __init__(self, window: float = WINDOW, metrics: Registry | None = None) -> None:
+        self._window = window
+        self._last: Frame | MappedFrame | None = None
+        self.total_dropped = 0
+        self._reset(time.monotonic())
+        self._latency_timer = self._dropped_counter = self._processed_counter = None
+        if metrics is not None:
+            self._latency_timer = metrics.histogram(LATENCY_SECONDS, LATENCY_HELP)
+            self._dropped_counter = metrics.counter(DROPPED_TOTAL, DROPPED_HELP)
+            self._processed_counter = metrics.counter(PROCESSED_TOTAL, PROCESSED_HELP)
+
+    def _reset(self, now: float) -> None:
+        self._started = now
+        self._frames = 0
+        self._dropped = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+    def begin(self, frame: Frame | MappedFrame) -> float | None:
+        """Account for a newly captured frame.
+
+        Returns seconds since the previous frame's exposure (None for the first
+        frame or after the sequence restarts).
+        """
+        last, self._last = self._last, frame
+        if last is None or frame.sequence <= last.sequence:
+            return None
+        dropped = frame.sequence - last.sequence - 1
+        if dropped:
+            self._dropped += dropped
+            self.total_dropped += dropped
+            if self._dropped_counter is not None:
+                self._dropped_counter.inc(dropped)
+        return frame.timestamp - last.timestamp
+
+    def end(self, frame: Frame | MappedFrame, now: float | None = None) -> FrameWindow | None:
+        """Record that ``frame`` has been processed; returns a summary once per window."""
+        now = time.monotonic() if now is None else now
+        latency = max(0.0, now - frame.timestamp)
+        self._frames += 1
+        self._latency_sum += latency
+        self._latency_max = max(self._latency_max, latency)
+        if self._latency_timer is not None:
+            self._latency_timer.observe(latency)
+            self._processed_counter.inc()
+        elapsed = now - self._started
+        if elapsed < self._window:
+            return None
+        summary = FrameWindow(
+            frames=self._frames,
+            dropped=self._dropped,
+            fps=self._frames / elapsed,
+            latency_ms=self._latency_sum / self._frames * 1000,
+            max_latency_ms=self._latency_max * 1000,
+        )
+        self._reset(now)
+        return summary
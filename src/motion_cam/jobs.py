@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+MAX_FINISHED_JOBS = 50
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    state: str = "pending"  # pending -> running -> done | failed
+    total: int = 0
+    done: int = 0
+    result: Any = None
+    error: str = ""
+
+    def progress(self, done: int, total: int) -> None:
+        self.done = done
+        self.total = total
+
+
+class JobManager:
+    """Runs long-running work on a single background thread, one job at a time.
+
+    Jobs are tracked by id so the web portal can report progress without
+    holding a request thread open for the duration of the work. ``nice``
+    lowers the worker thread's scheduling priority by that much (Linux), so
+    bulk work yields the CPU to detection.
+    """
+
+    def __init__(self, name: str = "jobs", nice: int = 0) -> None:
+        self._name = name
+        self._nice = nice
+        self._queue: queue.Queue[tuple[Job, Callable[[Job], Any]]] = queue.Queue()
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, kind: str, fn: Callable[[Job], Any]) -> Job:
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._enqueue(job, fn)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until every submitted job has finished. Returns False on timeout."""
+        done = threading.Event()
+        self._enqueue(Job(id="", kind="barrier"), lambda job: done.set())
+        return done.wait(timeout)
+
+    def _enqueue(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+        self._queue.put((job, fn))
+
+    def _prune(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.state in ("done", "failed")]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _lower_priority(self) -> None:
+        try:
+            # On Linux each thread is its own task with its own nice value
+            tid = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + self._nice)
+        except (AttributeError, OSError):
+            logger.warning("Could not lower the priority of the %s worker", self._name)
+
+    def _run(self) -> None:
+        if self._nice:
+            self._lower_priority()
+        while True:
+            job, fn = self._queue.get()
+            job.state = "running"
+            try:
+                job.result = fn(job)
+                job.state = "done"
+            except Exception as e:
+                logger.exception("Job %s (%s) failed", job.id, job.kind)
+                job.error = str(e)
+                job.state = "failed"
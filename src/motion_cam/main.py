@@ -1,17 +1,32 @@
+"""Service entry point: capture and detection first, everything else after.
+
+Startup is ordered for a slow board. Only light modules are imported
+here, and the camera starts before the detector's OpenCV import. The web
+portal, telemetry and backfill jobs are deferred to a background thread
+that waits for the first analyzed frame. Flask, waitress and friends then
+load while detection is already running, instead of holding up the first
+frame by several seconds.
+"""
 from __future__ import annotations
 
 import logging
+import os
 import signal
 import threading
 import time
+from dataclasses import asdict
 from datetime import datetime
+from pathlib import Path
 
-from motion_cam.camera import CameraService
-from motion_cam.config import load_config
-from motion_cam.detector import MotionDetector
+from motion_cam.camera import create_camera
+from motion_cam.config import ENV_FILE, load_config
+from motion_cam.framestats import FrameStats
+from motion_cam.jobs import JobManager
+from motion_cam.metrics import Registry
 from motion_cam.recorder import Recorder
+from motion_cam.settings import DetectionSettings
+from motion_cam.state import LiveState
 from motion_cam.storage import StorageManager
-from motion_cam.web import create_app
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,23 +34,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The portal starts anyway if no frame has been analyzed by then (e.g. a stuck camera)
+SERVICES_START_TIMEOUT = 10.0
+# Services still loading at shutdown get this long to finish before being stopped
+SERVICES_JOIN_TIMEOUT = 30.0
+
 
 def main() -> None:
+    boot = time.monotonic()
     config = load_config()
-    camera = CameraService(config.camera)
-    detector = MotionDetector(config.detection)
-    recorder = Recorder(camera, config.storage, config.detection)
-    storage = StorageManager(config.storage)
-
-    # Start Flask web server in a background thread
-    app = create_app(storage, config.web, data_dir=config.storage.data_dir, camera=camera)
-    web_thread = threading.Thread(
-        target=app.run,
-        kwargs={"host": config.web.host, "port": config.web.port},
-        daemon=True,
+    metrics = Registry() if config.monitoring.metrics_enabled else None
+    camera = create_camera(config.camera)
+    # Clip finalize and crash repair only, so a new clip is never published late
+    jobs = JobManager()
+    # Sprites, retention and bulk deletes: one low-priority worker, since they
+    # all remove or repack files and must not interleave
+    housekeeping = JobManager(name="housekeeping", nice=10)
+    # Scrub previews get their own worker so they never hold up finalization
+    preview_jobs = JobManager(name="previews")
+    # Periodic background-model saves, so they never queue behind housekeeping
+    background_jobs = JobManager(name="background-model")
+    live = LiveState()
+    env_file = os.environ.get("MOTION_CAM_ENV_FILE", ENV_FILE)
+    # Detection settings the portal and SIGHUP can change; applied between frames
+    settings = DetectionSettings(config.detection, env_file=env_file)
+    data_dir = config.storage.data_dir
+    scrub_interval = config.storage.scrub_interval
+    storage = StorageManager(config.storage, metrics=metrics)
+
+    def on_clip_complete(timestamp: str) -> None:
+        from motion_cam import previews, sprites
+
+        live.push_event("clip", {"timestamp": timestamp})
+        housekeeping.submit("sprites", lambda job: sprites.add_clip(data_dir, timestamp))
+        clip = storage.get_clip(timestamp)
+        if scrub_interval and clip is not None:
+            preview_jobs.submit(
+                "scrub",
+                lambda job: previews.generate_when_idle(
+                    Path(clip.path), scrub_interval, busy=lambda: recorder.is_recording
+                ),
+            )
+
+    recorder = Recorder(
+        camera,
+        config.storage,
+        config.detection,
+        jobs=jobs,
+        on_clip_complete=on_clip_complete,
+        metrics=metrics,
     )
-    web_thread.start()
-    logger.info("Web portal started on %s:%d", config.web.host, config.web.port)
+
+    # Only clips listed in the manifest need attention after a crash
+    repairs = recorder.reconcile()
+    if repairs:
+        logger.info("Queued repair of %d interrupted clip(s)", repairs)
+
+    first_frame = threading.Event()
+    stopping = threading.Event()
+    web_server = None
+    telemetry = None
+
+    def start_services() -> None:
+        nonlocal web_server, telemetry
+        first_frame.wait(SERVICES_START_TIMEOUT)
+        if stopping.is_set():
+            return
+        try:
+            started = time.monotonic()
+            from motion_cam import previews, sprites
+            from motion_cam.server import WebServer
+            from motion_cam.web import create_app
+
+            housekeeping.submit("retention", lambda job: storage.enforce_retention())
+            # Pack thumbnails of clips recorded before sprites existed, or since deleted
+            housekeeping.submit("sprites", lambda job: sprites.backfill(data_dir, job.progress))
+            if scrub_interval:
+                preview_jobs.submit(
+                    "scrub",
+                    lambda job: previews.backfill(
+                        data_dir,
+                        scrub_interval,
+                        busy=lambda: recorder.is_recording,
+                        progress=job.progress,
+                    ),
+                )
+
+            if config.monitoring.telemetry_enabled:
+                from motion_cam.telemetry import Telemetry
+
+                def detector_rates() -> dict:
+                    snap = live.snapshot()
+                    return {
+                        "fps": snap.fps,
+                        "dropped": snap.dropped_frames,
+                        "latency_ms": snap.latency_ms,
+                    }
+
+                telemetry = Telemetry(data_dir, detector=detector_rates)
+                telemetry.start()
+
+            # Serve the web portal in-process so it shares storage and camera objects
+            app = create_app(
+                storage,
+                config.web,
+                data_dir=data_dir,
+                camera=camera,
+                jobs=housekeeping,
+                live_state=live,
+                metrics=metrics,
+                profile_token=config.monitoring.profile_token,
+                telemetry=telemetry,
+                settings=settings,
+            )
+            server = WebServer(app, config.web)
+            server.start()
+            web_server = server
+            logger.info(
+                "Portal and background services up %.2f s after boot (%.2f s to load)",
+                time.monotonic() - boot,
+                time.monotonic() - started,
+            )
+        except Exception:
+            # Detection keeps running; the portal is what's missing
+            logger.exception("Starting the web portal and background services failed")
+
+    services = threading.Thread(target=start_services, name="services-startup", daemon=True)
+    services.start()
 
     shutdown = False
 
@@ -44,24 +169,84 @@ def main() -> None:
         logger.info("Received signal %s, shutting down...", signum)
         shutdown = True
 
+    reload_requested = False
+
+    def handle_reload(signum: int, frame: object) -> None:
+        # Only flag it: the file is read between frames, not in the middle of one
+        nonlocal reload_requested
+        reload_requested = True
+
     signal.signal(signal.SIGINT, handle_signal)
     signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGHUP, handle_reload)
 
     camera.start()
-    logger.info("Motion detector started")
+    # OpenCV is the biggest import on the detection path; load it while the sensor settles
+    from motion_cam.background import SAVE_INTERVAL, load_background, save_background
+    from motion_cam.detector import STAGE_HELP, STAGE_SECONDS, MotionDetector
 
-    storage.enforce_retention()
+    detector = MotionDetector(
+        config.detection, metrics=metrics, frame_interval=1.0 / config.camera.framerate
+    )
+    width, height = config.camera.lores_resolution
+    saved_background = load_background(data_dir, (height, width))
+    if saved_background is not None:
+        detector.seed(saved_background)
+    logger.info("Motion detector started")
 
+    capture_timer = None
+    if metrics is not None:
+        capture_timer = metrics.histogram(STAGE_SECONDS, STAGE_HELP, stage="capture")
     last_motion_time = 0.0
     last_retention_check = time.time()
+    last_background_save = time.monotonic()
+    frame_stats = FrameStats(metrics=metrics)
+
+    detection = config.detection
 
     try:
         while not shutdown:
-            frame = camera.capture_lores_frame()
-            event = detector.process_frame(frame)
+            if reload_requested:
+                reload_requested = False
+                try:
+                    settings.reload()
+                    logger.info("Reloaded detection settings from %s", env_file)
+                except (OSError, ValueError) as e:
+                    logger.warning("Settings reload failed, keeping current values: %s", e)
+            changed = settings.take_pending()
+            if changed is not None:
+                # Between frames, so no frame sees a mix of old and new values
+                detector.update_config(changed)
+                recorder.update_config(changed)
+                detection = changed
+                logger.info("Detection settings applied: %s", changed)
+
+            started = time.perf_counter() if capture_timer is not None else 0.0
+            # The frame is a view into the camera's buffer, handed back when the block exits
+            with camera.map_lores() as frame:
+                if capture_timer is not None:
+                    # Includes waiting for the frame, so it shows when the camera is the bottleneck
+                    capture_timer.observe(time.perf_counter() - started)
+                dt = frame_stats.begin(frame)
+                event = detector.process_frame(frame.pixels, dt=dt)
+            window = frame_stats.end(frame)
+            if not first_frame.is_set():
+                logger.info("First frame analyzed %.2f s after boot", time.monotonic() - boot)
+                if detector.seeded:
+                    logger.info("Background model restored from the last run")
+                elif detector.seeded is False:
+                    logger.info("Saved background no longer matches the scene, learning afresh")
+                first_frame.set()
+            if window is not None:
+                live.publish(
+                    fps=round(window.fps, 1),
+                    dropped_frames=window.dropped,
+                    latency_ms=round(window.latency_ms, 1),
+                )
 
             if event.detected:
                 last_motion_time = time.time()
+                live.publish(last_motion={**asdict(event), "time": last_motion_time})
                 if not recorder.is_recording:
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     logger.info(
@@ -72,24 +257,50 @@ def main() -> None:
                     recorder.start_recording(timestamp)
             elif recorder.is_recording:
                 elapsed_since_motion = time.time() - last_motion_time
-                if elapsed_since_motion >= config.detection.cooldown:
+                if elapsed_since_motion >= detection.cooldown:
                     logger.info("Motion stopped, finalizing clip...")
                     recorder.stop_recording()
 
             recorder.check_max_duration()
+            live.publish(
+                state="recording" if recorder.is_recording else "watching",
+                recording_elapsed=round(recorder.elapsed) if recorder.is_recording else None,
+            )
 
             # Periodic retention check (every 10 minutes)
             if time.time() - last_retention_check >= 600:
-                storage.enforce_retention()
+                housekeeping.submit("retention", lambda job: storage.enforce_retention())
                 last_retention_check = time.time()
 
-            # Sleep to maintain approximate frame rate
-            time.sleep(1.0 / config.camera.framerate)
+            if time.monotonic() - last_background_save >= SAVE_INTERVAL:
+                # Copied here between frames; only the write happens on the worker
+                background = detector.background_image()
+                background_jobs.submit(
+                    "background", lambda job, image=background: save_background(data_dir, image)
+                )
+                last_background_save = time.monotonic()
     finally:
         if recorder.is_recording:
             logger.info("Stopping active recording...")
             recorder.stop_recording()
+        stopping.set()
+        first_frame.set()
+        services.join(timeout=SERVICES_JOIN_TIMEOUT)
+        if web_server is not None:
+            web_server.stop()
+        if telemetry is not None:
+            telemetry.stop()
         camera.stop()
+        # A periodic save still writing would race the final one for the temp file
+        background_jobs.wait(timeout=5)
+        background = detector.background_image()
+        if background is not None:
+            try:
+                save_background(data_dir, background)
+            except OSError as e:
+                logger.warning("Could not save the background model: %s", e)
+        # Let the final clip finish finalizing before the process exits
+        jobs.wait(timeout=30)
         logger.info("Shutdown complete")
 
 
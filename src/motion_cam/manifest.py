@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+MANIFEST_NAME = ".clips.json"
+
+# Clip lifecycle states. A clip that has finished finalizing is "complete"
+# and is dropped from the manifest, so the file only ever lists in-flight work.
+RECORDING = "recording"
+FINALIZING = "finalizing"
+COMPLETE = "complete"
+
+
+class ClipManifest:
+    """Small on-disk record of clips that are still being recorded or finalized."""
+
+    def __init__(self, data_dir: str) -> None:
+        self._path = Path(data_dir) / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] = self._load()
+
+    def _load(self) -> dict[str, str]:
+        try:
+            data = json.loads(self._path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return {str(ts): str(state) for ts, state in data.items()}
+
+    def _save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(self._path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path)
+
+    def mark(self, timestamp: str, state: str) -> None:
+        with self._lock:
+            if state == COMPLETE:
+                if self._entries.pop(timestamp, None) is None:
+                    return
+            else:
+                self._entries[timestamp] = state
+            self._save()
+
+    def state(self, timestamp: str) -> str:
+        with self._lock:
+            return self._entries.get(timestamp, COMPLETE)
+
+    def pending(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._entries)
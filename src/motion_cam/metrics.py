@@ -0,0 +1,135 @@
+"""Fixed-bucket timing histograms and counters rendered in the Prometheus text format.
+
+Instrumented code takes an optional ``Registry``. With none (METRICS_ENABLED
+off), there are no clock reads or hooks at all. Observing is one bisect and
+three additions under a lock, which is small next to the millisecond-scale
+stages being timed.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a sub-millisecond blur up to a multi-second retention sweep
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels: tuple[tuple[str, str], ...]) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+
+
+class Histogram:
+    """Counts of observations at or below each bucket bound, plus their sum."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        """(cumulative bucket counts including +Inf, sum, count)."""
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total, running
+
+
+class Counter:
+    """A monotonically increasing total."""
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Registry:
+    """Named, labelled histograms and counters and their text exposition."""
+
+    def __init__(self) -> None:
+        self._help: dict[str, str] = {}
+        self._series: dict[str, dict[tuple[tuple[str, str], ...], Histogram | Counter]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, help: str, labels: dict[str, str], factory):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, help)
+            series = self._series.setdefault(name, {})
+            metric = series.get(key)
+            if metric is None:
+                metric = series[key] = factory()
+            return metric
+
+    def histogram(
+        self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **labels: str
+    ) -> Histogram:
+        """The histogram for ``name`` and ``labels``, created on first use."""
+        return self._get(name, help, labels, lambda: Histogram(buckets))
+
+    def counter(self, name: str, help: str, **labels: str) -> Counter:
+        """The counter for ``name`` and ``labels``, created on first use."""
+        return self._get(name, help, labels, Counter)
+
+    def render(self) -> str:
+        with self._lock:
+            families = [(name, self._help[name], dict(series)) for name, series in sorted(self._series.items())]
+        lines = []
+        for name, help, series in families:
+            is_counter = isinstance(next(iter(series.values())), Counter)
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {'counter' if is_counter else 'histogram'}")
+            for labels, metric in sorted(series.items()):
+                prefix = _label_text(labels)
+                suffix = f"{{{prefix}}}" if prefix else ""
+                if is_counter:
+                    lines.append(f"{name}{suffix} {repr(metric.value)}")
+                    continue
+                counts, total, count = metric.snapshot()
+                sep = "," if prefix else ""
+                for bound, c in zip(metric.buckets + (math.inf,), counts):
+                    lines.append(f'{name}_bucket{{{prefix}{sep}le="{_format_bound(bound)}"}} {c}')
+                lines.append(f"{name}_sum{suffix} {repr(total)}")
+                lines.append(f"{name}_count{suffix} {count}")
+        return "\n".join(lines) + "\n"
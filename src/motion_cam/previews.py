@@ -0,0 +1,166 @@
+"""Scrub previews: a tile mosaic of frames every few seconds plus a WebVTT track.
+
+The clip detail page reads the track to show a frame while hovering the seek
+bar. Generation is background work that must never compete with recording: it
+runs ffmpeg at the lowest CPU priority on a single thread, waits while the
+recorder is busy, and abandons a run (to retry later) if a recording starts.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = (160, 90)
+COLUMNS = 10
+MOSAIC_SUFFIX = "_scrub.jpg"
+TRACK_SUFFIX = "_scrub.vtt"
+# Wall-clock cap per clip, and how often a run checks whether it should yield
+TIMEOUT = 300.0
+POLL_INTERVAL = 1.0
+MAX_ATTEMPTS = 5
+
+_DAY_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+BusyCheck = Callable[[], bool]
+
+
+def preview_paths(mp4: Path) -> tuple[Path, Path]:
+    stem = mp4.with_suffix("")
+    return stem.with_name(stem.name + MOSAIC_SUFFIX), stem.with_name(stem.name + TRACK_SUFFIX)
+
+
+def _probe_duration(mp4: Path) -> float | None:
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            str(mp4),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def _timestamp(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def build_track(mosaic_name: str, duration: float, interval: float) -> str:
+    """WebVTT cues mapping each interval to its tile via a ``#xywh`` fragment."""
+    w, h = TILE_SIZE
+    lines = ["WEBVTT", ""]
+    for i in range(math.ceil(duration / interval)):
+        start, end = i * interval, min((i + 1) * interval, duration)
+        row, column = divmod(i, COLUMNS)
+        lines += [
+            f"{_timestamp(start)} --> {_timestamp(end)}",
+            f"{mosaic_name}#xywh={column * w},{row * h},{w},{h}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def _run_unless_busy(cmd: list[str], busy: BusyCheck, timeout: float) -> int | None:
+    """Run ``cmd`` and return its exit code, or None if it was stopped because ``busy()``."""
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return proc.wait(timeout=POLL_INTERVAL)
+        except subprocess.TimeoutExpired:
+            yielded = busy()
+            if yielded or time.monotonic() > deadline:
+                proc.kill()
+                returncode = proc.wait()
+                return None if yielded else returncode
+
+
+def generate(mp4: Path, interval: float, busy: BusyCheck = lambda: False) -> bool | None:
+    """Write the mosaic and track for ``mp4``.
+
+    Returns True on success, False if the clip cannot be previewed, and None if
+    the run yielded to ``busy()`` and should be retried.
+    """
+    duration = _probe_duration(mp4)
+    if not duration:
+        return False
+    mosaic, track = preview_paths(mp4)
+    count = math.ceil(duration / interval)
+    rows = math.ceil(count / COLUMNS)
+    w, h = TILE_SIZE
+    tmp = mosaic.with_name(mosaic.name + ".tmp.jpg")
+    cmd = [
+        "nice", "-n", "19",
+        "ffmpeg", "-y", "-nostdin", "-threads", "1", "-i", str(mp4), "-an",
+        "-vf", f"fps=1/{interval},scale={w}:{h},tile={COLUMNS}x{rows}",
+        "-filter_threads", "1", "-threads", "1",
+        "-frames:v", "1", "-q:v", "5", str(tmp),
+    ]
+    returncode = _run_unless_busy(cmd, busy, TIMEOUT)
+    if returncode != 0 or not tmp.exists():
+        tmp.unlink(missing_ok=True)
+        return None if returncode is None else False
+    os.replace(tmp, mosaic)
+    # The track goes last: its presence is what tells the web portal a preview exists
+    tmp_track = track.with_name(track.name + ".tmp")
+    tmp_track.write_text(build_track(mosaic.name, duration, interval))
+    os.replace(tmp_track, track)
+    return True
+
+
+def generate_when_idle(mp4: Path, interval: float, busy: BusyCheck) -> bool:
+    """Generate a preview, waiting out and yielding to ``busy()``. Returns success."""
+    for _ in range(MAX_ATTEMPTS):
+        while busy():
+            time.sleep(POLL_INTERVAL)
+        if not mp4.exists():
+            return False
+        result = generate(mp4, interval, busy)
+        if result is not None:
+            return result
+        logger.info("Scrub preview of %s deferred while recording", mp4.name)
+    return False
+
+
+def missing(data_dir: str) -> list[Path]:
+    """Clips that have no scrub preview yet, oldest first."""
+    root = Path(data_dir)
+    if not root.exists():
+        return []
+    clips = []
+    for day_dir in sorted(p for p in root.iterdir() if p.is_dir() and _DAY_DIR_RE.match(p.name)):
+        for mp4 in sorted(day_dir.glob("*.mp4")):
+            if not preview_paths(mp4)[1].exists():
+                clips.append(mp4)
+    return clips
+
+
+def backfill(
+    data_dir: str,
+    interval: float,
+    busy: BusyCheck,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """Generate previews for every clip that lacks one. Returns the number written."""
+    clips = missing(data_dir)
+    written = 0
+    for i, mp4 in enumerate(clips, start=1):
+        written += generate_when_idle(mp4, interval, busy)
+        if progress is not None:
+            progress(i, len(clips))
+    return written
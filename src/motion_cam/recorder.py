@@ -1,11 +1,50 @@
 from __future__ import annotations
 
+import logging
+import os
 import subprocess
 import time
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
+from typing import Callable
 
 from motion_cam.camera import CameraProtocol
 from motion_cam.config import DetectionConfig, StorageConfig
+from motion_cam.jobs import Job, JobManager
+from motion_cam.manifest import COMPLETE, FINALIZING, RECORDING, ClipManifest
+from motion_cam.metrics import Registry
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_SUFFIX = ".partial"
+RECORDER_SECONDS = "motion_cam_recorder_seconds"
+RECORDER_HELP = "Time taken to start, stop and finalize a recording."
+
+
+def _clip_paths(data_dir: str, timestamp: str) -> tuple[Path, Path, Path, Path]:
+    """Return (partial, mp4, snapshot, thumbnail) paths for a clip."""
+    # Parse timestamp "YYYYMMDD_HHMMSS" into date directory "YYYY-MM-DD"
+    date_str = f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
+    date_dir = Path(data_dir) / date_str
+    mp4 = date_dir / f"{timestamp}.mp4"
+    return (
+        mp4.with_name(mp4.name + PARTIAL_SUFFIX),
+        mp4,
+        date_dir / f"{timestamp}_snap.jpg",
+        date_dir / f"{timestamp}_thumb.jpg",
+    )
+
+
+def _generate_thumbnail(video_path: str, thumb_path: str) -> None:
+    # Frame at 0.5s
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-i", video_path,
+            "-ss", "0.5", "-frames:v", "1",
+            thumb_path,
+        ],
+        capture_output=True,
+    )
 
 
 class Recorder:
@@ -14,31 +53,59 @@ class Recorder:
         camera: CameraProtocol,
         storage_config: StorageConfig,
         detection_config: DetectionConfig,
+        manifest: ClipManifest | None = None,
+        jobs: JobManager | None = None,
+        on_clip_complete: Callable[[str], None] | None = None,
+        metrics: Registry | None = None,
     ) -> None:
         self._camera = camera
         self._storage_config = storage_config
         self._detection_config = detection_config
+        self._manifest = manifest or ClipManifest(storage_config.data_dir)
+        # Finalization runs inline when no job manager is given
+        self._jobs = jobs
+        self._on_clip_complete = on_clip_complete
         self._recording = False
         self._start_time: float = 0.0
+        self._timestamp: str = ""
+        self._partial_path: str = ""
         self._mp4_path: str = ""
         self._thumb_path: str = ""
+        self._timers = None
+        if metrics is not None:
+            self._timers = {
+                op: metrics.histogram(RECORDER_SECONDS, RECORDER_HELP, op=op)
+                for op in ("start", "stop", "finalize")
+            }
+
+    def _timed(self, op: str) -> AbstractContextManager:
+        return nullcontext() if self._timers is None else self._timers[op].time()
 
     @property
     def is_recording(self) -> bool:
         return self._recording
 
+    @property
+    def elapsed(self) -> float:
+        """Seconds into the current recording, 0 when idle."""
+        if not self._recording:
+            return 0.0
+        return time.time() - self._start_time
+
     def start_recording(self, timestamp: str) -> None:
-        # Parse timestamp "YYYYMMDD_HHMMSS" into date directory "YYYY-MM-DD"
-        date_str = f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
-        date_dir = Path(self._storage_config.data_dir) / date_str
-        date_dir.mkdir(parents=True, exist_ok=True)
+        partial, mp4, snap, thumb = _clip_paths(self._storage_config.data_dir, timestamp)
+        mp4.parent.mkdir(parents=True, exist_ok=True)
 
-        self._mp4_path = str(date_dir / f"{timestamp}.mp4")
-        self._thumb_path = str(date_dir / f"{timestamp}_thumb.jpg")
-        snap_path = str(date_dir / f"{timestamp}_snap.jpg")
+        self._timestamp = timestamp
+        self._partial_path = str(partial)
+        self._mp4_path = str(mp4)
+        self._thumb_path = str(thumb)
 
-        self._camera.capture_snapshot(snap_path)
-        self._camera.start_recording(self._mp4_path)
+        with self._timed("start"):
+            self._manifest.mark(timestamp, RECORDING)
+            self._camera.capture_snapshot(str(snap))
+            # Record under a .partial name so an interrupted clip is never listed
+            self._camera.start_recording(self._partial_path)
         self._start_time = time.time()
         self._recording = True
 
@@ -47,21 +114,90 @@ class Recorder:
             return
 
         self._recording = False
-        self._camera.stop_recording()
+        with self._timed("stop"):
+            self._camera.stop_recording()
+            self._manifest.mark(self._timestamp, FINALIZING)
 
-        # Generate thumbnail from video (frame at 0.5s)
-        subprocess.run(
-            [
-                "ffmpeg", "-y", "-i", self._mp4_path,
-                "-ss", "0.5", "-frames:v", "1",
-                self._thumb_path,
-            ],
-            capture_output=True,
-        )
+        args = (self._timestamp, self._partial_path, self._mp4_path, self._thumb_path)
+        self._submit("finalize", lambda job: self._finalize(*args))
+
+    def _finalize(self, timestamp: str, partial: str, mp4: str, thumb: str) -> None:
+        with self._timed("finalize"):
+            _generate_thumbnail(partial, thumb)
+            if os.path.exists(partial):
+                from motion_cam.faststart import faststart_in_place
+
+                # Index first, so browsers can start playback without fetching the tail
+                faststart_in_place(partial)
+                # Atomic publish: the clip appears under its final name fully written
+                os.replace(partial, mp4)
+            else:
+                logger.warning("Recording %s produced no video file", timestamp)
+            self._manifest.mark(timestamp, COMPLETE)
+        if self._on_clip_complete is not None and os.path.exists(mp4):
+            self._on_clip_complete(timestamp)
+
+    def update_config(self, detection_config: DetectionConfig) -> None:
+        """Apply a new clip length limit, including to a clip already recording."""
+        self._detection_config = detection_config
 
     def check_max_duration(self) -> None:
         if not self._recording:
             return
-        elapsed = time.time() - self._start_time
-        if elapsed >= self._detection_config.max_clip_duration:
+        if self.elapsed >= self._detection_config.max_clip_duration:
             self.stop_recording()
+
+    def reconcile(self) -> int:
+        """Resolve clips left unfinished by a crash, using only the manifest.
+
+        Returns the number of partial clips handed to the repair job.
+        """
+        data_dir = self._storage_config.data_dir
+        repairs = 0
+        for timestamp in self._manifest.pending():
+            partial, mp4, snap, thumb = _clip_paths(data_dir, timestamp)
+            if mp4.exists():
+                # Crashed after the rename but before the manifest update
+                self._manifest.mark(timestamp, COMPLETE)
+            elif partial.exists() and partial.stat().st_size > 0:
+                logger.info("Queueing repair of interrupted clip %s", timestamp)
+                self._submit("repair", lambda job, ts=timestamp: self._repair(ts))
+                repairs += 1
+            else:
+                logger.info("Discarding empty interrupted clip %s", timestamp)
+                for p in (partial, snap, thumb):
+                    p.unlink(missing_ok=True)
+                self._manifest.mark(timestamp, COMPLETE)
+        return repairs
+
+    def _repair(self, timestamp: str) -> bool:
+        partial, mp4, snap, thumb = _clip_paths(self._storage_config.data_dir, timestamp)
+        repaired = mp4.with_name(mp4.name + ".repair")
+        # Remuxing rewrites the index; it fails if the moov atom was never written
+        result = subprocess.run(
+            [
+                "ffmpeg", "-y", "-i", str(partial),
+                "-c", "copy", "-movflags", "+faststart", "-f", "mp4", str(repaired),
+            ],
+            capture_output=True,
+        )
+        ok = result.returncode == 0 and repaired.exists()
+        if ok:
+            _generate_thumbnail(str(repaired), str(thumb))
+            os.replace(repaired, mp4)
+            partial.unlink(missing_ok=True)
+            logger.info("Repaired interrupted clip %s", timestamp)
+            if self._on_clip_complete is not None:
+                self._on_clip_complete(timestamp)
+        else:
+            logger.warning("Interrupted clip %s is not recoverable, discarding", timestamp)
+            for p in (partial, repaired, snap, thumb):
+                p.unlink(missing_ok=True)
+        self._manifest.mark(timestamp, COMPLETE)
+        return ok
+
+    def _submit(self, kind: str, fn: Callable[[Job | None], object]) -> None:
+        if self._jobs is None:
+            fn(None)
+        else:
+            self._jobs.submit(kind, fn)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from flask import Flask
+
+from motion_cam.config import WebConfig
+
+logger = logging.getLogger(__name__)
+
+# Below waitress's 1 MiB outbuf_overflow, which is where buffers spill to disk
+OUTBUF_HIGH_WATERMARK = 512 * 1024
+
+
+class WebServer:
+    """Serves the Flask app in-process on a background thread.
+
+    "waitress" runs a production WSGI server with a fixed worker pool: idle
+    keep-alive connections are parked on its event loop and only active
+    requests occupy a worker thread. Open tuner streams and event feeds hold
+    theirs for as long as they are connected, so the app caps them below
+    ``threads`` (``WebConfig.stream_limit``). "dev" uses Werkzeug's
+    development server.
+    """
+
+    def __init__(self, app: Flask, config: WebConfig) -> None:
+        self._app = app
+        self._config = config
+        self._server = None
+        self._thread: threading.Thread | None = None
+        self.mode = config.server
+
+    @property
+    def port(self) -> int:
+        """The bound port, useful when configured with port 0."""
+        if self.mode == "waitress":
+            # waitress reports it as it was parsed, which may be a string
+            return int(self._server.effective_port)
+        return self._server.server_port
+
+    def start(self) -> None:
+        if self.mode == "waitress":
+            try:
+                self._server = self._create_waitress()
+            except ImportError:
+                logger.warning("waitress is not installed, falling back to the dev server")
+                self.mode = "dev"
+        if self.mode != "waitress":
+            self.mode = "dev"
+            self._server = self._create_dev()
+            target = self._server.serve_forever
+        else:
+            target = self._server.run
+
+        self._thread = threading.Thread(target=target, name="web-server", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Web portal started on %s:%d (%s)", self._config.host, self.port, self.mode
+        )
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        if self.mode == "waitress":
+            server = self._server
+            # waitress has no documented way to stop a running server. These
+            # attributes are internals of waitress 3.0 (MultiSocketServer and
+            # its asyncore loop); each is looked up defensively so a release
+            # that drops one degrades to closing the listener and the join below.
+            channels = getattr(server, "active_channels", {})
+            trigger = getattr(server, "trigger", None)
+            dispatcher = getattr(server, "task_dispatcher", None)
+
+            def close() -> None:
+                for channel in list(channels.values()):
+                    channel.close()
+                # The listener and the trigger; the loop exits once nothing is left open
+                server.close()
+
+            if trigger is not None:
+                # Close sockets from the loop thread itself; closing them from here
+                # races with the select() call and the loop dies on a bad descriptor
+                trigger.pull_trigger(close)
+            else:
+                server.close()
+            self._thread.join(timeout=5)
+            if dispatcher is not None:
+                dispatcher.shutdown(timeout=1)
+        else:
+            self._server.shutdown()
+        self._server = None
+
+    def _create_waitress(self):
+        from waitress import create_server
+
+        return create_server(
+            self._app,
+            host=self._config.host,
+            port=self._config.port,
+            threads=self._config.threads,
+            connection_limit=self._config.connection_limit,
+            channel_timeout=self._config.keepalive_timeout,
+            # Block streaming responses (exports, streams) before waitress's output
+            # buffer would overflow into a temp file, so they stay in bounded memory
+            outbuf_high_watermark=OUTBUF_HIGH_WATERMARK,
+            ident="motion-cam",
+        )
+
+    def _create_dev(self):
+        from werkzeug.serving import make_server
+
+        return make_server(self._config.host, self._config.port, self._app, threaded=True)
@@ -0,0 +1,84 @@
+"""Detection settings that can change while the service runs.
+
+The settings page and a SIGHUP reload of the ``.env`` file both submit a new
+``DetectionConfig`` here. The main loop picks it up between frames and hands
+it to the detector and recorder, so a frame is never processed with a mix of
+old and new values. The MOG2 background model is kept, so nothing has to be
+re-learned. Every other setting (camera, storage, web) still needs a restart.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import fields, replace
+from typing import Any, Mapping
+
+from motion_cam.config import DetectionConfig, load_detection_config
+
+EDITABLE = tuple(f.name for f in fields(DetectionConfig))
+
+
+def _coerce(name: str, value: Any, current: Any) -> int | float:
+    # JSON numbers only; bool is an int subclass but never a valid setting
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    # JSON parsing lets NaN and Infinity through, and int() of a huge float overflows
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    if isinstance(current, int):
+        if value != int(value):
+            raise ValueError(f"{name} must be a whole number")
+        return int(value)
+    return float(value)
+
+
+class DetectionSettings:
+    """The latest accepted detection settings and any change not yet applied."""
+
+    def __init__(self, config: DetectionConfig, env_file: str = "") -> None:
+        self._current = config
+        self._pending: DetectionConfig | None = None
+        self._env_file = env_file
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> DetectionConfig:
+        """What the detector uses, or will from the next frame."""
+        return self._current
+
+    def _submit(self, config: DetectionConfig) -> DetectionConfig:
+        with self._lock:
+            self._current = self._pending = config
+        return config
+
+    def update(self, changes: Mapping[str, Any]) -> DetectionConfig:
+        """Validate and queue a partial update; raises ValueError and keeps the old settings."""
+        unknown = sorted(set(changes) - set(EDITABLE))
+        if unknown:
+            raise ValueError(f"Unknown setting(s): {', '.join(unknown)}")
+        with self._lock:
+            current = self._current
+            coerced = {k: _coerce(k, v, getattr(current, k)) for k, v in changes.items()}
+            self._current = self._pending = replace(current, **coerced)
+            return self._current
+
+    def reload(self) -> DetectionConfig:
+        """Re-read detection settings from the env file.
+
+        Keys missing from the file fall back to their defaults, as on a fresh
+        start. Raises OSError if the file can't be read, or ValueError for bad
+        values; either way the current settings stay in effect.
+        """
+        from dotenv import dotenv_values
+
+        if not self._env_file:
+            raise FileNotFoundError("No env file configured")
+        with open(self._env_file) as f:
+            values = dotenv_values(stream=f)
+        return self._submit(load_detection_config({k: v for k, v in values.items() if v is not None}))
+
+    def take_pending(self) -> DetectionConfig | None:
+        """The change submitted since the last call, if any (called between frames)."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        return pending
@@ -0,0 +1,272 @@
+"""Simulated camera: replays a video file or a synthetic scene instead of picamera2.
+
+``SimulatedCamera`` implements ``CameraProtocol`` and the tuner's preview and
+control methods, so the whole pipeline (detector, recorder, storage, web
+portal) runs on any Linux box. Frames are picked by a scene clock that can run
+faster than wall time. Recordings are real MP4 files written with OpenCV, and
+snapshots are real JPEGs.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Protocol
+
+import cv2
+import numpy as np
+
+from motion_cam.camera import Frame, MappedFrame, encode_preview
+from motion_cam.config import PREVIEW_PROFILES, CameraConfig, PreviewProfile
+
+# H.264 when OpenCV's FFmpeg has an encoder for it, otherwise MPEG-4 Part 2
+RECORD_FOURCCS = ("avc1", "mp4v")
+
+
+class FrameSource(Protocol):
+    def render(self, t: float, size: tuple[int, int]) -> np.ndarray:
+        """The frame at scene time ``t`` seconds, as grayscale or BGR at ``size``."""
+        ...
+
+
+class SyntheticScene:
+    """A textured floor that dark blobs cross in bursts, under IR-like noise and a slow lighting ramp.
+
+    Each frame depends only on its time and the seed, so runs are reproducible.
+    The scene is laid out in fractions of the frame, so the main and lores
+    streams show the same picture.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        blobs: int = 3,
+        burst_every: float = 60.0,
+        burst_length: float = 10.0,
+        noise: int = 6,
+        light_period: float = 300.0,
+        light_depth: float = 0.2,
+    ) -> None:
+        self._seed = seed
+        self._blobs = blobs
+        self._burst_every = burst_every
+        self._burst_length = burst_length
+        self._noise = noise
+        self._light_period = light_period
+        self._light_depth = light_depth
+        self._floors: dict[tuple[int, int], np.ndarray] = {}
+
+    def _floor(self, size: tuple[int, int]) -> np.ndarray:
+        floor = self._floors.get(size)
+        if floor is None:
+            # Coarse random texture blown up smoothly, the same at every size
+            coarse = np.random.default_rng(self._seed).uniform(80, 140, (12, 16)).astype(np.float32)
+            floor = self._floors[size] = cv2.resize(coarse, size, interpolation=cv2.INTER_CUBIC)
+        return floor
+
+    def blobs_at(self, t: float) -> list[tuple[float, float]]:
+        """Centres of the blobs on screen at ``t``, as fractions of width and height."""
+        burst, offset = divmod(t, self._burst_every)
+        if offset >= self._burst_length:
+            return []
+        progress = offset / self._burst_length
+        rng = np.random.default_rng((self._seed, int(burst)))
+        centres = []
+        for _ in range(self._blobs):
+            y0, y1 = rng.uniform(0.15, 0.85, 2)
+            # Each blob crosses the frame once, left to right or right to left
+            x = -0.1 + 1.2 * progress if rng.random() < 0.5 else 1.1 - 1.2 * progress
+            centres.append((x, y0 + (y1 - y0) * progress))
+        return centres
+
+    def render(self, t: float, size: tuple[int, int]) -> np.ndarray:
+        w, h = size
+        frame = self._floor(size).copy()
+        for x, y in self.blobs_at(t):
+            axes = (max(1, round(0.06 * w)), max(1, round(0.035 * w)))
+            cv2.ellipse(frame, (round(x * w), round(y * h)), axes, 0, 0, 360, 25.0, -1)
+        frame *= 1.0 + self._light_depth * math.sin(2 * math.pi * t / self._light_period)
+        if self._noise:
+            rng = np.random.default_rng((self._seed, round(t * 1000)))
+            frame += rng.integers(-self._noise, self._noise + 1, (h, w)).astype(np.float32)
+        return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+class VideoSource:
+    """Loops a video file, picking frames by time at the file's own frame rate."""
+
+    def __init__(self, path: str) -> None:
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise ValueError(f"Cannot open video {path!r}")
+        self._count = int(self._capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if self._count <= 0:
+            raise ValueError(f"Video {path!r} has no frames")
+        self._fps = self._capture.get(cv2.CAP_PROP_FPS) or 15.0
+        self._index = -1
+        self._frame: np.ndarray | None = None
+        # The detector, recorder and tuner all read from one decoder
+        self._lock = threading.Lock()
+
+    def _decode(self, index: int) -> np.ndarray:
+        if index != self._index:
+            if not 0 < index - self._index <= self._fps:
+                # Backwards (looped) or far ahead: seek instead of decoding through
+                self._capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+                self._index = index - 1
+            while self._index < index:
+                ok, frame = self._capture.read()
+                if not ok:
+                    break
+                self._index, self._frame = self._index + 1, frame
+            self._index = index
+        if self._frame is None:
+            raise ValueError("Video yielded no frames")
+        return self._frame
+
+    def render(self, t: float, size: tuple[int, int]) -> np.ndarray:
+        with self._lock:
+            frame = self._decode(int(t * self._fps) % self._count)
+        if (frame.shape[1], frame.shape[0]) != size:
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return frame
+
+
+def _gray(frame: np.ndarray) -> np.ndarray:
+    return frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def _bgr(frame: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR) if frame.ndim == 2 else frame
+
+
+class _Recording:
+    """Writes every scene frame from the start index to an MP4 until stopped."""
+
+    def __init__(self, camera: SimulatedCamera, path: str) -> None:
+        self._camera = camera
+        self._path = path
+        # VideoWriter picks the container from the extension; recorder paths end in .partial
+        self._tmp = f"{path}.sim.mp4"
+        size = camera.config.main_resolution
+        for fourcc in RECORD_FOURCCS:
+            self._writer = cv2.VideoWriter(
+                self._tmp, cv2.VideoWriter_fourcc(*fourcc), camera.config.framerate, size
+            )
+            if self._writer.isOpened():
+                break
+        else:
+            raise RuntimeError("OpenCV has no MP4 encoder available")
+        self._next = camera.frame_index()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sim-recording", daemon=True)
+        self._thread.start()
+
+    def _write_until(self, index: int) -> None:
+        while self._next <= index:
+            self._writer.write(_bgr(self._camera.render(self._next, self._camera.config.main_resolution)))
+            self._next += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._camera.frame_period):
+            self._write_until(self._camera.frame_index())
+
+    def finish(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._write_until(self._camera.frame_index())
+        self._writer.release()
+        os.replace(self._tmp, self._path)
+
+
+class SimulatedCamera:
+    """Camera backend fed by a ``FrameSource`` on a scene clock ``speed`` times wall time."""
+
+    def __init__(self, config: CameraConfig, source: FrameSource | None = None) -> None:
+        self.config = config
+        if source is None:
+            source = VideoSource(config.sim_source) if config.sim_source else SyntheticScene()
+        self._source = source
+        self._speed = config.sim_speed
+        self._interval = 1.0 / config.framerate
+        self._started = time.monotonic()
+        self._last_index = -1
+        self._recording: _Recording | None = None
+        self._controls: dict = {}
+
+    @property
+    def frame_period(self) -> float:
+        """Wall-clock seconds between frames."""
+        return self._interval / self._speed
+
+    @property
+    def controls(self) -> dict:
+        return dict(self._controls)
+
+    def scene_time(self) -> float:
+        return (time.monotonic() - self._started) * self._speed
+
+    def frame_index(self) -> int:
+        return int(self.scene_time() / self._interval)
+
+    def render(self, index: int, size: tuple[int, int]) -> np.ndarray:
+        return self._source.render(index * self._interval, size)
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        self._last_index = -1
+
+    def stop(self) -> None:
+        self.stop_recording()
+
+    def capture_lores(self) -> Frame:
+        """The next frame, owning its pixels; backs map_lores and capture_lores_frame."""
+        # Like capture_request: block for the next frame; frames a slow caller misses are dropped
+        index = max(self._last_index + 1, self.frame_index())
+        exposure = self._started + index * self.frame_period
+        delay = exposure - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._last_index = index
+        pixels = _gray(self.render(index, self.config.lores_resolution))
+        return Frame(pixels=pixels, sequence=index, timestamp=exposure)
+
+    @contextmanager
+    def map_lores(self) -> Iterator[MappedFrame]:
+        # Same lifetime rules as the camera's mapped buffer, so misuse shows up off-device too
+        frame = self.capture_lores()
+        mapped = MappedFrame(frame.pixels, frame.sequence, frame.timestamp)
+        try:
+            yield mapped
+        finally:
+            mapped.release()
+
+    def capture_lores_frame(self) -> np.ndarray:
+        return self.capture_lores().pixels
+
+    def capture_jpeg_frame(self, profile: PreviewProfile | None = None) -> bytes:
+        profile = profile or PREVIEW_PROFILES["full"]
+        # The current frame, without disturbing the detector's frame sequence
+        if profile.source == "lores":
+            arr = _gray(self.render(self.frame_index(), self.config.lores_resolution))
+        else:
+            arr = _bgr(self.render(self.frame_index(), self.config.main_resolution))
+        return encode_preview(arr, profile)
+
+    def set_controls(self, controls: dict) -> None:
+        self._controls.update(controls)
+
+    def capture_snapshot(self, path: str) -> None:
+        frame = _bgr(self.render(self.frame_index(), self.config.main_resolution))
+        if not cv2.imwrite(path, frame):
+            raise RuntimeError(f"Could not write snapshot {path}")
+
+    def start_recording(self, path: str) -> None:
+        self._recording = _Recording(self, path)
+
+    def stop_recording(self) -> None:
+        if self._recording is not None:
+            self._recording.finish()
+            self._recording = None
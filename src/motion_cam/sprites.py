@@ -0,0 +1,257 @@
+"""Per-day thumbnail sprite sheets, so a gallery page costs one or two image requests.
+
+Each day directory gets a ``sprites/`` folder holding JPEG sheets of fixed-size
+tiles and an ``index.json`` map from clip timestamp to (sheet, slot). Tiles are
+appended as clips arrive; a day is only rebuilt from its thumbnails when the map
+has gone stale (clips deleted, or a sheet missing).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPRITES_DIR = "sprites"
+MAP_NAME = "index.json"
+TILE_SIZE = (320, 180)  # width, height; matches the gallery's 16:9 cards
+COLUMNS = 5
+SHEET_TILES = 50
+JPEG_QUALITY = 80
+
+_DAY_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_THUMB_SUFFIX = "_thumb.jpg"
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class SpriteTile:
+    sheet: str  # path relative to the data dir
+    version: int
+    column: int
+    row: int
+    columns: int
+    rows: int
+
+    @property
+    def background_size(self) -> str:
+        return f"{self.columns * 100}% {self.rows * 100}%"
+
+    @property
+    def background_position(self) -> str:
+        # Percentages place tile edges exactly regardless of the rendered card size
+        x = self.column / (self.columns - 1) * 100 if self.columns > 1 else 0
+        y = self.row / (self.rows - 1) * 100 if self.rows > 1 else 0
+        return f"{x:g}% {y:g}%"
+
+
+def _sheet_name(index: int) -> str:
+    return f"sheet-{index}.jpg"
+
+
+def _empty_map(version: int = 0) -> dict[str, Any]:
+    return {"version": version, "tile": list(TILE_SIZE), "columns": COLUMNS, "sheets": [], "clips": {}}
+
+
+def load_map(day_dir: str | Path) -> dict[str, Any] | None:
+    """The day's sprite map, or None if it has no sprites yet."""
+    try:
+        with open(Path(day_dir) / SPRITES_DIR / MAP_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def tile_for(sprite_map: dict[str, Any], day: str, timestamp: str) -> SpriteTile | None:
+    """Where ``timestamp``'s tile sits in the day's sheets, if it has one."""
+    slot = sprite_map["clips"].get(timestamp)
+    if slot is None:
+        return None
+    sheet, position = slot
+    columns = sprite_map["columns"]
+    count = sprite_map["sheets"][sheet]["count"]
+    return SpriteTile(
+        sheet=f"{day}/{SPRITES_DIR}/{_sheet_name(sheet)}",
+        version=sprite_map["version"],
+        column=position % columns,
+        row=position // columns,
+        columns=columns,
+        rows=-(-count // columns),
+    )
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _save_map(sprites_dir: Path, sprite_map: dict[str, Any]) -> None:
+    _write_atomic(sprites_dir / MAP_NAME, json.dumps(sprite_map).encode())
+
+
+def _render_tile(thumb_path: Path) -> np.ndarray | None:
+    """Center-crop the thumbnail to 16:9 and scale it to TILE_SIZE."""
+    image = cv2.imread(str(thumb_path), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    tile_w, tile_h = TILE_SIZE
+    h, w = image.shape[:2]
+    # Crop like the gallery's object-fit: cover
+    if w * tile_h > h * tile_w:
+        crop_w = h * tile_w // tile_h
+        image = image[:, (w - crop_w) // 2:(w - crop_w) // 2 + crop_w]
+    else:
+        crop_h = w * tile_h // tile_w
+        image = image[(h - crop_h) // 2:(h - crop_h) // 2 + crop_h]
+    return cv2.resize(image, TILE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def _place(sheet: np.ndarray | None, slot: int, tile: np.ndarray) -> np.ndarray:
+    """Paste ``tile`` into ``slot``, growing the sheet by a row when needed."""
+    tile_w, tile_h = TILE_SIZE
+    rows = slot // COLUMNS + 1
+    if sheet is None or sheet.shape[0] < rows * tile_h:
+        grown = np.zeros((rows * tile_h, COLUMNS * tile_w, 3), dtype=np.uint8)
+        if sheet is not None:
+            grown[: sheet.shape[0]] = sheet
+        sheet = grown
+    row, column = divmod(slot, COLUMNS)
+    sheet[row * tile_h:(row + 1) * tile_h, column * tile_w:(column + 1) * tile_w] = tile
+    return sheet
+
+
+def _encode(sheet: np.ndarray) -> bytes:
+    ok, buf = cv2.imencode(".jpg", sheet, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not ok:
+        raise ValueError("JPEG encode failed")
+    return buf.tobytes()
+
+
+def add_clip(data_dir: str, timestamp: str) -> bool:
+    """Append one clip's thumbnail to its day's last sheet. Returns False if it has none."""
+    day = f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
+    return _append(Path(data_dir) / day, timestamp)
+
+
+def _append(day_dir: Path, timestamp: str) -> bool:
+    sprites_dir = day_dir / SPRITES_DIR
+    sprite_map = load_map(day_dir) or _empty_map()
+    if timestamp in sprite_map["clips"]:
+        return True
+    tile = _render_tile(day_dir / f"{timestamp}{_THUMB_SUFFIX}")
+    if tile is None:
+        return False
+
+    sheets = sprite_map["sheets"]
+    if not sheets or sheets[-1]["count"] >= SHEET_TILES:
+        sheets.append({"count": 0})
+        current = None
+    else:
+        # Re-encoding on a fixed block grid is close to lossless for the existing tiles
+        current = cv2.imread(str(sprites_dir / _sheet_name(len(sheets) - 1)), cv2.IMREAD_COLOR)
+        if current is None:
+            return build_day(day_dir) > 0
+    slot = sheets[-1]["count"]
+    sheet = _place(current, slot, tile)
+
+    sprites_dir.mkdir(exist_ok=True)
+    _write_atomic(sprites_dir / _sheet_name(len(sheets) - 1), _encode(sheet))
+    sheets[-1]["count"] += 1
+    sprite_map["clips"][timestamp] = [len(sheets) - 1, slot]
+    sprite_map["version"] += 1
+    _save_map(sprites_dir, sprite_map)
+    return True
+
+
+def _thumb_timestamps(day_dir: Path) -> list[str]:
+    """Timestamps of published clips (mp4 present) that have a thumbnail."""
+    timestamps = []
+    for p in day_dir.iterdir():
+        if p.name.endswith(_THUMB_SUFFIX):
+            timestamp = p.name[: -len(_THUMB_SUFFIX)]
+            if (day_dir / f"{timestamp}.mp4").exists():
+                timestamps.append(timestamp)
+    return sorted(timestamps)
+
+
+def build_day(day_dir: str | Path, progress: ProgressCallback | None = None) -> int:
+    """Rebuild all of a day's sheets from its thumbnails. Returns the tile count."""
+    day_dir = Path(day_dir)
+    sprites_dir = day_dir / SPRITES_DIR
+    previous = load_map(day_dir)
+    timestamps = _thumb_timestamps(day_dir)
+    if previous is None and not timestamps:
+        return 0
+    sprite_map = _empty_map(previous["version"] + 1 if previous else 1)
+    sheets = sprite_map["sheets"]
+    sprites_dir.mkdir(exist_ok=True)
+
+    sheet: np.ndarray | None = None
+    for i, timestamp in enumerate(timestamps, start=1):
+        tile = _render_tile(day_dir / f"{timestamp}{_THUMB_SUFFIX}")
+        if tile is not None:
+            if not sheets or sheets[-1]["count"] >= SHEET_TILES:
+                if sheet is not None:
+                    _write_atomic(sprites_dir / _sheet_name(len(sheets) - 1), _encode(sheet))
+                sheets.append({"count": 0})
+                sheet = None
+            slot = sheets[-1]["count"]
+            sheet = _place(sheet, slot, tile)
+            sheets[-1]["count"] += 1
+            sprite_map["clips"][timestamp] = [len(sheets) - 1, slot]
+        if progress is not None:
+            progress(i, len(timestamps))
+    if sheet is not None:
+        _write_atomic(sprites_dir / _sheet_name(len(sheets) - 1), _encode(sheet))
+
+    keep = {_sheet_name(n) for n in range(len(sheets))}
+    for stale in sprites_dir.glob("sheet-*.jpg"):
+        if stale.name not in keep:
+            stale.unlink(missing_ok=True)
+    _save_map(sprites_dir, sprite_map)
+    return len(sprite_map["clips"])
+
+
+def _sync_day(day_dir: Path) -> bool:
+    """Add missing tiles, or repack the day if its map is stale. True if anything changed."""
+    sprite_map = load_map(day_dir)
+    timestamps = _thumb_timestamps(day_dir)
+    if sprite_map is None:
+        return build_day(day_dir) > 0
+    mapped = set(sprite_map["clips"])
+    sheets_ok = all(
+        (day_dir / SPRITES_DIR / _sheet_name(n)).exists() for n in range(len(sprite_map["sheets"]))
+    )
+    if not sheets_ok or not mapped <= set(timestamps):
+        # Deleted clips leave holes; repack the day rather than serve dead tiles
+        logger.info("Rebuilding sprites for %s", day_dir.name)
+        build_day(day_dir)
+        return True
+    missing = [ts for ts in timestamps if ts not in mapped]
+    for timestamp in missing:
+        _append(day_dir, timestamp)
+    return bool(missing)
+
+
+def backfill(data_dir: str, progress: ProgressCallback | None = None) -> int:
+    """Bring every day's sprites in line with its thumbnails. Returns days changed."""
+    root = Path(data_dir)
+    if not root.exists():
+        return 0
+    days = sorted(p for p in root.iterdir() if p.is_dir() and _DAY_DIR_RE.match(p.name))
+    changed = 0
+    for i, day_dir in enumerate(days, start=1):
+        changed += _sync_day(day_dir)
+        if progress is not None:
+            progress(i, len(days))
+    return changed
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+MAX_EVENTS = 50
+
+
+@dataclass(frozen=True)
+class LiveSnapshot:
+    version: int = 0
+    state: str = "starting"  # starting | watching | recording
+    fps: float = 0.0
+    dropped_frames: int = 0  # in the last second
+    latency_ms: float | None = None  # exposure start to detection done, mean
+    recording_elapsed: float | None = None
+    last_motion: dict[str, Any] | None = None
+    updated: float = field(default_factory=time.time)
+
+
+class LiveState:
+    """Detector state shared between the main loop and web clients without locks.
+
+    The main loop is the only writer of the snapshot and swaps in a new
+    immutable one on each change; readers just take the current reference.
+    Discrete events (such as a new clip) have a single writer too, the job
+    thread, and go into a bounded deque whose appends are atomic. A condition
+    is signalled on every change, so event-feed clients can sleep until there
+    is something to send instead of polling.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = LiveSnapshot()
+        self._events: deque[tuple[int, str, dict[str, Any]]] = deque(maxlen=MAX_EVENTS)
+        self._event_seq = 0
+        self._changed = threading.Condition()
+
+    def snapshot(self) -> LiveSnapshot:
+        return self._snapshot
+
+    def publish(self, **changes: Any) -> None:
+        """Update fields of the snapshot; a no-op if nothing actually changed."""
+        current = self._snapshot
+        if all(getattr(current, k) == v for k, v in changes.items()):
+            return
+        self._snapshot = replace(
+            current, version=current.version + 1, updated=time.time(), **changes
+        )
+        with self._changed:
+            self._changed.notify_all()
+
+    def push_event(self, kind: str, data: dict[str, Any]) -> None:
+        with self._changed:
+            self._event_seq += 1
+            self._events.append((self._event_seq, kind, data))
+            self._changed.notify_all()
+
+    def wait_for_change(self, version: int, event_seq: int, timeout: float) -> bool:
+        """Block until the snapshot version or event sequence differs from the given ones.
+
+        Returns False if ``timeout`` seconds pass first.
+        """
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._snapshot.version != version or self._event_seq != event_seq,
+                timeout,
+            )
+
+    @property
+    def event_seq(self) -> int:
+        return self._event_seq
+
+    def events_since(self, seq: int) -> list[tuple[int, str, dict[str, Any]]]:
+        return [e for e in list(self._events) if e[0] > seq]
@@ -1,10 +1,37 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import bisect
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable, Iterable
 
 from motion_cam.config import StorageConfig
+from motion_cam.metrics import Registry
+
+_DAY_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Every file that belongs to a clip: video, snapshot, thumbnail, scrub preview
+CLIP_FILE_SUFFIXES = (".mp4", "_snap.jpg", "_thumb.jpg", "_scrub.jpg", "_scrub.vtt")
+
+# Called with (units_done, units_total) as a bulk operation advances
+ProgressCallback = Callable[[int, int], None]
+
+RETENTION_SECONDS = "motion_cam_retention_seconds"
+RETENTION_HELP = "Time taken by one retention run (age and disk-usage limits)."
+
+# A directory modified this recently may change again within the same mtime
+# tick, so its cached listing is not trusted (the "racily clean" problem)
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _date_dir_name(timestamp: str) -> str:
+    return f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
 
 
 @dataclass
@@ -16,18 +43,80 @@ class ClipMetadata:
     file_size: int
 
 
+@dataclass
+class DaySummary:
+    date: str
+    count: int
+    bytes: int
+
+
+@dataclass
+class _DayIndex:
+    mtime_ns: int
+    clips: list[ClipMetadata] = field(default_factory=list)  # oldest first
+    bytes: int = 0  # MP4s only, as reported per day
+    disk_bytes: int = 0  # every file directly in the day directory, for the size limit
+
+
 class StorageManager:
-    def __init__(self, config: StorageConfig) -> None:
+    def __init__(self, config: StorageConfig, metrics: Registry | None = None) -> None:
         self._config = config
+        self._retention_timer = (
+            metrics.histogram(RETENTION_SECONDS, RETENTION_HELP) if metrics is not None else None
+        )
+        # Per-day clip listings, revalidated by the day directory's mtime
+        self._days: dict[str, _DayIndex] = {}
+        self._clips: list[ClipMetadata] = []  # oldest first
+        self._timestamps: list[str] = []
+        self._index_lock = threading.Lock()
 
     def _data_dir(self) -> Path:
         return Path(self._config.data_dir)
 
-    def _find_mp4_files(self) -> list[Path]:
+    def _scan_day(self, day_dir: str, mtime_ns: int) -> _DayIndex:
+        index = _DayIndex(mtime_ns=mtime_ns)
+        sizes: dict[str, int] = {}
+        with os.scandir(day_dir) as entries:
+            for e in entries:
+                if e.is_file():
+                    sizes[e.name] = e.stat().st_size
+        index.disk_bytes = sum(sizes.values())
+        for name in sorted(n for n in sizes if n.endswith(".mp4")):
+            timestamp = name[: -len(".mp4")]
+            size = sizes[name]
+            index.clips.append(ClipMetadata(
+                timestamp=timestamp,
+                path=os.path.join(day_dir, name),
+                snapshot_path=os.path.join(day_dir, f"{timestamp}_snap.jpg"),
+                thumbnail_path=os.path.join(day_dir, f"{timestamp}_thumb.jpg"),
+                file_size=size,
+            ))
+            index.bytes += size
+        return index
+
+    def _refresh_index(self) -> None:
+        """Bring the clip index up to date, rescanning only days that changed."""
         data_dir = self._data_dir()
-        if not data_dir.exists():
-            return []
-        return sorted(data_dir.rglob("*.mp4"), reverse=True)
+        seen: dict[str, int] = {}
+        if data_dir.exists():
+            with os.scandir(data_dir) as entries:
+                for e in entries:
+                    if _DAY_DIR_RE.match(e.name) and e.is_dir():
+                        seen[e.name] = e.stat().st_mtime_ns
+
+        racy_before = time.time_ns() - _RACY_WINDOW_NS
+        with self._index_lock:
+            changed = set(self._days) != set(seen)
+            for name, mtime_ns in seen.items():
+                cached = self._days.get(name)
+                if cached is None or cached.mtime_ns != mtime_ns or mtime_ns > racy_before:
+                    self._days[name] = self._scan_day(str(data_dir / name), mtime_ns)
+                    changed = True
+            for name in set(self._days) - set(seen):
+                del self._days[name]
+            if changed:
+                self._clips = [c for name in sorted(self._days) for c in self._days[name].clips]
+                self._timestamps = [c.timestamp for c in self._clips]
 
     def _metadata_from_mp4(self, mp4: Path) -> ClipMetadata:
         timestamp = mp4.stem
@@ -41,12 +130,50 @@ class StorageManager:
         )
 
     def get_clips(self) -> list[ClipMetadata]:
-        mp4s = self._find_mp4_files()
-        return [self._metadata_from_mp4(mp4) for mp4 in mp4s]
+        """All clips, newest first."""
+        self._refresh_index()
+        with self._index_lock:
+            return self._clips[::-1]
+
+    def query_clips(
+        self,
+        before: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        min_size: int = 0,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> tuple[list[ClipMetadata], int]:
+        """Newest-first clips with since <= timestamp <= until and timestamp < before.
+
+        Returns (page, total) where total counts every match, not just the page.
+        """
+        self._refresh_index()
+        with self._index_lock:
+            lo = 0 if since is None else bisect.bisect_left(self._timestamps, since)
+            hi = len(self._timestamps)
+            if until is not None:
+                hi = bisect.bisect_right(self._timestamps, until)
+            if before is not None:
+                hi = min(hi, bisect.bisect_left(self._timestamps, before))
+            matches = self._clips[lo:hi][::-1]
+        if min_size:
+            matches = [c for c in matches if c.file_size >= min_size]
+        end = None if limit is None else offset + limit
+        return matches[offset:end], len(matches)
+
+    def get_day_summaries(self) -> list[DaySummary]:
+        """Per-day clip counts and MP4 bytes, newest day first."""
+        self._refresh_index()
+        with self._index_lock:
+            return [
+                DaySummary(date=name, count=len(day.clips), bytes=day.bytes)
+                for name, day in sorted(self._days.items(), reverse=True)
+                if day.clips
+            ]
 
     def get_clip(self, timestamp: str) -> ClipMetadata | None:
-        date_str = f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
-        mp4 = self._data_dir() / date_str / f"{timestamp}.mp4"
+        mp4 = self._data_dir() / _date_dir_name(timestamp) / f"{timestamp}.mp4"
         if not mp4.exists():
             return None
         return self._metadata_from_mp4(mp4)
@@ -56,38 +183,144 @@ class StorageManager:
         if clip is None:
             return False
 
-        for path_str in (clip.path, clip.snapshot_path, clip.thumbnail_path):
-            p = Path(path_str)
-            if p.exists():
-                p.unlink()
-
+        self._remove_clip_files(Path(clip.path).parent, timestamp)
         return True
 
-    def delete_all_clips(self) -> int:
-        clips = self.get_clips()
-        for clip in clips:
-            self.delete_clip(clip.timestamp)
-        return len(clips)
+    def delete_all_clips(self, progress: ProgressCallback | None = None) -> int:
+        return self.delete_range(None, None, progress)
+
+    def delete_clips(
+        self, timestamps: Iterable[str], progress: ProgressCallback | None = None
+    ) -> int:
+        """Delete an explicit list of clips. Returns the number of clips removed."""
+        timestamps = list(timestamps)
+        deleted = 0
+        for i, timestamp in enumerate(timestamps, start=1):
+            date_dir = self._data_dir() / _date_dir_name(timestamp)
+            if self._remove_clip_files(date_dir, timestamp):
+                deleted += 1
+            if progress is not None:
+                progress(i, len(timestamps))
+        return deleted
+
+    def delete_range(
+        self,
+        since: str | None,
+        until: str | None,
+        progress: ProgressCallback | None = None,
+    ) -> int:
+        """Delete every clip with since <= timestamp <= until (YYYYMMDD_HHMMSS).
+
+        Days that fall entirely inside the range are removed with a single
+        directory delete; only the boundary days are walked clip by clip.
+        """
+        day_dirs = [
+            d for d in self._day_dirs()
+            if self._day_overlaps(d.name, since, until)
+        ]
+        deleted = 0
+        for i, day_dir in enumerate(day_dirs, start=1):
+            names = os.listdir(day_dir)
+            # Never remove a whole day while a clip in it is still being written
+            in_flight = any(name.endswith(".partial") for name in names)
+            if self._day_within(day_dir.name, since, until) and not in_flight:
+                deleted += sum(1 for name in names if name.endswith(".mp4"))
+                shutil.rmtree(day_dir, ignore_errors=True)
+            else:
+                for name in names:
+                    if not name.endswith(".mp4"):
+                        continue
+                    timestamp = name[: -len(".mp4")]
+                    if (since is None or timestamp >= since) and (
+                        until is None or timestamp <= until
+                    ):
+                        if self._remove_clip_files(day_dir, timestamp):
+                            deleted += 1
+            if progress is not None:
+                progress(i, len(day_dirs))
+        return deleted
+
+    def _day_dirs(self) -> list[Path]:
+        data_dir = self._data_dir()
+        if not data_dir.exists():
+            return []
+        return sorted(
+            Path(e.path) for e in os.scandir(data_dir)
+            if e.is_dir() and _DAY_DIR_RE.match(e.name)
+        )
+
+    @staticmethod
+    def _day_bounds(day_name: str) -> tuple[str, str]:
+        day = day_name.replace("-", "")
+        return f"{day}_000000", f"{day}_235959"
+
+    def _day_overlaps(self, day_name: str, since: str | None, until: str | None) -> bool:
+        first, last = self._day_bounds(day_name)
+        return (since is None or last >= since) and (until is None or first <= until)
+
+    def _day_within(self, day_name: str, since: str | None, until: str | None) -> bool:
+        first, last = self._day_bounds(day_name)
+        return (since is None or first >= since) and (until is None or last <= until)
+
+    @staticmethod
+    def _remove_clip_files(date_dir: Path, timestamp: str) -> bool:
+        mp4 = date_dir / f"{timestamp}.mp4"
+        existed = mp4.exists()
+        for suffix in CLIP_FILE_SUFFIXES:
+            (date_dir / f"{timestamp}{suffix}").unlink(missing_ok=True)
+        return existed
 
     def enforce_retention(self) -> None:
-        self._enforce_age_retention()
-        self._enforce_size_retention()
+        if self._retention_timer is None:
+            self._enforce_age_retention()
+            self._enforce_size_retention()
+            return
+        with self._retention_timer.time():
+            self._enforce_age_retention()
+            self._enforce_size_retention()
 
     def _enforce_age_retention(self) -> None:
         cutoff = datetime.now() - timedelta(days=self._config.max_age_days)
-        for clip in self.get_clips():
-            clip_dt = datetime.strptime(clip.timestamp, "%Y%m%d_%H%M%S")
-            if clip_dt < cutoff:
-                self.delete_clip(clip.timestamp)
+        # Clips strictly older than the cutoff
+        until = (cutoff - timedelta(seconds=1)).strftime("%Y%m%d_%H%M%S")
+        self.delete_range(None, until)
 
     def _enforce_size_retention(self) -> None:
+        """Delete the oldest clips until the day directories fit in max_disk_usage_mb.
+
+        Usage comes from the day index, so a run that deletes nothing costs no
+        more than a listing of the data directory. Days that fit entirely in
+        the excess go with one directory delete; the last one is trimmed clip
+        by clip, subtracting each clip's files as they are removed.
+        """
         max_bytes = self._config.max_disk_usage_mb * 1024 * 1024
-        while self.get_disk_usage() > max_bytes:
-            clips = self.get_clips()
-            if not clips:
-                break
-            # Delete the oldest clip (last in the newest-first list)
-            self.delete_clip(clips[-1].timestamp)
+        self._refresh_index()
+        with self._index_lock:
+            days = sorted(self._days.items())
+            excess = sum(day.disk_bytes for _, day in days) - max_bytes
+        for name, day in days:
+            if excess <= 0:
+                return
+            if day.disk_bytes <= excess:
+                self.delete_range(*self._day_bounds(name))
+                excess -= day.disk_bytes
+                continue
+            date_dir = self._data_dir() / name
+            for clip in day.clips:
+                if excess <= 0:
+                    return
+                excess -= self._clip_bytes(date_dir, clip.timestamp)
+                self._remove_clip_files(date_dir, clip.timestamp)
+
+    @staticmethod
+    def _clip_bytes(date_dir: Path, timestamp: str) -> int:
+        size = 0
+        for suffix in CLIP_FILE_SUFFIXES:
+            try:
+                size += (date_dir / f"{timestamp}{suffix}").stat().st_size
+            except OSError:
+                pass
+        return size
 
     def get_disk_usage(self) -> int:
         data_dir = self._data_dir()
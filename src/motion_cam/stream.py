@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A single client's view of a broadcast: holds only the latest frame.
+
+    A slow reader never builds up a queue; it simply skips to whatever frame
+    is newest when it next asks.
+    """
+
+    def __init__(self, broadcaster: FrameBroadcaster) -> None:
+        self._broadcaster = broadcaster
+        self._latest: tuple[int, bytes] = (0, b"")
+        self._seen = 0
+        self._ready = threading.Event()
+
+    def _publish(self, seq: int, frame: bytes) -> None:
+        self._latest = (seq, frame)
+        self._ready.set()
+
+    def next_frame(self, timeout: float | None = None) -> bytes | None:
+        """Wait for a frame newer than the last one returned. None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq, frame = self._latest
+            if seq != self._seen:
+                self._seen = seq
+                return frame
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self._ready.wait(remaining)
+            self._ready.clear()
+
+    def close(self) -> None:
+        self._broadcaster._unsubscribe(self)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class FrameBroadcaster:
+    """Produces frames on one thread and fans them out to every subscriber.
+
+    The producer only runs while at least one client is subscribed, so an
+    idle tuner page costs nothing.
+    """
+
+    def __init__(self, source: Callable[[], bytes], interval: float = 0.05) -> None:
+        self._source = source
+        self._interval = interval
+        self._subscribers: list[Subscription] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def subscribe(self) -> Subscription:
+        sub = Subscription(self)
+        with self._lock:
+            self._subscribers.append(sub)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="frame-broadcaster", daemon=True
+                )
+                self._thread.start()
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _run(self) -> None:
+        seq = 0
+        while True:
+            with self._lock:
+                subscribers = list(self._subscribers)
+                if not subscribers:
+                    self._thread = None
+                    return
+            started = time.monotonic()
+            try:
+                frame = self._source()
+            except Exception:
+                logger.exception("Frame source failed")
+            else:
+                seq += 1
+                for sub in subscribers:
+                    sub._publish(seq, frame)
+            time.sleep(max(0.0, self._interval - (time.monotonic() - started)))
@@ -0,0 +1,300 @@
+"""Host resource telemetry: 1 Hz samples in fixed NumPy ring buffers.
+
+The status page charts these to show what degrades detection on a Pi: CPU by
+thread, SoC temperature and throttling, memory and free disk, next to the
+achieved frame rate, dropped frames and capture latency. Each series keeps
+one hour at full rate, plus 24 hours of one-minute aggregates built from
+those samples, in float32. That is about 20 KB per series, and memory stays
+fixed no matter how long the service runs.
+Sources that do not exist on the host (no thermal zone, no Pi firmware) read
+as NaN, which the JSON sends as null.
+"""
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+SAMPLE_INTERVAL = 1.0
+RAW_SECONDS = 3600
+MINUTE_SECONDS = 60
+HISTORY_MINUTES = 24 * 60
+MAX_POINTS = HISTORY_MINUTES
+# Threads are grouped by name with numeric suffixes dropped (waitress-0..7 -> waitress)
+MAX_THREAD_GROUPS = 12
+
+THERMAL_PATH = "/sys/class/thermal/thermal_zone0/temp"
+# Raspberry Pi firmware flags (as vcgencmd get_throttled): bit 0 under-voltage,
+# 1 frequency capped, 2 throttled, 3 soft temperature limit
+THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+CPU_FREQ_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"
+PROC_SELF = "/proc/self"
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_THREAD_SUFFIX_RE = re.compile(r"-\d+")
+
+# How a minute or a chart point combines samples: flags must not be averaged away
+MEAN, MAX, BITS = "mean", "max", "bits"
+
+# Host series: (name, aggregation)
+SERIES = (
+    ("cpu_percent", MEAN),  # whole process, 100 = one core
+    ("temp_c", MAX),
+    ("throttled", BITS),
+    ("cpu_mhz", MEAN),
+    ("rss_mb", MAX),
+    ("disk_free_mb", MEAN),
+    ("fps", MEAN),
+    ("dropped", MEAN),  # frames per second
+    ("latency_ms", MAX),
+)
+# Series read from the detection loop rather than the host
+DETECTOR_SERIES = ("fps", "dropped", "latency_ms")
+
+
+def _read_number(path: str, base: int = 10) -> float:
+    try:
+        with open(path) as f:
+            return float(int(f.read().strip(), base))
+    except (OSError, ValueError):
+        return float("nan")
+
+
+def _cpu_ticks(stat_path: str) -> int | None:
+    """utime + stime from a /proc stat file, in clock ticks."""
+    try:
+        with open(stat_path) as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces; fields resume after its closing ')'
+    fields = data[data.rindex(")") + 2:].split()
+    return int(fields[11]) + int(fields[12])
+
+
+def thread_group(name: str) -> str:
+    return _THREAD_SUFFIX_RE.sub("", name)
+
+
+def _aggregate(values: np.ndarray, how: str) -> np.ndarray:
+    """Combine the last axis of ``values``, ignoring NaN; all-NaN stays NaN."""
+    present = ~np.isnan(values)
+    counts = present.sum(axis=-1)
+    if how == MEAN:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(present, values, 0).sum(axis=-1) / counts
+    elif how == MAX:
+        result = np.fmax.reduce(values, axis=-1)
+    else:
+        bits = np.bitwise_or.reduce(np.where(present, values, 0).astype(np.int64), axis=-1)
+        result = bits.astype(np.float32)
+    return np.where(counts > 0, result, np.nan).astype(np.float32)
+
+
+class Ring:
+    """Fixed-size float32 ring; unfilled slots are NaN."""
+
+    def __init__(self, size: int) -> None:
+        self._data = np.full(size, np.nan, dtype=np.float32)
+        self._next = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def append(self, value: float) -> None:
+        self._data[self._next] = value
+        self._next = (self._next + 1) % len(self._data)
+
+    def last(self, n: int) -> np.ndarray:
+        """The newest ``n`` values, oldest first (a copy)."""
+        n = min(n, len(self._data))
+        return np.roll(self._data, -self._next)[len(self._data) - n:]
+
+
+class _Series:
+    def __init__(self, how: str) -> None:
+        self.how = how
+        self.raw = Ring(RAW_SECONDS)
+        self.minutes = Ring(HISTORY_MINUTES)
+
+    @property
+    def nbytes(self) -> int:
+        return self.raw.nbytes + self.minutes.nbytes
+
+
+class Telemetry:
+    """Samples host and per-thread resources once a second on a daemon thread."""
+
+    def __init__(
+        self,
+        data_dir: str,
+        detector: Callable[[], dict[str, float | None]] = dict,
+        thermal_path: str = THERMAL_PATH,
+        throttled_path: str = THROTTLED_PATH,
+        cpu_freq_path: str = CPU_FREQ_PATH,
+        proc_self: str = PROC_SELF,
+    ) -> None:
+        self._data_dir = data_dir
+        self._detector = detector
+        self._thermal_path = thermal_path
+        self._throttled_path = throttled_path
+        self._cpu_freq_path = cpu_freq_path
+        self._proc_self = proc_self
+        self._series = {name: _Series(how) for name, how in SERIES}
+        self._threads: dict[str, _Series] = {}
+        self._samples = 0
+        self._last_time: float | None = None
+        self._last_wall = 0.0
+        self._last_process_ticks: int | None = None
+        self._last_thread_ticks: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(s.nbytes for s in (*self._series.values(), *self._threads.values()))
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self) -> None:
+        next_sample = time.monotonic()
+        while not self._stop.is_set():
+            self.sample()
+            next_sample += SAMPLE_INTERVAL
+            self._stop.wait(max(0.0, next_sample - time.monotonic()))
+
+    def _thread_percents(self, elapsed: float | None) -> dict[str, float]:
+        names = {t.native_id: t.name for t in threading.enumerate()}
+        ticks: dict[int, int] = {}
+        task_dir = os.path.join(self._proc_self, "task")
+        try:
+            tids = [int(tid) for tid in os.listdir(task_dir)]
+        except OSError:
+            return {}
+        groups: dict[str, float] = {}
+        for tid in tids:
+            t = _cpu_ticks(os.path.join(task_dir, str(tid), "stat"))
+            if t is None:
+                continue
+            ticks[tid] = t
+            before = self._last_thread_ticks.get(tid)
+            if before is None or not elapsed:
+                continue
+            name = names.get(tid)
+            if name is None:
+                # Native threads (OpenCV, libcamera) carry their kernel name
+                try:
+                    with open(os.path.join(task_dir, str(tid), "comm")) as f:
+                        name = f.read().strip()
+                except OSError:
+                    name = "native"
+            group = thread_group(name)
+            groups[group] = groups.get(group, 0.0) + (t - before) / _CLOCK_TICKS / elapsed * 100
+        self._last_thread_ticks = ticks
+        return groups
+
+    def sample(self, now: float | None = None) -> None:
+        """Take one sample of every series."""
+        now = time.monotonic() if now is None else now
+        elapsed = None if self._last_time is None else now - self._last_time
+        self._last_time = now
+        self._last_wall = time.time()
+
+        ticks = _cpu_ticks(os.path.join(self._proc_self, "stat"))
+        cpu = float("nan")
+        if ticks is not None and self._last_process_ticks is not None and elapsed:
+            cpu = (ticks - self._last_process_ticks) / _CLOCK_TICKS / elapsed * 100
+        self._last_process_ticks = ticks
+
+        rss = float("nan")
+        try:
+            with open(os.path.join(self._proc_self, "statm")) as f:
+                rss = int(f.read().split()[1]) * _PAGE_SIZE / 2**20
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            disk_free = shutil.disk_usage(self._data_dir).free / 2**20
+        except OSError:
+            disk_free = float("nan")
+        detector = self._detector()
+
+        values = {
+            "cpu_percent": cpu,
+            "temp_c": _read_number(self._thermal_path) / 1000,
+            "throttled": _read_number(self._throttled_path, 16),
+            "cpu_mhz": _read_number(self._cpu_freq_path) / 1000,
+            "rss_mb": rss,
+            "disk_free_mb": disk_free,
+        }
+        for name in DETECTOR_SERIES:
+            value = detector.get(name)
+            values[name] = float("nan") if value is None else value
+        threads = self._thread_percents(elapsed)
+
+        with self._lock:
+            for name, series in self._series.items():
+                series.raw.append(values[name])
+            grouped: dict[str, float] = {}
+            for group, percent in threads.items():
+                if group not in self._threads:
+                    if len(self._threads) >= MAX_THREAD_GROUPS:
+                        group = "other"
+                    if group not in self._threads:
+                        # A new ring is all NaN, so earlier seconds read as unknown
+                        self._threads[group] = _Series(MEAN)
+                grouped[group] = grouped.get(group, 0.0) + percent
+            for group, series in self._threads.items():
+                # Groups whose threads have all exited get NaN, not 0
+                series.raw.append(grouped.get(group, np.nan))
+            self._samples += 1
+            if self._samples % MINUTE_SECONDS == 0:
+                for series in (*self._series.values(), *self._threads.values()):
+                    minute = _aggregate(series.raw.last(MINUTE_SECONDS), series.how)
+                    series.minutes.append(float(minute))
+
+    def history(self, hours: float = 24.0, points: int = 240) -> dict:
+        """Downsampled history of the last ``hours`` as ``points`` values per series.
+
+        Up to an hour comes from the 1 Hz samples, longer spans from the
+        one-minute aggregates. Values are oldest first; ``step`` is seconds per point.
+        """
+        seconds = int(hours * 3600)
+        if seconds <= RAW_SECONDS:
+            resolution, count = 1, seconds
+        else:
+            resolution, count = MINUTE_SECONDS, min(seconds // MINUTE_SECONDS, HISTORY_MINUTES)
+        points = max(1, min(points, count))
+        per_point = -(-count // points)
+        count = per_point * points
+
+        def downsample(series: _Series) -> list[float | None]:
+            ring = series.raw if resolution == 1 else series.minutes
+            values = ring.last(count)
+            # Pad the oldest end if the ring is shorter than the request
+            values = np.concatenate([np.full(count - len(values), np.nan, dtype=np.float32), values])
+            reduced = _aggregate(values.reshape(points, per_point), series.how)
+            return [None if np.isnan(v) else round(float(v), 1) for v in reduced]
+
+        with self._lock:
+            return {
+                "step": per_point * resolution,
+                "end": round(self._last_wall),
+                "series": {name: downsample(s) for name, s in self._series.items()},
+                "threads": {name: downsample(s) for name, s in sorted(self._threads.items())},
+            }
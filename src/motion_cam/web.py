@@ -1,16 +1,64 @@
 from __future__ import annotations
 
+import hmac
+import json
+import os
 import re
-from dataclasses import asdict
-
+import stat
+import threading
 import time
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urlencode
 
-from flask import Flask, Response, abort, jsonify, render_template_string, request, send_from_directory
+from flask import Flask, Response, abort, g, jsonify, render_template, request, send_file
+from werkzeug.security import safe_join
 
-from motion_cam.config import WebConfig
-from motion_cam.storage import StorageManager
+from motion_cam.config import PREVIEW_PROFILES, WebConfig
+from motion_cam.controls import ControlCoalescer
+from motion_cam import export, previews, sprites
+from motion_cam.compression import compress_response
+from motion_cam.jobs import JobManager
+from motion_cam.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from motion_cam.metrics import Registry
+from motion_cam.profiler import MAX_HZ, MAX_SECONDS, ProfilerBusy, SamplingProfiler, format_collapsed
+from motion_cam.settings import DetectionSettings
+from motion_cam.state import LiveState
+from motion_cam.storage import ClipMetadata, StorageManager
+from motion_cam.stream import FrameBroadcaster
+from motion_cam.telemetry import MAX_POINTS as MAX_TELEMETRY_POINTS
+from motion_cam.telemetry import Telemetry
 
 CLIPS_PER_PAGE = 20
+MAX_CLIPS_PER_REQUEST = 500
+CLIP_FIELDS = [f.name for f in fields(ClipMetadata)]
+
+# Live event feed: bounds on the per-client minimum gap between messages, and an idle keep-alive
+MIN_EVENT_INTERVAL = 0.2
+MAX_EVENT_INTERVAL = 60.0
+EVENT_HEARTBEAT = 15.0
+# Seconds a client turned away for lack of a stream slot is told to wait
+STREAM_RETRY_AFTER = 5
+
+# Settings page inputs: (field, label, hint, step)
+SETTING_FIELDS = (
+    ("min_contour_area", "Minimum contour area", "Pixels on the detection frame; lower catches smaller movers", 1),
+    ("blur_kernel_size", "Blur kernel size", "Odd; larger smooths away more sensor noise", 2),
+    ("learning_rate", "Learning rate", "Background adaptation per frame interval; -1 for automatic", 0.001),
+    ("cooldown", "Cooldown", "Seconds without motion before a clip ends", 1),
+    ("max_clip_duration", "Maximum clip length", "Seconds", 1),
+)
+
+HTTP_SECONDS = "motion_cam_http_request_seconds"
+HTTP_HELP = "Time to handle a web request, by Flask endpoint and method."
+
+# Clip files are written once and never modified, so browsers may keep them for a year
+MEDIA_MAX_AGE = 365 * 24 * 3600
+# Only finished media is served: clips, snapshots, thumbnails, sprite sheets and
+# scrub tracks. In-flight files (.partial, .tmp) and dotfiles such as the
+# manifest would otherwise be cached for a year in whatever state they were in.
+MEDIA_SUFFIXES = (".mp4", ".jpg", ".vtt")
 
 GALLERY_TEMPLATE = """\
 <!DOCTYPE html>
@@ -28,6 +76,7 @@ GALLERY_TEMPLATE = """\
   .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 1rem; }
   .card { background: #222; border-radius: 8px; overflow: hidden; }
   .card img { width: 100%; aspect-ratio: 16/9; object-fit: cover; }
+  .card .sprite { width: 100%; aspect-ratio: 16/9; background-repeat: no-repeat; }
   .card .info { padding: 0.5rem; font-size: 0.85rem; }
   .card a { color: inherit; text-decoration: none; }
   .pagination { margin-top: 1rem; text-align: center; }
@@ -37,20 +86,30 @@ GALLERY_TEMPLATE = """\
 <body>
 <h1>Motion Cam</h1>
 <nav>
-  <a href="/">Gallery</a> <a href="/status">Status</a> <a href="/tuner">Tuner</a>
+  <a href="/">Gallery</a> <a href="/status">Status</a> <a href="/tuner">Tuner</a> <a href="/settings">Settings</a>
   <button onclick="deleteAll()" style="background:#c33;color:#fff;border:none;border-radius:4px;padding:0.3rem 0.8rem;cursor:pointer;font-size:0.85rem;">Delete All</button>
 </nav>
 <script>
 function deleteAll() {
   if (!confirm('Delete ALL clips? This cannot be undone.')) return;
-  fetch('/api/clips', {method: 'DELETE'}).then(function(r) { return r.json(); }).then(function() { location.reload(); });
+  fetch('/api/clips', {method: 'DELETE', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({all: true})}).then(function(r) { return r.json(); }).then(function(d) { waitForJob(d.job_id); });
+}
+function waitForJob(id) {
+  fetch('/api/jobs/' + id).then(function(r) { return r.json(); }).then(function(job) {
+    if (job.state === 'done' || job.state === 'failed') { location.reload(); return; }
+    setTimeout(function() { waitForJob(id); }, 500);
+  });
 }
 </script>
 <div class="grid">
 {% for clip in clips %}
   <div class="card">
     <a href="/clip/{{ clip.timestamp }}">
+      {% if clip.sprite %}
+      <div class="sprite" role="img" aria-label="Clip {{ clip.timestamp }}" style="background-image: url('/media/{{ clip.sprite.sheet }}?v={{ clip.sprite.version }}'); background-size: {{ clip.sprite.background_size }}; background-position: {{ clip.sprite.background_position }};"></div>
+      {% else %}
       <img src="/media/{{ clip.thumbnail_path }}" alt="Clip {{ clip.timestamp }}">
+      {% endif %}
       <div class="info">{{ clip.display_time }} &mdash; {{ clip.size_kb }} KB</div>
     </a>
   </div>
@@ -86,14 +145,67 @@ DETAIL_TEMPLATE = """\
   .meta dd { display: inline; margin-right: 1rem; }
   .snapshot { margin-top: 1rem; }
   .snapshot img { width: 100%; max-width: 800px; border-radius: 8px; }
+  .scrub { position: relative; width: 100%; max-width: 800px; height: 1.5rem; margin-top: 0.25rem; background: #222; border-radius: 4px; cursor: pointer; }
+  .scrub .bar { position: absolute; top: 0; bottom: 0; left: 0; background: #36c; border-radius: 4px; }
+  .scrub .frame { display: none; position: absolute; bottom: 1.75rem; border: 1px solid #666; pointer-events: none; background-repeat: no-repeat; }
 </style>
 </head>
 <body>
-<nav><a href="/">&laquo; Gallery</a> <a href="/status">Status</a> <a href="/tuner">Tuner</a></nav>
+<nav><a href="/">&laquo; Gallery</a> <a href="/status">Status</a> <a href="/tuner">Tuner</a> <a href="/settings">Settings</a></nav>
 <h1>Clip {{ clip.display_time }}</h1>
-<video controls autoplay>
+<video id="video" controls autoplay>
   <source src="/media/{{ clip.video_path }}" type="video/mp4">
 </video>
+{% if clip.scrub_track %}
+<div class="scrub" id="scrub"><div class="bar" id="scrub_bar"></div><div class="frame" id="scrub_frame"></div></div>
+<script>
+(function() {
+  const video = document.getElementById('video');
+  const scrub = document.getElementById('scrub');
+  const bar = document.getElementById('scrub_bar');
+  const frame = document.getElementById('scrub_frame');
+  const trackUrl = '/media/{{ clip.scrub_track }}';
+  let cues = [];
+  function seconds(t) {
+    const [h, m, s] = t.split(':');
+    return (+h) * 3600 + (+m) * 60 + parseFloat(s);
+  }
+  fetch(trackUrl).then(function(r) { return r.text(); }).then(function(text) {
+    const base = new URL(trackUrl, location.href);
+    text.split('\n\n').forEach(function(block) {
+      const lines = block.trim().split('\n');
+      if (lines.length < 2 || lines[0].indexOf('-->') < 0) return;
+      const times = lines[0].split(' --> ');
+      const target = lines[1].split('#xywh=');
+      const xywh = target[1].split(',').map(Number);
+      cues.push({start: seconds(times[0]), end: seconds(times[1]), url: new URL(target[0], base).href, xywh: xywh});
+    });
+  });
+  function timeAt(e) {
+    const rect = scrub.getBoundingClientRect();
+    return Math.min(Math.max((e.clientX - rect.left) / rect.width, 0), 1) * (video.duration || 0);
+  }
+  scrub.addEventListener('mousemove', function(e) {
+    const t = timeAt(e);
+    const cue = cues.find(function(c) { return t >= c.start && t < c.end; }) || cues[cues.length - 1];
+    if (!cue) return;
+    const [x, y, w, h] = cue.xywh;
+    frame.style.width = w + 'px';
+    frame.style.height = h + 'px';
+    frame.style.backgroundImage = 'url(' + cue.url + ')';
+    frame.style.backgroundPosition = (-x) + 'px ' + (-y) + 'px';
+    const rect = scrub.getBoundingClientRect();
+    frame.style.left = Math.min(Math.max(e.clientX - rect.left - w / 2, 0), rect.width - w) + 'px';
+    frame.style.display = 'block';
+  });
+  scrub.addEventListener('mouseleave', function() { frame.style.display = 'none'; });
+  scrub.addEventListener('click', function(e) { video.currentTime = timeAt(e); });
+  video.addEventListener('timeupdate', function() {
+    bar.style.width = (video.duration ? video.currentTime / video.duration * 100 : 0) + '%';
+  });
+})();
+</script>
+{% endif %}
 <dl class="meta">
   <dt>Timestamp:</dt><dd>{{ clip.timestamp }}</dd>
   <dt>Size:</dt><dd>{{ clip.size_kb }} KB</dd>
@@ -121,15 +233,157 @@ STATUS_TEMPLATE = """\
   nav a { color: #6cf; margin-right: 1rem; text-decoration: none; }
   dl dt { font-weight: bold; margin-top: 0.5rem; }
   dl dd { margin-left: 1rem; }
+  h2 { margin: 1.5rem 0 0.5rem; font-size: 1.1rem; }
+  h3 { margin: 1rem 0 0.25rem; font-size: 0.95rem; color: #aaa; }
+  #range a { color: #6cf; margin-left: 0.5rem; font-size: 0.9rem; text-decoration: none; }
+  #range a.active { color: #eee; text-decoration: underline; }
+  .chart { display: flex; align-items: center; gap: 0.75rem; margin: 0.2rem 0; }
+  .chart span { width: 10rem; font-size: 0.9rem; }
+  .chart svg { background: #1c1c1c; border-radius: 3px; }
+  .chart b { font-weight: normal; font-size: 0.9rem; color: #ccc; }
 </style>
 </head>
 <body>
-<nav><a href="/">&laquo; Gallery</a> <a href="/tuner">Tuner</a></nav>
+<nav><a href="/">&laquo; Gallery</a> <a href="/tuner">Tuner</a> <a href="/settings">Settings</a></nav>
 <h1>System Status</h1>
 <dl>
-  <dt>Total Clips</dt><dd>{{ clip_count }}</dd>
+  <dt>Total Clips</dt><dd id="clip_count">{{ clip_count }}</dd>
   <dt>Disk Usage</dt><dd>{{ disk_usage_mb }} MB</dd>
+  <dt>Detector</dt><dd id="detector">&ndash;</dd>
+  <dt>Frame Rate</dt><dd id="fps">&ndash;</dd>
+  <dt>Latency</dt><dd id="latency">&ndash;</dd>
+  <dt>Last Motion</dt><dd id="last_motion">&ndash;</dd>
 </dl>
+<script>
+const clipCount = document.getElementById('clip_count');
+const events = new EventSource('/api/events');
+events.addEventListener('state', (e) => {
+  const s = JSON.parse(e.data);
+  document.getElementById('detector').textContent =
+    s.state === 'recording' ? `recording (${s.recording_elapsed}s)` : s.state;
+  document.getElementById('fps').textContent =
+    s.dropped_frames ? `${s.fps} fps (${s.dropped_frames} dropped/s)` : `${s.fps} fps`;
+  if (s.latency_ms !== null) document.getElementById('latency').textContent = `${s.latency_ms} ms`;
+  if (s.last_motion) {
+    const m = s.last_motion;
+    document.getElementById('last_motion').textContent =
+      `${new Date(m.time * 1000).toLocaleTimeString()} (${m.contour_count} contours, area ${m.largest_area})`;
+  }
+});
+events.addEventListener('clip', () => {
+  clipCount.textContent = parseInt(clipCount.textContent, 10) + 1;
+});
+</script>
+{% if telemetry %}
+<h2>Resources <span id="range"><a href="#" data-hours="1" class="active">1 h</a><a href="#" data-hours="24">24 h</a></span></h2>
+<div id="charts"></div>
+<script>
+const SERIES = {
+  cpu_percent: ['CPU (process)', '%'], fps: ['Detection rate', 'fps'],
+  dropped: ['Dropped frames', '/s'], latency_ms: ['Capture latency', 'ms'],
+  temp_c: ['SoC temperature', '\u00b0C'], cpu_mhz: ['CPU clock', 'MHz'],
+  throttled: ['Throttle flags', ''], rss_mb: ['Memory (RSS)', 'MB'], disk_free_mb: ['Free disk', 'MB'],
+};
+const esc = (s) => s.replace(/[&<>"]/g, (c) => `&#${c.charCodeAt(0)};`);
+let hours = 1;
+
+function spark(values) {
+  const w = 240, h = 36, known = values.filter((v) => v !== null);
+  const lo = Math.min(...known), span = (Math.max(...known) - lo) || 1;
+  let d = '', pen = 'M';
+  values.forEach((v, i) => {
+    // Gaps (no samples) break the line instead of being drawn as zero
+    if (v === null) { pen = 'M'; return; }
+    d += `${pen}${(i / Math.max(1, values.length - 1) * w).toFixed(1)},${(h - 2 - (v - lo) / span * (h - 4)).toFixed(1)}`;
+    pen = 'L';
+  });
+  return `<svg width="${w}" height="${h}"><path d="${d}" fill="none" stroke="#6cf" stroke-width="1.5"/></svg>`;
+}
+
+function row(label, values, unit) {
+  const last = [...values].reverse().find((v) => v !== null);
+  if (last === undefined) return '';
+  const shown = unit ? `${last} ${unit}` : `0x${last.toString(16)}`;
+  return `<div class="chart"><span>${esc(label)}</span>${spark(values)}<b>${shown}</b></div>`;
+}
+
+async function loadTelemetry() {
+  const resp = await fetch(`/api/telemetry?hours=${hours}&points=240`);
+  if (!resp.ok) return;
+  const t = await resp.json();
+  let html = Object.entries(SERIES).map(([name, [label, unit]]) => row(label, t.series[name], unit)).join('');
+  const threads = Object.entries(t.threads).map(([name, values]) => row(name, values, '%')).join('');
+  if (threads) html += `<h3>CPU by thread</h3>${threads}`;
+  document.getElementById('charts').innerHTML = html;
+}
+
+document.querySelectorAll('#range a').forEach((a) => a.addEventListener('click', (e) => {
+  e.preventDefault();
+  hours = Number(a.dataset.hours);
+  document.querySelectorAll('#range a').forEach((b) => b.classList.toggle('active', b === a));
+  loadTelemetry();
+}));
+loadTelemetry();
+setInterval(loadTelemetry, 30000);
+</script>
+{% endif %}
+</body>
+</html>
+"""
+
+
+SETTINGS_TEMPLATE = """\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Settings - Motion Cam</title>
+<style>
+  * { box-sizing: border-box; margin: 0; padding: 0; }
+  body { font-family: system-ui, sans-serif; background: #111; color: #eee; padding: 1rem; }
+  h1 { margin-bottom: 1rem; }
+  nav { margin-bottom: 1rem; }
+  nav a { color: #6cf; margin-right: 1rem; text-decoration: none; }
+  form { max-width: 28rem; }
+  label { display: block; margin-top: 0.75rem; font-weight: bold; }
+  input { width: 8rem; margin-top: 0.25rem; padding: 0.3rem; background: #222; color: #eee; border: 1px solid #444; border-radius: 4px; }
+  small { display: block; color: #999; }
+  button { margin-top: 1rem; padding: 0.4rem 1rem; background: #36c; color: #fff; border: none; border-radius: 4px; cursor: pointer; }
+  #result { margin-top: 0.75rem; min-height: 1.2rem; }
+  #result.error { color: #f66; }
+  p.note { margin-top: 1.5rem; color: #999; font-size: 0.85rem; }
+</style>
+</head>
+<body>
+<nav><a href="/">&laquo; Gallery</a> <a href="/status">Status</a> <a href="/tuner">Tuner</a></nav>
+<h1>Detection Settings</h1>
+<form id="settings">
+{% for name, label, hint, step in fields %}
+  <label for="{{ name }}">{{ label }}</label>
+  <input id="{{ name }}" name="{{ name }}" type="number" step="{{ step }}" value="{{ values[name] }}">
+  <small>{{ hint }}</small>
+{% endfor %}
+  <button type="submit">Apply</button>
+  <div id="result"></div>
+</form>
+<p class="note">Changes take effect from the next frame and keep the learned background.
+They last until the service restarts; to keep them, also set them in the .env file
+(<code>systemctl reload motion-cam</code> re-reads it).</p>
+<script>
+const result = document.getElementById('result');
+document.getElementById('settings').addEventListener('submit', async (e) => {
+  e.preventDefault();
+  const changes = {};
+  for (const input of e.target.querySelectorAll('input')) changes[input.name] = Number(input.value);
+  const resp = await fetch('/api/settings', {
+    method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(changes),
+  });
+  const data = await resp.json();
+  result.className = resp.ok ? '' : 'error';
+  result.textContent = resp.ok ? 'Applied' : data.error;
+});
+</script>
 </body>
 </html>
 """
@@ -171,11 +425,21 @@ TUNER_TEMPLATE = """\
 <body>
 <div class="container">
   <div class="feed">
-    <img id="stream" src="/tuner/stream">
+    <img id="stream" src="/tuner/stream?profile={{ profile }}">
   </div>
   <div class="controls">
     <h1>Camera Tuner</h1>
-    <nav><a href="/">Gallery</a> <a href="/status">Status</a></nav>
+    <nav><a href="/">Gallery</a> <a href="/status">Status</a> <a href="/settings">Settings</a></nav>
+
+    <h2>Preview</h2>
+    <div class="field">
+      <label>Quality</label>
+      <select id="profile" onchange="location.search = '?profile=' + this.value">
+        {% for name in profiles %}
+        <option value="{{ name }}"{% if name == profile %} selected{% endif %}>{{ name }}</option>
+        {% endfor %}
+      </select>
+    </div>
 
     <h2>Focus</h2>
     <div class="field">
@@ -252,13 +516,7 @@ var lensEl = document.getElementById('lens_position');
 var lensVal = document.getElementById('lens_position_val');
 lensEl.addEventListener('input', function() {
   lensVal.textContent = parseFloat(lensEl.value).toFixed(1);
-  fetch('/api/tuner/control', {
-    method: 'POST',
-    headers: {'Content-Type': 'application/json'},
-    body: JSON.stringify({lens_position: parseFloat(lensEl.value)})
-  }).then(function(r) { return r.json(); }).then(function(d) {
-    document.getElementById('status').textContent = 'Lens position = ' + lensEl.value;
-  });
+  applyLive('lens_position', parseFloat(lensEl.value));
 });
 
 function afModeChanged() {
@@ -279,13 +537,34 @@ function triggerAf() {
   });
 }
 
+// Slider moves are batched: at most one request in flight, sent after a short
+// pause, carrying the latest value of every control changed since the last one
+var pendingControls = {};
+var sendTimer = null;
+var inFlight = false;
+
 function applyLive(key, value) {
+  pendingControls[key] = value;
+  if (!sendTimer && !inFlight) sendTimer = setTimeout(sendControls, 100);
+}
+
+function sendControls() {
+  sendTimer = null;
+  var batch = pendingControls;
+  pendingControls = {};
+  if (Object.keys(batch).length === 0) return;
+  inFlight = true;
   fetch('/api/tuner/control', {
     method: 'POST',
     headers: {'Content-Type': 'application/json'},
-    body: JSON.stringify({[key]: value})
+    body: JSON.stringify(batch)
   }).then(function(r) { return r.json(); }).then(function(d) {
-    document.getElementById('status').textContent = 'Applied ' + key + ' = ' + value;
+    document.getElementById('status').textContent = 'Queued ' + Object.keys(batch).map(function(k) {
+      return k + ' = ' + batch[k];
+    }).join(', ');
+  }).finally(function() {
+    inFlight = false;
+    if (Object.keys(pendingControls).length) sendTimer = setTimeout(sendControls, 100);
   });
 }
 </script>
@@ -316,14 +595,143 @@ def _validate_timestamp(timestamp: str) -> None:
         abort(404)
 
 
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _timestamp_arg(name: str, end_of_day: bool = False) -> str | None:
+    """Read a YYYYMMDD_HHMMSS or YYYY-MM-DD query arg, aborting 400 if malformed."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    if _DATE_RE.match(value):
+        return value.replace("-", "") + ("_235959" if end_of_day else "_000000")
+    if not _TIMESTAMP_RE.match(value):
+        abort(400)
+    return value
+
+
+def _int_arg(name: str, default: int) -> int:
+    """Read an integer query arg, aborting 400 if malformed rather than using the default."""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        abort(400)
+
+
 def create_app(
     storage_manager: StorageManager,
     web_config: WebConfig,
     data_dir: str,
     camera=None,
+    jobs: JobManager | None = None,
+    live_state: LiveState | None = None,
+    metrics: Registry | None = None,
+    profile_token: str = "",
+    telemetry: Telemetry | None = None,
+    settings: DetectionSettings | None = None,
 ) -> Flask:
     app = Flask(__name__)
     app.config["DATA_DIR"] = data_dir
+    # Parse each page template once; render_template_string would recompile per request
+    gallery_template = app.jinja_env.from_string(GALLERY_TEMPLATE)
+    detail_template = app.jinja_env.from_string(DETAIL_TEMPLATE)
+    status_template = app.jinja_env.from_string(STATUS_TEMPLATE)
+    tuner_template = app.jinja_env.from_string(TUNER_TEMPLATE)
+    settings_template = app.jinja_env.from_string(SETTINGS_TEMPLATE)
+    if jobs is None:
+        jobs = JobManager()
+    # Tuner writes are merged and applied from one thread, never on request threads
+    controls = ControlCoalescer(camera.set_controls) if camera is not None else None
+    profiler = SamplingProfiler() if profile_token else None
+    # One encoder per preview profile, shared by every tuner stream client
+    broadcasters: dict[str, FrameBroadcaster] = {}
+    broadcasters_lock = threading.Lock()
+    # Long-lived responses each pin a server worker for as long as they are open
+    stream_slots = threading.BoundedSemaphore(web_config.stream_limit)
+
+    def _stream_response(body: Iterator, **kwargs: Any) -> Response:
+        """A streamed response holding one of the ``stream_limit`` slots, or a 503."""
+        if not stream_slots.acquire(blocking=False):
+            return Response(
+                "Too many open streams\n",
+                status=503,
+                mimetype="text/plain",
+                headers={"Retry-After": str(STREAM_RETRY_AFTER)},
+            )
+        response = Response(body, **kwargs)
+        # Released when the server closes the response, whether or not the body ever ran
+        response.call_on_close(stream_slots.release)
+        return response
+
+    def _preview_profile() -> str:
+        name = request.args.get("profile", web_config.preview_profile)
+        if name not in PREVIEW_PROFILES:
+            abort(400)
+        return name
+
+    def _broadcaster(name: str) -> FrameBroadcaster:
+        with broadcasters_lock:
+            if name not in broadcasters:
+                profile = PREVIEW_PROFILES[name]
+                broadcasters[name] = FrameBroadcaster(
+                    lambda: camera.capture_jpeg_frame(profile), interval=1.0 / profile.fps
+                )
+            return broadcasters[name]
+
+    if metrics is not None:
+        # Registered before compression so its after_request runs last and
+        # the timing includes compressing the body. A streamed response is
+        # timed only until the view returns it: its body (exports, event and
+        # tuner streams) is produced later, after this hook has run.
+        @app.before_request
+        def start_timer() -> None:
+            g.request_started = time.perf_counter()
+
+        @app.after_request
+        def observe_request(response: Response) -> Response:
+            started = g.pop("request_started", None)
+            if started is not None:
+                metrics.histogram(
+                    HTTP_SECONDS, HTTP_HELP,
+                    endpoint=request.endpoint or "unmatched", method=request.method,
+                ).observe(time.perf_counter() - started)
+            return response
+
+    @app.after_request
+    def compress(response: Response) -> Response:
+        return compress_response(request, response, web_config.compress_min_size)
+
+    @app.route("/debug/profile")
+    def debug_profile():
+        # Without a configured token the endpoint does not exist
+        if profiler is None:
+            abort(404)
+        auth = request.headers.get("Authorization", "")
+        # Header only: a query-string token would end up in access logs, history and Referer
+        token = auth[len("Bearer "):] if auth.startswith("Bearer ") else ""
+        if not hmac.compare_digest(token.encode(), profile_token.encode()):
+            abort(403)
+        seconds = request.args.get("seconds", 10, type=float)
+        hz = request.args.get("hz", 100, type=int)
+        if not 0 < seconds <= MAX_SECONDS or not 0 < hz <= MAX_HZ:
+            abort(400)
+        try:
+            stacks, samples = profiler.capture(seconds, hz)
+        except ProfilerBusy:
+            abort(409)
+        resp = Response(format_collapsed(stacks), mimetype="text/plain")
+        resp.headers["X-Profile-Samples"] = str(samples)
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+
+    @app.route("/metrics")
+    def metrics_page():
+        if metrics is None:
+            abort(404)
+        return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
 
     @app.route("/")
     def gallery():
@@ -332,17 +740,23 @@ def create_app(
         total_pages = max(1, -(-len(all_clips) // CLIPS_PER_PAGE))  # ceil division
         start = (page - 1) * CLIPS_PER_PAGE
         end = start + CLIPS_PER_PAGE
-        clips = [
-            {
+        # A page spans one or two days, so this is at most a couple of small reads
+        sprite_maps: dict[str, dict | None] = {}
+        clips = []
+        for c in all_clips[start:end]:
+            day = os.path.basename(os.path.dirname(c.path))
+            if day not in sprite_maps:
+                sprite_maps[day] = sprites.load_map(os.path.dirname(c.path))
+            sprite_map = sprite_maps[day]
+            clips.append({
                 "timestamp": c.timestamp,
                 "thumbnail_path": _relative_path(c.thumbnail_path, data_dir),
+                "sprite": sprites.tile_for(sprite_map, day, c.timestamp) if sprite_map else None,
                 "display_time": _format_timestamp(c.timestamp),
                 "size_kb": c.file_size // 1024,
-            }
-            for c in all_clips[start:end]
-        ]
-        return render_template_string(
-            GALLERY_TEMPLATE, clips=clips, page=page, total_pages=total_pages
+            })
+        return render_template(
+            gallery_template, clips=clips, page=page, total_pages=total_pages
         )
 
     @app.route("/clip/<timestamp>")
@@ -356,32 +770,173 @@ def create_app(
             "display_time": _format_timestamp(clip.timestamp),
             "video_path": _relative_path(clip.path, data_dir),
             "snapshot_path": _relative_path(clip.snapshot_path, data_dir),
+            "scrub_track": None,
             "size_kb": clip.file_size // 1024,
         }
-        return render_template_string(DETAIL_TEMPLATE, clip=clip_data)
+        track = previews.preview_paths(Path(clip.path))[1]
+        if track.exists():
+            clip_data["scrub_track"] = _relative_path(str(track), data_dir)
+        return render_template(detail_template, clip=clip_data)
 
     @app.route("/status")
     def status_page():
-        clips = storage_manager.get_clips()
+        clip_count = sum(d.count for d in storage_manager.get_day_summaries())
         disk_usage = storage_manager.get_disk_usage()
-        return render_template_string(
-            STATUS_TEMPLATE,
-            clip_count=len(clips),
+        return render_template(
+            status_template,
+            clip_count=clip_count,
             disk_usage_mb=round(disk_usage / (1024 * 1024), 1),
+            telemetry=telemetry is not None,
         )
 
     @app.route("/api/clips")
     def api_clips():
-        page = request.args.get("page", 1, type=int)
-        all_clips = storage_manager.get_clips()
-        start = (page - 1) * CLIPS_PER_PAGE
-        end = start + CLIPS_PER_PAGE
-        return jsonify([asdict(c) for c in all_clips[start:end]])
+        limit = _int_arg("limit", CLIPS_PER_PAGE)
+        min_size = _int_arg("min_size", 0)
+        if not 1 <= limit <= MAX_CLIPS_PER_REQUEST or min_size < 0:
+            abort(400)
+        cursor = _timestamp_arg("cursor")
+        page = _int_arg("page", 1)
+        selected = CLIP_FIELDS
+        if "fields" in request.args:
+            selected = request.args["fields"].split(",")
+            if not set(selected) <= set(CLIP_FIELDS):
+                abort(400)
+
+        # The cursor replaces page offsets; page is kept for older clients
+        offset = 0 if cursor else max(0, page - 1) * limit
+        filters = {
+            "since": _timestamp_arg("since"),
+            "until": _timestamp_arg("until", end_of_day=True),
+            "min_size": min_size,
+        }
+        clips, remaining = storage_manager.query_clips(
+            before=cursor, offset=offset, limit=limit, **filters
+        )
+        # The total is the same on every page, so count the filtered listing without the cursor
+        total = remaining if cursor is None else storage_manager.query_clips(limit=0, **filters)[1]
+        resp = jsonify([{k: getattr(c, k) for k in selected} for c in clips])
+        resp.headers["X-Total-Count"] = str(total)
+        if clips and offset + len(clips) < remaining:
+            next_args = request.args.to_dict()
+            next_args.pop("page", None)
+            next_args["cursor"] = clips[-1].timestamp
+            resp.headers["X-Next-Cursor"] = clips[-1].timestamp
+            resp.headers["Link"] = f'</api/clips?{urlencode(next_args)}>; rel="next"'
+        return resp
+
+    @app.route("/api/clips/summary")
+    def api_clips_summary():
+        days = storage_manager.get_day_summaries()
+        return jsonify({
+            "days": [asdict(d) for d in days],
+            "total_count": sum(d.count for d in days),
+            "total_bytes": sum(d.bytes for d in days),
+        })
+
+    @app.route("/api/export")
+    def api_export():
+        fmt = request.args.get("format", "zip")
+        if fmt not in ("zip", "tar"):
+            abort(400)
+        if "date" in request.args:
+            date = request.args["date"]
+            if not _DATE_RE.match(date):
+                abort(400)
+            day = date.replace("-", "")
+            clips, _ = storage_manager.query_clips(since=f"{day}_000000", until=f"{day}_235959")
+            clips.reverse()
+            label = date
+        elif "timestamps" in request.args:
+            timestamps = request.args["timestamps"].split(",")
+            if len(timestamps) > MAX_CLIPS_PER_REQUEST or not all(
+                _TIMESTAMP_RE.match(ts) for ts in timestamps
+            ):
+                abort(400)
+            clips = [c for c in map(storage_manager.get_clip, sorted(set(timestamps))) if c]
+            label = "clips"
+        else:
+            abort(400)
+        if not clips:
+            abort(404)
+
+        files = [
+            (Path(p), _relative_path(p, data_dir))
+            for c in clips
+            for p in (c.path, c.snapshot_path, c.thumbnail_path)
+        ]
+        entries = export.collect_entries(files)
+        headers = {"Content-Disposition": f'attachment; filename="motion-cam-{label}.{fmt}"'}
+        if fmt == "zip":
+            # CRCs are computed while streaming, so a ZIP can only be sent whole
+            headers["Accept-Ranges"] = "none"
+            return Response(export.stream_zip(entries), mimetype="application/zip", headers=headers)
+
+        total = export.tar_size(entries)
+        etag = export.etag(entries)
+        headers["Accept-Ranges"] = "bytes"
+        start, stop, status = 0, total, 200
+        byte_range = request.range
+        if_range = request.if_range
+        # The archive has no Last-Modified, so an If-Range date can't be
+        # validated and the whole archive is sent instead (RFC 9110 13.1.5)
+        unconditional = if_range.etag is None and if_range.date is None
+        if (
+            byte_range is not None
+            and len(byte_range.ranges) == 1
+            and (unconditional or if_range.etag == etag)
+        ):
+            bounds = byte_range.range_for_length(total)
+            if bounds is None:
+                return Response(status=416, headers={"Content-Range": f"bytes */{total}"})
+            start, stop = bounds
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{stop - 1}/{total}"
+        resp = Response(
+            export.stream_tar(entries, start, stop),
+            status=status,
+            mimetype="application/x-tar",
+            headers=headers,
+        )
+        resp.content_length = stop - start
+        resp.set_etag(etag)
+        return resp
 
     @app.route("/api/clips", methods=["DELETE"])
-    def api_delete_all_clips():
-        count = storage_manager.delete_all_clips()
-        return jsonify({"status": "deleted", "count": count})
+    def api_delete_clips():
+        # A body that didn't parse must never fall through to "no bounds", which is everything
+        if not request.is_json:
+            abort(400)
+        data = request.get_json()
+        if not isinstance(data, dict):
+            abort(400)
+        timestamps = data.get("timestamps")
+        since = data.get("since")
+        until = data.get("until")
+        if timestamps is not None and not isinstance(timestamps, list):
+            abort(400)
+        if timestamps is None and since is None and until is None and data.get("all") is not True:
+            abort(400)
+        for ts in (timestamps or []) + [t for t in (since, until) if t is not None]:
+            if not isinstance(ts, str) or not _TIMESTAMP_RE.match(ts):
+                abort(400)
+
+        if timestamps is not None:
+            job = jobs.submit(
+                "delete", lambda job: storage_manager.delete_clips(timestamps, job.progress)
+            )
+        else:
+            job = jobs.submit(
+                "delete", lambda job: storage_manager.delete_range(since, until, job.progress)
+            )
+        return jsonify({"status": "queued", "job_id": job.id}), 202
+
+    @app.route("/api/jobs/<job_id>")
+    def api_job(job_id: str):
+        job = jobs.get(job_id)
+        if job is None:
+            abort(404)
+        return jsonify(asdict(job))
 
     @app.route("/api/clips/<timestamp>", methods=["DELETE"])
     def api_delete_clip(timestamp: str):
@@ -393,38 +948,151 @@ def create_app(
 
     @app.route("/api/status")
     def api_status():
-        clips = storage_manager.get_clips()
+        clip_count = sum(d.count for d in storage_manager.get_day_summaries())
         disk_usage = storage_manager.get_disk_usage()
-        return jsonify({
-            "clip_count": len(clips),
+        status = {
+            "clip_count": clip_count,
             "disk_usage": disk_usage,
-        })
+        }
+        if live_state is not None:
+            status["detector"] = asdict(live_state.snapshot())
+        return jsonify(status)
+
+    @app.route("/settings")
+    def settings_page():
+        if settings is None:
+            abort(404)
+        return render_template(
+            settings_template, fields=SETTING_FIELDS, values=asdict(settings.current)
+        )
+
+    @app.route("/api/settings", methods=["GET"])
+    def api_settings():
+        if settings is None:
+            abort(404)
+        return jsonify({"detection": asdict(settings.current)})
+
+    @app.route("/api/settings", methods=["POST"])
+    def api_update_settings():
+        if settings is None:
+            abort(404)
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"status": "error", "error": "Expected a JSON object of settings"}), 400
+        try:
+            updated = settings.update(data)
+        except ValueError as e:
+            return jsonify({"status": "error", "error": str(e)}), 400
+        # Applied by the detection loop at its next frame boundary
+        return jsonify({"status": "queued", "detection": asdict(updated)})
+
+    @app.route("/api/telemetry")
+    def api_telemetry():
+        if telemetry is None:
+            abort(404)
+        hours = request.args.get("hours", 24, type=float)
+        points = request.args.get("points", 240, type=int)
+        if not 0 < hours <= 24 or not 1 <= points <= MAX_TELEMETRY_POINTS:
+            abort(400)
+        # Compact separators: this is polled and mostly numbers
+        body = json.dumps(telemetry.history(hours, points), separators=(",", ":"))
+        return Response(body, mimetype="application/json", headers={"Cache-Control": "no-store"})
+
+    @app.route("/api/events")
+    def api_events():
+        if live_state is None:
+            abort(503)
+        interval = request.args.get("interval", 1.0, type=float)
+        interval = min(max(interval, MIN_EVENT_INTERVAL), MAX_EVENT_INTERVAL)
+
+        def generate():
+            yield f"retry: {int(interval * 1000)}\n\n"
+            version = -1
+            seq = live_state.event_seq
+            last_sent = time.monotonic()
+            while True:
+                out = []
+                # Coalesce: only the latest state is sent, however often it changed
+                snapshot = live_state.snapshot()
+                if snapshot.version != version:
+                    version = snapshot.version
+                    out.append(f"event: state\ndata: {json.dumps(asdict(snapshot))}\n\n")
+                for seq, kind, data in live_state.events_since(seq):
+                    out.append(f"id: {seq}\nevent: {kind}\ndata: {json.dumps(data)}\n\n")
+                now = time.monotonic()
+                if out:
+                    last_sent = now
+                    yield "".join(out)
+                    # Rate limit: changes during the interval go out together afterwards
+                    time.sleep(interval)
+                elif now - last_sent >= EVENT_HEARTBEAT:
+                    last_sent = now
+                    yield ": keep-alive\n\n"
+                # Sleep until something changes; wake only for the heartbeat otherwise
+                timeout = max(0.0, last_sent + EVENT_HEARTBEAT - time.monotonic())
+                live_state.wait_for_change(version, seq, timeout)
+
+        return _stream_response(
+            generate(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @app.route("/media/<path:filename>")
     def serve_media(filename: str):
-        return send_from_directory(data_dir, filename)
+        parts = filename.split("/")
+        if (
+            any(part.startswith(".") for part in parts)
+            or not filename.endswith(MEDIA_SUFFIXES)
+            or ".tmp" in parts[-1]
+        ):
+            abort(404)
+        path = safe_join(data_dir, filename)
+        if path is None:
+            abort(404)
+        try:
+            st = os.stat(path)
+        except OSError:
+            abort(404)
+        if not stat.S_ISREG(st.st_mode):
+            abort(404)
+        # Strong validator: a rewritten or replaced file changes inode, size or mtime
+        etag = f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+        resp = send_file(
+            path,
+            etag=etag,
+            last_modified=st.st_mtime,
+            max_age=MEDIA_MAX_AGE,
+            conditional=True,
+        )
+        resp.cache_control.public = True
+        resp.cache_control.immutable = True
+        return resp
 
     @app.route("/tuner")
     def tuner_page():
-        return render_template_string(TUNER_TEMPLATE)
+        return render_template(
+            tuner_template, profile=_preview_profile(), profiles=list(PREVIEW_PROFILES)
+        )
 
     @app.route("/tuner/stream")
     def tuner_stream():
         if camera is None:
             abort(503)
+        broadcaster = _broadcaster(_preview_profile())
 
         def generate():
-            while True:
-                frame = camera.capture_jpeg_frame()
-                yield (
-                    b"--frame\r\n"
-                    b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
-                )
-                time.sleep(0.05)
+            with broadcaster.subscribe() as subscription:
+                while True:
+                    frame = subscription.next_frame(timeout=5.0)
+                    if frame is None:
+                        continue
+                    yield (
+                        b"--frame\r\n"
+                        b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
+                    )
 
-        return Response(
-            generate(), mimetype="multipart/x-mixed-replace; boundary=frame"
-        )
+        return _stream_response(generate(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
     @app.route("/api/tuner/control", methods=["POST"])
     def api_tuner_control():
@@ -439,13 +1107,18 @@ def create_app(
             "exposure_value": "ExposureValue",
             "lens_position": "LensPosition",
         }
-        controls = {}
+        updates = {}
         for key, val in data.items():
             if key in ctrl_map:
-                controls[ctrl_map[key]] = val
-        if controls:
-            camera.set_controls(controls)
-        return jsonify({"status": "ok", "applied": list(data.keys())})
+                updates[ctrl_map[key]] = val
+        state = controls.submit(updates) if updates else controls.state()
+        return jsonify({"status": "queued", "queued": list(data.keys()), **state})
+
+    @app.route("/api/tuner/control", methods=["GET"])
+    def api_tuner_control_state():
+        if camera is None:
+            abort(503)
+        return jsonify(controls.state())
 
     @app.route("/api/tuner/af_mode", methods=["POST"])
     def api_tuner_af_mode():
@@ -457,15 +1130,13 @@ def create_app(
             from libcamera import controls as lc
 
             if mode == "continuous":
-                camera.set_controls({"AfMode": lc.AfModeEnum.Continuous})
+                controls.submit({"AfMode": lc.AfModeEnum.Continuous})
             elif mode == "manual":
                 lp = data.get("lens_position", 0.0)
-                camera.set_controls(
-                    {"AfMode": lc.AfModeEnum.Manual, "LensPosition": lp}
-                )
+                controls.submit({"AfMode": lc.AfModeEnum.Manual, "LensPosition": lp})
         except Exception as e:
             return jsonify({"status": "error", "error": str(e)})
-        return jsonify({"status": "ok", "af_mode": mode})
+        return jsonify({"status": "queued", "af_mode": mode})
 
     @app.route("/api/tuner/trigger_af", methods=["POST"])
     def api_tuner_trigger_af():
@@ -474,11 +1145,9 @@ def create_app(
         try:
             from libcamera import controls as lc
 
-            camera.set_controls(
-                {"AfMode": lc.AfModeEnum.Auto, "AfTrigger": lc.AfTriggerEnum.Start}
-            )
+            controls.submit({"AfMode": lc.AfModeEnum.Auto, "AfTrigger": lc.AfTriggerEnum.Start})
         except Exception as e:
             return jsonify({"status": "error", "error": str(e)})
-        return jsonify({"status": "ok"})
+        return jsonify({"status": "queued"})
 
     return app
@@ -0,0 +1,185 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from motion_cam import autotune
+from motion_cam.autotune import (
+    CachedClip,
+    LabeledClip,
+    Score,
+    cache_clip,
+    evaluate,
+    format_env,
+    grid,
+    load_labels,
+    rank,
+    search,
+)
+from motion_cam.config import DetectionConfig, load_detection_config
+
+SIZE = (160, 120)
+FPS = 10
+MOTION = ((3.0, 6.0),)
+
+
+def _write_clip(path, seconds: float = 9.0) -> None:
+    """A noisy floor that a bright square crosses during MOTION."""
+    rng = np.random.default_rng(0)
+    floor = rng.integers(70, 110, (SIZE[1], SIZE[0])).astype(np.int16)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, SIZE)
+    for i in range(int(seconds * FPS)):
+        t = i / FPS
+        frame = floor + rng.integers(-3, 4, floor.shape)
+        start, end = MOTION[0]
+        if start <= t <= end:
+            x = int(10 + (t - start) / (end - start) * 120)
+            frame[50:75, x : x + 25] = 230
+        gray = np.clip(frame, 0, 255).astype(np.uint8)
+        writer.write(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+    writer.release()
+
+
+@pytest.fixture
+def clip(tmp_path) -> CachedClip:
+    path = tmp_path / "clip.mp4"
+    _write_clip(path)
+    return cache_clip(LabeledClip(str(path), MOTION), str(tmp_path / "cache"), SIZE)
+
+
+class TestLoadLabels:
+    def test_paths_are_relative_to_labels_file(self, tmp_path):
+        labels = tmp_path / "labels.json"
+        labels.write_text(json.dumps({"clips": [{"path": "a.mp4", "motion": [[5, 6], [1, 2]]}]}))
+        [clip] = load_labels(str(labels))
+        assert clip.path == str(tmp_path / "a.mp4")
+        assert clip.motion == ((1.0, 2.0), (5.0, 6.0))
+
+    def test_clip_without_motion_is_all_negative(self, tmp_path):
+        labels = tmp_path / "labels.json"
+        labels.write_text(json.dumps({"clips": [{"path": "quiet.mp4"}]}))
+        assert load_labels(str(labels))[0].motion == ()
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"clips": []},
+            {"videos": []},
+            {"clips": [{"motion": [[1, 2]]}]},
+            {"clips": [{"path": "a.mp4", "motion": [[2, 1]]}]},
+            {"clips": [{"path": "a.mp4", "motion": [3]}]},
+        ],
+    )
+    def test_malformed(self, tmp_path, data):
+        labels = tmp_path / "labels.json"
+        labels.write_text(json.dumps(data))
+        with pytest.raises(ValueError):
+            load_labels(str(labels))
+
+
+class TestCache:
+    def test_frames_are_grayscale_at_lores_size(self, clip):
+        frames = np.load(clip.frames_path, mmap_mode="r")
+        assert isinstance(frames, np.memmap)
+        assert frames.shape == (90, SIZE[1], SIZE[0])
+        assert frames.dtype == np.uint8
+        assert clip.fps == FPS
+
+    def test_second_call_reuses_cache(self, clip, tmp_path, monkeypatch):
+        """Decoding happens once; later runs only map the file."""
+        monkeypatch.setattr(cv2, "VideoCapture", lambda path: pytest.fail("decoded again"))
+        again = cache_clip(LabeledClip(str(tmp_path / "clip.mp4"), MOTION), str(tmp_path / "cache"), SIZE)
+        assert again == clip
+
+    def test_only_npy_and_metadata_left(self, clip, tmp_path):
+        names = sorted(p.suffix for p in (tmp_path / "cache").iterdir())
+        assert names == [".json", ".npy"]
+
+    def test_other_resolution_gets_own_cache(self, clip, tmp_path):
+        small = cache_clip(LabeledClip(str(tmp_path / "clip.mp4"), MOTION), str(tmp_path / "cache"), (80, 60))
+        assert small.frames_path != clip.frames_path
+        assert np.load(small.frames_path, mmap_mode="r").shape == (90, 60, 80)
+
+    def test_unreadable_video(self, tmp_path):
+        bad = tmp_path / "bad.mp4"
+        bad.write_bytes(b"not a video")
+        with pytest.raises(ValueError):
+            cache_clip(LabeledClip(str(bad), ()), str(tmp_path / "cache"), SIZE)
+
+
+class TestScoring:
+    def test_labels_skip_warmup_and_edges(self):
+        clip = CachedClip("", fps=10, motion=((3.0, 5.0),))
+        truth, scored = autotune._labels(clip, 80, warmup=1.0, tolerance=0.5)
+        assert not scored[:10].any()
+        assert truth[30] and truth[50] and not truth[51]
+        assert not scored[25:36].any() and not scored[45:56].any()
+        assert scored[36:45].all() and scored[56:].all()
+
+    def test_f_score_and_cpu(self):
+        score = Score(
+            DetectionConfig(),
+            true_positives=6,
+            false_positives=2,
+            false_negatives=4,
+            frames=10,
+            cpu_seconds=0.02,
+        )
+        assert score.precision == pytest.approx(0.75)
+        assert score.recall == pytest.approx(0.6)
+        assert score.f_score() == pytest.approx(2 * 0.75 * 0.6 / 1.35)
+        assert score.cpu_ms_per_frame == pytest.approx(2.0)
+
+    def test_no_detections_scores_zero(self):
+        assert Score(DetectionConfig(), 0, 0, 5, 10, 0.0).f_score() == 0.0
+
+    def test_sensible_config_finds_the_motion(self, clip):
+        score = evaluate(DetectionConfig(min_contour_area=200, blur_kernel_size=11), [clip], framerate=FPS)
+        assert score.frames == 90
+        assert score.recall > 0.9
+        assert score.precision > 0.9
+        assert score.cpu_seconds > 0
+
+    def test_area_above_the_object_misses_it(self, clip):
+        score = evaluate(DetectionConfig(min_contour_area=5000, blur_kernel_size=11), [clip], framerate=FPS)
+        assert score.true_positives == 0
+        assert score.f_score() == 0.0
+
+
+class TestSearch:
+    def test_grid_skips_invalid_combinations(self):
+        space = {"min_contour_area": (100, 200), "blur_kernel_size": (11, 12)}
+        configs = grid(space, DetectionConfig(cooldown=9))
+        assert [(c.min_contour_area, c.blur_kernel_size) for c in configs] == [(100, 11), (200, 11)]
+        assert all(c.cooldown == 9 for c in configs)
+
+    def test_process_pool_matches_serial(self, clip):
+        configs = grid({"min_contour_area": (200, 5000), "blur_kernel_size": (11,)})
+        serial = search(configs, [clip], FPS, workers=1)
+        pooled = search(configs, [clip], FPS, workers=2)
+        assert [(s.config, s.true_positives, s.false_positives, s.false_negatives) for s in pooled] == [
+            (s.config, s.true_positives, s.false_positives, s.false_negatives) for s in serial
+        ]
+
+    def test_rank_prefers_f_score_then_cpu(self):
+        good_slow = Score(DetectionConfig(min_contour_area=1), 9, 1, 1, 10, 0.5)
+        good_fast = Score(DetectionConfig(min_contour_area=2), 9, 1, 1, 10, 0.1)
+        poor = Score(DetectionConfig(min_contour_area=3), 1, 9, 9, 10, 0.0)
+        assert rank([poor, good_slow, good_fast]) == [good_fast, good_slow, poor]
+
+    def test_env_snippet_applies_the_winner(self, tmp_path):
+        ranked = [
+            Score(DetectionConfig(min_contour_area=300, learning_rate=0.005), 9, 1, 1, 10, 0.1),
+            Score(DetectionConfig(min_contour_area=1000), 5, 5, 5, 10, 0.1),
+        ]
+        snippet = format_env(ranked)
+        env = dict(line.split("=", 1) for line in snippet.splitlines() if line and not line.startswith("#"))
+        assert env == {
+            "DETECTION_MIN_CONTOUR_AREA": "300",
+            "DETECTION_BLUR_KERNEL_SIZE": "21",
+            "DETECTION_LEARNING_RATE": "0.005",
+        }
+        assert load_detection_config(env) == DetectionConfig(min_contour_area=300, learning_rate=0.005)
+        assert "# DETECTION_MIN_CONTOUR_AREA=1000" in snippet
+        assert snippet.startswith("# 1. F1 0.900  precision 0.900  recall 0.900")
@@ -0,0 +1,58 @@
+import os
+import time
+
+import numpy as np
+
+from motion_cam.background import MAX_AGE, background_path, load_background, save_background
+
+
+def _image() -> np.ndarray:
+    return np.random.default_rng(0).integers(0, 256, (240, 320)).astype(np.uint8)
+
+
+class TestSaveLoad:
+    def test_roundtrip(self, tmp_path):
+        image = _image()
+        save_background(str(tmp_path), image)
+        loaded = load_background(str(tmp_path), (240, 320))
+        assert np.array_equal(loaded, image)
+
+    def test_save_replaces_previous_and_leaves_no_temp_file(self, tmp_path):
+        save_background(str(tmp_path), np.zeros((240, 320), dtype=np.uint8))
+        save_background(str(tmp_path), _image())
+        assert np.array_equal(load_background(str(tmp_path), (240, 320)), _image())
+        assert [p.name for p in tmp_path.iterdir()] == [background_path(str(tmp_path)).name]
+
+    def test_creates_data_dir(self, tmp_path):
+        save_background(str(tmp_path / "new"), _image())
+        assert background_path(str(tmp_path / "new")).exists()
+
+
+class TestUnusableSaves:
+    """Anything doubtful means a cold start, never an error."""
+
+    def test_missing(self, tmp_path):
+        assert load_background(str(tmp_path), (240, 320)) is None
+
+    def test_too_old(self, tmp_path):
+        save_background(str(tmp_path), _image())
+        assert load_background(str(tmp_path), (240, 320), now=time.time() + MAX_AGE + 1) is None
+
+    def test_other_resolution(self, tmp_path):
+        save_background(str(tmp_path), _image())
+        assert load_background(str(tmp_path), (480, 640)) is None
+
+    def test_other_dtype(self, tmp_path):
+        save_background(str(tmp_path), _image().astype(np.float32))
+        assert load_background(str(tmp_path), (240, 320)) is None
+
+    def test_corrupt(self, tmp_path):
+        path = background_path(str(tmp_path))
+        path.write_bytes(b"not a numpy file")
+        assert load_background(str(tmp_path), (240, 320)) is None
+
+    def test_truncated(self, tmp_path):
+        save_background(str(tmp_path), _image())
+        path = background_path(str(tmp_path))
+        os.truncate(path, path.stat().st_size // 2)
+        assert load_background(str(tmp_path), (240, 320)) is None
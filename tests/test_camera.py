@@ -1,9 +1,14 @@
+import sys
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import numpy as np
+import pytest
 
-from motion_cam.camera import CameraProtocol, CameraService
-from motion_cam.config import CameraConfig
+from motion_cam.camera import CameraProtocol, CameraService, MappedFrame
+from motion_cam.config import DetectionConfig
+from motion_cam.detector import MotionDetector
+from motion_cam.config import PREVIEW_PROFILES, CameraConfig, PreviewProfile
 
 
 class TestCameraServiceProtocol:
@@ -40,6 +45,118 @@ class TestCaptureLoresFrame:
         assert np.all(frame == 128)  # Only Y plane, not UV
 
 
+class _FakeMappedArray:
+    """Stands in for picamera2.MappedArray over a padded YUV420 buffer."""
+
+    def __init__(self, buffer: np.ndarray, log: list[str]) -> None:
+        self._buffer = buffer
+        self._log = log
+
+    def __call__(self, request, stream):
+        assert stream == "lores"
+        return self
+
+    def __enter__(self):
+        self._log.append("map")
+        self.array = self._buffer
+        return self
+
+    def __exit__(self, *exc):
+        self._log.append("unmap")
+
+
+class TestMapLores:
+    def _service(self, buffer: np.ndarray, log: list[str]):
+        service = CameraService(CameraConfig(lores_resolution=(320, 240)))
+        request = MagicMock()
+        request.get_metadata.return_value = {"SensorTimestamp": 2_000_000_000}
+        request.request.sequence = 7
+        request.release.side_effect = lambda: log.append("release")
+        picam2 = MagicMock()
+        picam2.capture_request.return_value = request
+        service._picam2 = picam2
+        fake = SimpleNamespace(MappedArray=_FakeMappedArray(buffer, log))
+        return service, patch.dict(sys.modules, {"picamera2": fake})
+
+    def test_y_plane_is_a_view_into_the_request_buffer(self):
+        """No copy: the frame's pixels share memory with the mapped buffer and skip chroma."""
+        # 240 Y rows + 120 chroma rows, rows padded to a 384-byte stride
+        buffer = np.zeros((360, 384), dtype=np.uint8)
+        buffer[:240] = 100
+        buffer[240:] = 7
+        log: list[str] = []
+        service, modules = self._service(buffer, log)
+        with modules, service.map_lores() as frame:
+            assert np.shares_memory(frame.pixels, buffer)
+            assert frame.pixels.shape == (240, 320)
+            assert np.all(frame.pixels == 100)
+            assert not frame.pixels.flags.writeable
+            assert (frame.sequence, frame.timestamp) == (7, 2.0)
+            # The detector runs directly on the strided view
+            MotionDetector(DetectionConfig()).process_frame(frame.pixels)
+            assert log == ["map"]
+        assert log == ["map", "unmap", "release"]
+
+    def test_pixels_raise_after_release(self):
+        """Use after the block would read a recycled buffer, so it raises instead."""
+        log: list[str] = []
+        service, modules = self._service(np.zeros((360, 320), dtype=np.uint8), log)
+        with modules, service.map_lores() as frame:
+            kept = frame.copy()
+        assert frame.released
+        with pytest.raises(RuntimeError):
+            frame.pixels
+        assert frame.sequence == 7
+        assert kept.pixels.shape == (240, 320)
+
+    def test_request_released_when_processing_fails(self):
+        """An exception in the block still returns the buffer to the camera."""
+        log: list[str] = []
+        service, modules = self._service(np.zeros((360, 320), dtype=np.uint8), log)
+        with pytest.raises(ValueError), modules, service.map_lores():
+            raise ValueError("boom")
+        assert log == ["map", "unmap", "release"]
+
+
+class TestFrameMetadata:
+    @staticmethod
+    def _map(service: CameraService, sensor_ns: int, sequence: int | None):
+        request = MagicMock()
+        request.get_metadata.return_value = {"SensorTimestamp": sensor_ns}
+        if sequence is None:
+            del request.request.sequence
+        else:
+            request.request.sequence = sequence
+        service._picam2 = MagicMock()
+        service._picam2.capture_request.return_value = request
+        fake = SimpleNamespace(MappedArray=_FakeMappedArray(np.zeros((6, 4), dtype=np.uint8), []))
+        with patch.dict(sys.modules, {"picamera2": fake}), service.map_lores() as frame:
+            return frame.sequence, frame.timestamp
+
+    def test_frame_carries_sensor_metadata(self):
+        """The frame carries libcamera's sequence number and the exposure time in seconds."""
+        service = CameraService(CameraConfig(lores_resolution=(4, 4)))
+        assert self._map(service, sensor_ns=12_500_000_000, sequence=42) == (42, 12.5)
+
+    def test_sequence_derived_from_timestamps_when_missing(self):
+        """Without a sequence number, a gap of three frame periods counts as a jump of three."""
+        service = CameraService(CameraConfig(lores_resolution=(4, 4), framerate=10))
+        first, _ = self._map(service, 1_000_000_000, None)
+        second, _ = self._map(service, 1_300_000_000, None)
+        assert second - first == 3
+
+
+class TestMappedFrame:
+    def test_copy_owns_its_pixels(self):
+        """copy() detaches from the buffer, so it survives release."""
+        buffer = np.arange(16, dtype=np.uint8).reshape(4, 4)
+        mapped = MappedFrame(buffer, sequence=1, timestamp=0.5)
+        frame = mapped.copy()
+        mapped.release()
+        assert not np.shares_memory(frame.pixels, buffer)
+        assert frame.pixels.tolist() == buffer.tolist()
+
+
 class TestCaptureSnapshot:
     def test_saves_jpeg_to_given_path(self):
         """capture_snapshot must request a JPEG capture to the specified path."""
@@ -49,3 +166,46 @@ class TestCaptureSnapshot:
         with patch.object(service, "_picam2") as mock_cam:
             service.capture_snapshot("/tmp/test_snap.jpg")
             mock_cam.capture_file.assert_called_once_with("/tmp/test_snap.jpg")
+
+
+class TestCaptureJpegFrame:
+    def _decode(self, data: bytes) -> np.ndarray:
+        import cv2
+
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+    def test_lores_profile_encodes_y_plane_only(self):
+        """The lores profile should encode the grayscale Y plane, not the main stream."""
+        config = CameraConfig(lores_resolution=(32, 24))
+        service = CameraService(config)
+        yuv420_buffer = np.full((36, 32), 100, dtype=np.uint8)
+
+        with patch.object(service, "_picam2") as mock_cam:
+            mock_cam.capture_array.return_value = yuv420_buffer
+            data = service.capture_jpeg_frame(PREVIEW_PROFILES["low"])
+
+        mock_cam.capture_array.assert_called_once_with("lores")
+        img = self._decode(data)
+        assert img.shape == (24, 32)
+
+    def test_main_profile_resizes_to_output_size(self):
+        """Profiles with an output size should downscale the main frame before encoding."""
+        service = CameraService(CameraConfig())
+        profile = PreviewProfile(source="main", size=(64, 36), quality=70, fps=10)
+
+        with patch.object(service, "_picam2") as mock_cam:
+            mock_cam.capture_array.return_value = np.zeros((720, 1280, 3), dtype=np.uint8)
+            data = service.capture_jpeg_frame(profile)
+
+        mock_cam.capture_array.assert_called_once_with("main")
+        assert self._decode(data).shape == (36, 64, 3)
+
+    def test_default_is_full_resolution_main_stream(self):
+        """Without a profile the preview keeps the full main-stream resolution."""
+        service = CameraService(CameraConfig())
+
+        with patch.object(service, "_picam2") as mock_cam:
+            mock_cam.capture_array.return_value = np.zeros((72, 128, 3), dtype=np.uint8)
+            data = service.capture_jpeg_frame()
+
+        assert self._decode(data).shape == (72, 128, 3)
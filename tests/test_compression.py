@@ -0,0 +1,97 @@
+import gzip
+
+from flask import Flask, Response, jsonify, request
+
+from motion_cam import compression
+
+BIG_HTML = "<p>" + "motion " * 400 + "</p>"
+
+
+def _app(min_size: int = 1024) -> Flask:
+    app = Flask(__name__)
+
+    @app.route("/page")
+    def page():
+        return BIG_HTML
+
+    @app.route("/small")
+    def small():
+        return "<p>hi</p>"
+
+    @app.route("/data")
+    def data():
+        return jsonify(clips=["20260215_120000"] * 200)
+
+    @app.route("/image")
+    def image():
+        return Response(b"\xff" * 4096, mimetype="image/jpeg")
+
+    @app.route("/stream")
+    def stream():
+        return Response(iter(["<p>", "x" * 4096, "</p>"]), mimetype="text/html")
+
+    @app.after_request
+    def compress(response):
+        return compression.compress_response(request, response, min_size)
+
+    return app
+
+
+class TestCompressResponse:
+    def test_gzips_large_html(self, monkeypatch):
+        """HTML above the threshold should be gzipped when the client accepts it."""
+        monkeypatch.setattr(compression, "brotli", None)
+        resp = _app().test_client().get("/page", headers={"Accept-Encoding": "gzip, deflate"})
+
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert gzip.decompress(resp.data).decode() == BIG_HTML
+
+    def test_gzips_json(self):
+        """JSON responses should be compressed too."""
+        resp = _app().test_client().get("/data", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+
+    def test_identity_without_accept_encoding(self):
+        """Clients that do not ask for compression get the plain body, still with Vary."""
+        resp = _app().test_client().get("/page")
+        assert "Content-Encoding" not in resp.headers
+        assert resp.headers["Vary"] == "Accept-Encoding"
+        assert resp.data.decode() == BIG_HTML
+
+    def test_small_responses_are_left_alone(self):
+        """Bodies under the threshold are not worth the CPU."""
+        resp = _app().test_client().get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+
+    def test_zero_threshold_disables(self):
+        """A threshold of 0 turns compression off."""
+        resp = _app(min_size=0).test_client().get("/page", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+
+    def test_skips_other_types_and_streams(self):
+        """Images and streamed responses should pass through untouched."""
+        client = _app().test_client()
+        for path in ("/image", "/stream"):
+            resp = client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "Content-Encoding" not in resp.headers
+
+    def test_prefers_brotli_when_available(self, monkeypatch):
+        """With brotli installed, br should win over gzip."""
+
+        class FakeBrotli:
+            @staticmethod
+            def compress(data, quality):
+                return b"br:" + data[:8]
+
+        monkeypatch.setattr(compression, "brotli", FakeBrotli)
+        resp = _app().test_client().get("/page", headers={"Accept-Encoding": "gzip, br"})
+
+        assert resp.headers["Content-Encoding"] == "br"
+        assert resp.data.startswith(b"br:")
+
+    def test_respects_refused_encoding(self, monkeypatch):
+        """An encoding with q=0 must not be used."""
+        monkeypatch.setattr(compression, "brotli", None)
+        resp = _app().test_client().get("/page", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "Content-Encoding" not in resp.headers
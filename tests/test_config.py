@@ -1,7 +1,9 @@
 import os
 from unittest.mock import patch
 
-from motion_cam.config import Config, load_config
+import pytest
+
+from motion_cam.config import Config, DetectionConfig, load_config, load_detection_config
 
 
 class TestLoadConfigDefaults:
@@ -16,6 +18,9 @@ class TestLoadConfigDefaults:
         assert config.camera.main_resolution == (1280, 720)
         assert config.camera.lores_resolution == (320, 240)
         assert config.camera.framerate == 15
+        assert config.camera.backend == "picamera2"
+        assert config.camera.sim_source == ""
+        assert config.camera.sim_speed == 1.0
 
     def test_detection_defaults(self):
         with patch.dict(os.environ, {}, clear=True):
@@ -30,6 +35,7 @@ class TestLoadConfigDefaults:
             config = load_config()
         assert config.storage.max_age_days == 7
         assert config.storage.max_disk_usage_mb == 4096
+        assert config.storage.scrub_interval == 2
         assert config.storage.data_dir != ""  # should have a real default path
 
     def test_web_defaults(self):
@@ -37,6 +43,17 @@ class TestLoadConfigDefaults:
             config = load_config()
         assert config.web.port == 8080
         assert config.web.host == "0.0.0.0"
+        assert config.web.preview_profile == "balanced"
+        assert config.web.server == "waitress"
+        assert config.web.threads == 8
+
+
+    def test_monitoring_defaults(self):
+        with patch.dict(os.environ, {}, clear=True):
+            config = load_config()
+        assert config.monitoring.metrics_enabled is True
+        assert config.monitoring.profile_token == ""
+        assert config.monitoring.telemetry_enabled is True
 
 
 class TestLoadConfigEnvOverrides:
@@ -52,6 +69,29 @@ class TestLoadConfigEnvOverrides:
             config = load_config()
         assert config.camera.framerate == 30
 
+    def test_simulated_camera_override(self):
+        env = {"CAMERA_BACKEND": "sim", "CAMERA_SIM_SOURCE": "/tmp/roaches.mp4", "CAMERA_SIM_SPEED": "8"}
+        with patch.dict(os.environ, env, clear=True):
+            config = load_config()
+        assert config.camera.backend == "sim"
+        assert config.camera.sim_source == "/tmp/roaches.mp4"
+        assert config.camera.sim_speed == 8.0
+
+    def test_metrics_can_be_disabled(self):
+        with patch.dict(os.environ, {"METRICS_ENABLED": "false"}, clear=True):
+            config = load_config()
+        assert config.monitoring.metrics_enabled is False
+
+    def test_telemetry_can_be_disabled(self):
+        with patch.dict(os.environ, {"TELEMETRY_ENABLED": "0"}, clear=True):
+            config = load_config()
+        assert config.monitoring.telemetry_enabled is False
+
+    def test_profile_token_override(self):
+        with patch.dict(os.environ, {"PROFILE_TOKEN": "abc123"}, clear=True):
+            config = load_config()
+        assert config.monitoring.profile_token == "abc123"
+
     def test_detection_overrides(self):
         env = {
             "DETECTION_MIN_CONTOUR_AREA": "1000",
@@ -73,19 +113,38 @@ class TestLoadConfigEnvOverrides:
             "STORAGE_DATA_DIR": "/tmp/test-data",
             "STORAGE_MAX_AGE_DAYS": "14",
             "STORAGE_MAX_DISK_USAGE_MB": "8192",
+            "STORAGE_SCRUB_INTERVAL": "0",
         }
         with patch.dict(os.environ, env, clear=True):
             config = load_config()
         assert config.storage.data_dir == "/tmp/test-data"
         assert config.storage.max_age_days == 14
         assert config.storage.max_disk_usage_mb == 8192
+        assert config.storage.scrub_interval == 0
 
     def test_web_overrides(self):
-        env = {"WEB_PORT": "9090", "WEB_HOST": "127.0.0.1"}
+        env = {"WEB_PORT": "9090", "WEB_HOST": "127.0.0.1", "WEB_PREVIEW_PROFILE": "low"}
         with patch.dict(os.environ, env, clear=True):
             config = load_config()
         assert config.web.port == 9090
         assert config.web.host == "127.0.0.1"
+        assert config.web.preview_profile == "low"
+
+    def test_web_server_overrides(self):
+        env = {
+            "WEB_SERVER": "dev",
+            "WEB_THREADS": "4",
+            "WEB_CONNECTION_LIMIT": "16",
+            "WEB_KEEPALIVE_TIMEOUT": "10",
+            "WEB_COMPRESS_MIN_SIZE": "0",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            config = load_config()
+        assert config.web.server == "dev"
+        assert config.web.threads == 4
+        assert config.web.connection_limit == 16
+        assert config.web.keepalive_timeout == 10
+        assert config.web.compress_min_size == 0
 
     def test_partial_override_keeps_other_defaults(self):
         with patch.dict(os.environ, {"WEB_PORT": "3000"}, clear=True):
@@ -93,3 +152,40 @@ class TestLoadConfigEnvOverrides:
         assert config.web.port == 3000
         assert config.web.host == "0.0.0.0"
         assert config.camera.framerate == 15
+
+
+class TestDetectionValidation:
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"min_contour_area": -1},
+            {"blur_kernel_size": 20},
+            {"blur_kernel_size": 0},
+            {"learning_rate": 1.5},
+            {"cooldown": -1},
+            {"max_clip_duration": 0},
+        ],
+    )
+    def test_out_of_range_values_are_rejected(self, changes):
+        """Values the detector or recorder can't use fail at construction, not mid-run."""
+        with pytest.raises(ValueError):
+            DetectionConfig(**changes)
+
+    def test_load_detection_config_reads_a_mapping(self):
+        """Detection settings can be read from any mapping, such as a re-read .env file."""
+        config = load_detection_config({"DETECTION_BLUR_KERNEL_SIZE": "9"})
+        assert config.blur_kernel_size == 9
+        assert config.min_contour_area == 500
+
+    def test_malformed_env_value_raises(self):
+        with patch.dict(os.environ, {"DETECTION_BLUR_KERNEL_SIZE": "8"}, clear=True):
+            with pytest.raises(ValueError):
+                load_config()
+
+
+class TestWebValidation:
+    def test_unknown_preview_profile_fails_at_startup(self):
+        """A typo must not leave every /tuner request without ?profile= answering 400."""
+        with patch.dict(os.environ, {"WEB_PREVIEW_PROFILE": "balance"}, clear=True):
+            with pytest.raises(ValueError, match="preview_profile"):
+                load_config()
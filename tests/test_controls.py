@@ -0,0 +1,120 @@
+import threading
+import time
+
+from motion_cam.controls import ControlCoalescer
+
+
+class TestControlCoalescer:
+    def test_merges_updates_per_control(self):
+        """Updates queued during a write should go out as one merged call with the latest values."""
+        writes = []
+        first_write = threading.Event()
+        release = threading.Event()
+
+        def apply(controls):
+            writes.append(controls)
+            first_write.set()
+            release.wait(timeout=5)
+
+        coalescer = ControlCoalescer(apply, max_rate=1000)
+        coalescer.submit({"Brightness": 0.1})
+        assert first_write.wait(timeout=5)
+        coalescer.submit({"Brightness": 0.2, "Contrast": 1.5})
+        state = coalescer.submit({"Brightness": 0.3})
+        release.set()
+
+        assert state["pending"] == {"Brightness": 0.3, "Contrast": 1.5}
+        assert coalescer.flush(timeout=5)
+        assert writes == [{"Brightness": 0.1}, {"Brightness": 0.3, "Contrast": 1.5}]
+        assert coalescer.state()["applied"] == {"Brightness": 0.3, "Contrast": 1.5}
+
+    def test_write_rate_is_bounded(self):
+        """A burst of updates should produce no more writes than the rate allows."""
+        writes = []
+        coalescer = ControlCoalescer(writes.append, max_rate=10)
+        deadline = time.monotonic() + 0.35
+        sent = 0
+        while time.monotonic() < deadline:
+            coalescer.submit({"Brightness": sent})
+            sent += 1
+            time.sleep(0.005)
+        coalescer.flush(timeout=5)
+
+        assert sent > 30
+        assert len(writes) <= 5
+        assert writes[-1] == {"Brightness": sent - 1}
+
+    def test_failed_write_is_reported(self):
+        """An error from the camera should show up in the state, not kill the thread."""
+        calls = []
+
+        def apply(controls):
+            calls.append(controls)
+            if len(calls) == 1:
+                raise RuntimeError("control out of range")
+
+        coalescer = ControlCoalescer(apply, max_rate=1000)
+        coalescer.submit({"Sharpness": 99})
+        coalescer.flush(timeout=5)
+        assert coalescer.state()["error"] == "control out of range"
+        assert coalescer.state()["applied"] == {}
+
+        coalescer.submit({"Sharpness": 1})
+        coalescer.flush(timeout=5)
+        assert coalescer.state()["error"] == ""
+        assert coalescer.state()["applied"] == {"Sharpness": 1}
+
+    def test_state_is_json_safe(self):
+        """Non-primitive control values (libcamera enums) are reported as strings."""
+
+        class AfMode:
+            def __str__(self):
+                return "AfModeEnum.Manual"
+
+        coalescer = ControlCoalescer(lambda c: None, max_rate=1000)
+        coalescer.submit({"AfMode": AfMode(), "LensPosition": 2.0})
+        coalescer.flush(timeout=5)
+        assert coalescer.state()["applied"] == {"AfMode": "AfModeEnum.Manual", "LensPosition": 2.0}
+
+    def _blocked(self):
+        """A coalescer whose first write blocks until released, to queue up the rest."""
+        writes = []
+        first_write = threading.Event()
+        release = threading.Event()
+
+        def apply(controls):
+            writes.append(controls)
+            first_write.set()
+            release.wait(timeout=5)
+
+        coalescer = ControlCoalescer(apply, max_rate=1000)
+        coalescer.submit({"Brightness": 0.0})
+        assert first_write.wait(timeout=5)
+        return coalescer, writes, release
+
+    def test_one_shot_triggers_are_not_merged(self):
+        """Two focus triggers in one window are two writes, not one."""
+        coalescer, writes, release = self._blocked()
+        coalescer.submit({"AfMode": "Auto", "AfTrigger": "Start"})
+        coalescer.submit({"AfMode": "Auto", "AfTrigger": "Start"})
+        release.set()
+
+        assert coalescer.flush(timeout=5)
+        assert writes[1:] == [{"AfMode": "Auto", "AfTrigger": "Start"}] * 2
+
+    def test_trigger_keeps_its_place_among_state_writes(self):
+        """Values set before a trigger go with it; values set after follow it, without it."""
+        coalescer, writes, release = self._blocked()
+        coalescer.submit({"Brightness": 0.2})
+        coalescer.submit({"AfMode": "Auto", "AfTrigger": "Start"})
+        coalescer.submit({"AfMode": "Continuous"})
+        coalescer.submit({"Brightness": 0.4})
+        release.set()
+
+        assert coalescer.flush(timeout=5)
+        assert writes[1:] == [
+            {"Brightness": 0.2, "AfMode": "Auto", "AfTrigger": "Start"},
+            {"AfMode": "Continuous", "Brightness": 0.4},
+        ]
+        # A trigger is an event, not a value to restore later
+        assert "AfTrigger" not in coalescer.state()["applied"]
@@ -1,7 +1,14 @@
 import numpy as np
 
 from motion_cam.config import DetectionConfig
-from motion_cam.detector import MotionDetector, MotionEvent
+from motion_cam.detector import (
+    STAGE_SECONDS,
+    STAGES,
+    MotionDetector,
+    MotionEvent,
+    scaled_learning_rate,
+)
+from motion_cam.metrics import Registry
 
 
 def _make_detector(min_contour_area=500, blur_kernel_size=21) -> MotionDetector:
@@ -91,3 +98,152 @@ class TestMotionDetection:
         assert isinstance(event.largest_area, int)
         if event.detected:
             assert event.largest_area >= 100
+
+
+class TestStageMetrics:
+    def test_times_every_stage_once_per_frame(self):
+        """With a registry, each stage of process_frame gets one observation per frame."""
+        registry = Registry()
+        detector = MotionDetector(DetectionConfig(), metrics=registry)
+        for _ in range(3):
+            detector.process_frame(_static_frame())
+
+        for stage in STAGES:
+            assert registry.histogram(STAGE_SECONDS, "", stage=stage).snapshot()[2] == 3
+
+    def test_results_match_uninstrumented_detector(self):
+        """Instrumentation must not change what the detector reports."""
+        plain = _make_detector(min_contour_area=100)
+        timed = MotionDetector(DetectionConfig(min_contour_area=100), metrics=Registry())
+        frames = [_static_frame(value=50)] * 30 + [
+            _frame_with_object(bg_value=50, obj_value=200, obj_rect=(50, 50, 40, 40))
+        ]
+        for frame in frames:
+            assert plain.process_frame(frame) == timed.process_frame(frame)
+
+
+class TestTimeNormalizedLearning:
+    def test_rate_compounds_over_elapsed_intervals(self):
+        """Two intervals at rate r leave (1 - r)^2 of the old background."""
+        assert abs(scaled_learning_rate(0.1, dt=0.1, frame_interval=0.1) - 0.1) < 1e-9
+        assert abs(scaled_learning_rate(0.1, dt=0.2, frame_interval=0.1) - 0.19) < 1e-9
+        assert scaled_learning_rate(0.5, dt=100.0, frame_interval=0.1) == 1.0
+
+    def test_dropped_frames_do_not_slow_background_adaptation(self):
+        """A stationary object is absorbed after the same wall time whatever the frame rate."""
+
+        def seconds_until_absorbed(dt: float) -> float:
+            detector = MotionDetector(
+                DetectionConfig(min_contour_area=100, learning_rate=0.005), frame_interval=0.1
+            )
+            for _ in range(30):
+                detector.process_frame(_static_frame(value=50), dt=0.1)
+            parked = _frame_with_object(bg_value=50, obj_value=200, obj_rect=(50, 50, 40, 40))
+            frames = 0
+            while detector.process_frame(parked, dt=dt).detected:
+                frames += 1
+            return frames * dt
+
+        full_rate = seconds_until_absorbed(0.1)
+        quarter_rate = seconds_until_absorbed(0.4)
+        assert full_rate > 1.0
+        assert abs(full_rate - quarter_rate) <= 0.5
+
+    def test_without_dt_behaves_per_frame(self):
+        """Frames without timing (or a detector without an interval) use the configured rate as is."""
+        plain = _make_detector(min_contour_area=100)
+        timed = MotionDetector(DetectionConfig(min_contour_area=100), frame_interval=0.1)
+        frames = [_static_frame(value=50)] * 30 + [
+            _frame_with_object(bg_value=50, obj_value=200, obj_rect=(50, 50, 40, 40))
+        ] * 5
+        for frame in frames:
+            assert plain.process_frame(frame) == timed.process_frame(frame, dt=None)
+
+
+class TestUpdateConfig:
+    def test_keeps_learned_background(self):
+        """New thresholds apply immediately without re-learning the scene."""
+        detector = _make_detector(min_contour_area=500)
+        background = _static_frame(value=50)
+        for _ in range(30):
+            detector.process_frame(background)
+        model = detector._bg_subtractor
+
+        detector.update_config(DetectionConfig(min_contour_area=100, blur_kernel_size=11))
+        assert detector._bg_subtractor is model
+        assert detector.config.min_contour_area == 100
+        # A restarted detector would flag the whole first frames; this one stays quiet
+        assert not detector.process_frame(background).detected
+        small = _frame_with_object(bg_value=50, obj_value=200, obj_rect=(50, 50, 15, 15))
+        assert detector.process_frame(small).detected
+
+
+def _scene(rng: np.random.Generator, floor: np.ndarray) -> np.ndarray:
+    """The same textured floor under fresh sensor noise."""
+    noise = rng.integers(-4, 5, floor.shape)
+    return np.clip(floor.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+class TestWarmStart:
+    """A detector seeded from a saved background after a restart."""
+
+    def _floor(self) -> np.ndarray:
+        return np.random.default_rng(0).integers(60, 120, (240, 320)).astype(np.uint8)
+
+    def _learned_background(self, floor: np.ndarray) -> np.ndarray:
+        rng = np.random.default_rng(1)
+        detector = _make_detector()
+        for _ in range(60):
+            detector.process_frame(_scene(rng, floor))
+        return detector.background_image()
+
+    def test_no_background_before_first_frame(self):
+        assert _make_detector().background_image() is None
+
+    def test_background_is_in_blurred_frame_shape(self):
+        floor = self._floor()
+        background = self._learned_background(floor)
+        assert background.shape == floor.shape
+        assert background.dtype == np.uint8
+
+    def test_seeded_detector_sees_nothing_in_unchanged_scene(self):
+        floor = self._floor()
+        detector = _make_detector()
+        detector.seed(self._learned_background(floor))
+        rng = np.random.default_rng(2)
+        detections = [detector.process_frame(_scene(rng, floor)).detected for _ in range(30)]
+        assert detector.seeded is True
+        assert not any(detections)
+
+    def test_object_present_at_restart_leaves_no_ghost(self):
+        floor = self._floor()
+        background = self._learned_background(floor)
+        with_object = floor.copy()
+        with_object[100:140, 150:190] = 230
+
+        def run(detector: MotionDetector) -> list[bool]:
+            rng = np.random.default_rng(3)
+            frames = [with_object] * 15 + [floor] * 15
+            return [detector.process_frame(_scene(rng, f)).detected for f in frames]
+
+        cold = run(_make_detector())
+        seeded = _make_detector()
+        seeded.seed(background)
+        warm = run(seeded)
+        # A cold model learns the object as background, then flags the empty spot it left
+        assert any(cold[15:])
+        assert warm[0]
+        assert not any(warm[15:])
+
+    def test_seed_for_a_changed_scene_is_dropped(self):
+        floor = self._floor()
+        detector = _make_detector()
+        detector.seed(self._learned_background(floor))
+        detector.process_frame(np.clip(floor.astype(np.int16) + 80, 0, 255).astype(np.uint8))
+        assert detector.seeded is False
+
+    def test_seed_of_another_resolution_is_dropped(self):
+        detector = _make_detector()
+        detector.seed(np.zeros((120, 160), dtype=np.uint8))
+        detector.process_frame(_static_frame())
+        assert detector.seeded is False
@@ -0,0 +1,73 @@
+import io
+import tarfile
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from motion_cam import export
+
+
+def _entries(tmp_path: Path, sizes: list[int]) -> list[export.ExportEntry]:
+    files = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / f"file{i}.bin"
+        path.write_bytes(bytes([i % 256]) * size)
+        files.append((path, f"2026-02-15/file{i}.bin"))
+    return export.collect_entries(files)
+
+
+class TestTar:
+    def test_matches_tarfile_and_declared_size(self, tmp_path):
+        """The streamed TAR should be readable and exactly tar_size() bytes."""
+        entries = _entries(tmp_path, [0, 1, 511, 512, 70_000])
+        data = b"".join(export.stream_tar(entries))
+
+        assert len(data) == export.tar_size(entries)
+        with tarfile.open(fileobj=io.BytesIO(data)) as tf:
+            members = tf.getmembers()
+            assert [m.name for m in members] == [e.name for e in entries]
+            assert tf.extractfile(members[4]).read() == bytes([4]) * 70_000
+
+    @pytest.mark.parametrize("start,stop", [(0, 10), (500, 1600), (1024, None), (70_000, 71_000)])
+    def test_any_byte_range_matches_the_full_stream(self, tmp_path, start, stop):
+        """Streaming a range should give the same bytes as slicing the whole archive."""
+        entries = _entries(tmp_path, [100, 70_000, 3])
+        full = b"".join(export.stream_tar(entries))
+        assert b"".join(export.stream_tar(entries, start, stop)) == full[start:stop]
+
+    def test_skips_vanished_files(self, tmp_path):
+        """Files deleted before the export starts are left out, not errors."""
+        entries = export.collect_entries([(tmp_path / "gone.mp4", "2026-02-15/gone.mp4")])
+        assert entries == []
+
+
+class TestZip:
+    def test_stored_entries_readable_by_zipfile(self, tmp_path):
+        """The streamed ZIP should list every entry, uncompressed, with the right content."""
+        entries = _entries(tmp_path, [0, 10, 200_000])
+        data = b"".join(export.stream_zip(entries))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.testzip() is None
+            infos = zf.infolist()
+            assert [i.filename for i in infos] == [e.name for e in entries]
+            assert all(i.compress_type == zipfile.ZIP_STORED for i in infos)
+            assert zf.read(infos[2].filename) == bytes([2]) * 200_000
+
+
+class TestMemory:
+    @pytest.mark.parametrize("stream", [export.stream_tar, export.stream_zip])
+    def test_memory_stays_flat(self, tmp_path, stream):
+        """Peak memory while streaming should not grow with the archive size."""
+        entries = _entries(tmp_path, [8 * 1024 * 1024] * 3)
+        tracemalloc.start()
+        total = 0
+        for chunk in stream(entries):
+            total += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert total > 24 * 1024 * 1024
+        assert peak < 1024 * 1024
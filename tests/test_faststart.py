@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from motion_cam.faststart import backfill, faststart, faststart_in_place, moov_first
+
+
+def _write_clip(path: Path, frames: int = 30) -> None:
+    """Write a small moov-last MP4 (OpenCV appends the index at the end)."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 15, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("OpenCV build cannot write MP4")
+    for i in range(frames):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[:, (i * 2) % 64:] = 200
+        writer.write(frame)
+    writer.release()
+
+
+def _decode(path: Path) -> list[np.ndarray]:
+    cap = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+class TestFaststart:
+    def test_moves_moov_before_mdat(self, tmp_path):
+        """The rewritten file should have its index at the front."""
+        src = tmp_path / "clip.mp4"
+        dst = tmp_path / "fast.mp4"
+        _write_clip(src)
+        assert moov_first(str(src)) is False
+
+        assert faststart(str(src), str(dst)) is True
+
+        assert moov_first(str(dst)) is True
+        assert dst.stat().st_size == src.stat().st_size
+
+    def test_rewritten_clip_decodes_identically(self, tmp_path):
+        """Shifting chunk offsets must keep every frame decodable and unchanged."""
+        src = tmp_path / "clip.mp4"
+        dst = tmp_path / "fast.mp4"
+        _write_clip(src)
+        faststart(str(src), str(dst))
+
+        original, rewritten = _decode(src), _decode(dst)
+        assert len(rewritten) == len(original) == 30
+        for a, b in zip(original, rewritten):
+            assert np.array_equal(a, b)
+
+    def test_already_faststart_is_left_alone(self, tmp_path):
+        src = tmp_path / "clip.mp4"
+        _write_clip(src)
+        faststart_in_place(str(src))
+
+        assert faststart_in_place(str(src)) is False
+        assert not (tmp_path / "clip.mp4.faststart").exists()
+
+    def test_garbage_file_is_not_rewritten(self, tmp_path):
+        """Unparseable input should be left untouched rather than raising."""
+        src = tmp_path / "clip.mp4"
+        src.write_bytes(b"\x00\x00\x00\x04junk")
+        assert faststart_in_place(str(src)) is False
+        assert src.read_bytes() == b"\x00\x00\x00\x04junk"
+
+
+class TestBackfill:
+    def test_converts_only_moov_last_clips(self, tmp_path):
+        """Backfill should convert old clips and skip ones that are already faststart."""
+        day = tmp_path / "2026-02-15"
+        day.mkdir()
+        _write_clip(day / "20260215_100000.mp4")
+        _write_clip(day / "20260215_110000.mp4")
+        faststart_in_place(str(day / "20260215_110000.mp4"))
+
+        assert backfill(str(tmp_path)) == 1
+        assert moov_first(str(day / "20260215_100000.mp4")) is True
@@ -0,0 +1,69 @@
+import numpy as np
+
+from motion_cam.camera import Frame
+from motion_cam.framestats import DROPPED_TOTAL, LATENCY_SECONDS, FrameStats
+from motion_cam.metrics import Registry
+
+
+def _frame(sequence: int, timestamp: float) -> Frame:
+    return Frame(pixels=np.zeros((2, 2), dtype=np.uint8), sequence=sequence, timestamp=timestamp)
+
+
+class TestBegin:
+    def test_first_frame_has_no_interval(self):
+        """There is nothing to measure a gap against until the second frame."""
+        stats = FrameStats()
+        assert stats.begin(_frame(10, 5.0)) is None
+        assert stats.total_dropped == 0
+
+    def test_returns_exposure_interval_and_counts_sequence_gaps(self):
+        """A jump from 11 to 14 means frames 12 and 13 were never processed."""
+        stats = FrameStats()
+        stats.begin(_frame(10, 5.0))
+        assert abs(stats.begin(_frame(11, 5.1)) - 0.1) < 1e-9
+        assert abs(stats.begin(_frame(14, 5.4)) - 0.3) < 1e-9
+        assert stats.total_dropped == 2
+
+    def test_sequence_restart_is_not_a_gap(self):
+        """A restarted camera numbers from zero again; that is not a negative drop."""
+        stats = FrameStats()
+        stats.begin(_frame(500, 5.0))
+        assert stats.begin(_frame(0, 6.0)) is None
+        assert stats.total_dropped == 0
+
+
+class TestEnd:
+    def test_summarizes_each_window(self):
+        """Once a window has passed, fps, drops and latency cover just that window."""
+        stats = FrameStats(window=1.0)
+        stats._reset(100.0)
+        stats.begin(_frame(0, 100.0))
+        assert stats.end(_frame(0, 100.0), now=100.05) is None
+        stats.begin(_frame(3, 100.3))
+        assert stats.end(_frame(3, 100.3), now=100.4) is None
+        stats.begin(_frame(4, 100.9))
+        window = stats.end(_frame(4, 100.9), now=101.0)
+
+        assert window.frames == 3
+        assert window.dropped == 2
+        assert abs(window.fps - 3.0) < 1e-9
+        assert abs(window.latency_ms - 250 / 3) < 1e-6
+        assert abs(window.max_latency_ms - 100) < 1e-6
+
+        stats.begin(_frame(5, 101.0))
+        assert stats.end(_frame(5, 101.0), now=101.02) is None
+        assert stats._dropped == 0
+
+    def test_feeds_metrics(self):
+        """With a registry, drops and per-frame latency are exported."""
+        registry = Registry()
+        stats = FrameStats(metrics=registry)
+        stats.begin(_frame(0, 1.0))
+        stats.end(_frame(0, 1.0), now=1.03)
+        stats.begin(_frame(5, 1.5))
+        stats.end(_frame(5, 1.5), now=1.52)
+
+        assert registry.counter(DROPPED_TOTAL, "").value == 4
+        counts, total, count = registry.histogram(LATENCY_SECONDS, "").snapshot()
+        assert count == 2
+        assert abs(total - 0.05) < 1e-9
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from motion_cam.jobs import JobManager
+
+
+class TestJobManager:
+    def test_runs_job_and_records_result(self):
+        """Submitted work should run in the background and store its return value."""
+        jobs = JobManager()
+        job = jobs.submit("add", lambda job: 1 + 2)
+
+        assert jobs.wait(timeout=5)
+        assert job.state == "done"
+        assert job.result == 3
+        assert jobs.get(job.id) is job
+
+    def test_failed_job_records_error(self):
+        """An exception in a job should mark it failed instead of killing the worker."""
+        jobs = JobManager()
+
+        def boom(job):
+            raise RuntimeError("disk gone")
+
+        failed = jobs.submit("boom", boom)
+        ok = jobs.submit("ok", lambda job: "fine")
+
+        assert jobs.wait(timeout=5)
+        assert failed.state == "failed"
+        assert failed.error == "disk gone"
+        assert ok.state == "done"
+
+    def test_jobs_run_one_at_a_time(self):
+        """Jobs should run sequentially on a single worker thread."""
+        jobs = JobManager()
+        running = []
+        overlap = threading.Event()
+
+        def work(job):
+            running.append(job.id)
+            if len(running) > 1:
+                overlap.set()
+            running.remove(job.id)
+
+        for _ in range(5):
+            jobs.submit("work", work)
+
+        assert jobs.wait(timeout=5)
+        assert not overlap.is_set()
+
+    def test_progress_updates_job(self):
+        """Job.progress should record done/total counts for polling clients."""
+        jobs = JobManager()
+        job = jobs.submit("count", lambda job: job.progress(3, 4))
+
+        jobs.wait(timeout=5)
+        assert (job.done, job.total) == (3, 4)
+
+    def test_unknown_job_is_none(self):
+        assert JobManager().get("missing") is None
+
+    def test_nice_lowers_only_the_worker_thread(self):
+        """A low-priority worker yields the CPU without renicing the rest of the process."""
+        if not sys.platform.startswith("linux"):
+            pytest.skip("per-thread nice values are Linux-only")
+        before = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+        jobs = JobManager(name="low", nice=5)
+        job = jobs.submit(
+            "priority", lambda job: os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+        )
+
+        assert jobs.wait(timeout=5)
+        assert job.result == min(19, before + 5)
+        assert os.getpriority(os.PRIO_PROCESS, threading.get_native_id()) == before
@@ -0,0 +1,24 @@
+from motion_cam.manifest import MANIFEST_NAME, ClipManifest
+
+
+class TestClipManifest:
+    def test_persists_in_flight_states(self, tmp_path):
+        """States should survive reopening the manifest, as after a restart."""
+        ClipManifest(str(tmp_path)).mark("20260215_120000", "recording")
+
+        reopened = ClipManifest(str(tmp_path))
+        assert reopened.pending() == {"20260215_120000": "recording"}
+
+    def test_complete_removes_entry(self, tmp_path):
+        """Complete clips should not be kept in the manifest."""
+        manifest = ClipManifest(str(tmp_path))
+        manifest.mark("20260215_120000", "finalizing")
+        manifest.mark("20260215_120000", "complete")
+
+        assert ClipManifest(str(tmp_path)).pending() == {}
+        assert manifest.state("20260215_120000") == "complete"
+
+    def test_corrupt_manifest_is_treated_as_empty(self, tmp_path):
+        """A truncated manifest file should not prevent startup."""
+        (tmp_path / MANIFEST_NAME).write_text("{not json")
+        assert ClipManifest(str(tmp_path)).pending() == {}
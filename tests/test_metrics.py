@@ -0,0 +1,97 @@
+import re
+import threading
+
+from motion_cam.metrics import Counter, Histogram, Registry
+
+
+class TestHistogram:
+    def test_counts_are_cumulative_with_inf_bucket(self):
+        """Each bucket counts observations at or below its bound; +Inf counts all."""
+        hist = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            hist.observe(value)
+        counts, total, count = hist.snapshot()
+        assert counts == [2, 3, 4]
+        assert count == 4
+        assert total == 3.65
+
+    def test_time_context_observes_elapsed_seconds(self):
+        """Histogram.time() records one observation covering the block."""
+        hist = Histogram()
+        with hist.time():
+            pass
+        counts, total, count = hist.snapshot()
+        assert count == 1
+        assert 0 <= total < 0.1
+
+    def test_concurrent_observations_are_not_lost(self):
+        """Request threads share histograms, so updates must not race."""
+        hist = Histogram()
+
+        def observe() -> None:
+            for _ in range(10_000):
+                hist.observe(0.001)
+
+        threads = [threading.Thread(target=observe) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert hist.snapshot()[2] == 40_000
+
+
+class TestCounter:
+    def test_increments_accumulate(self):
+        """inc() adds one by default or the given amount."""
+        counter = Counter()
+        counter.inc()
+        counter.inc(4)
+        assert counter.value == 5
+
+
+class TestRegistry:
+    def test_same_name_and_labels_share_a_histogram(self):
+        """Looking a series up again returns the one already being filled."""
+        registry = Registry()
+        a = registry.histogram("x_seconds", "X.", stage="blur")
+        assert registry.histogram("x_seconds", "X.", stage="blur") is a
+        assert registry.histogram("x_seconds", "X.", stage="contours") is not a
+
+    def test_renders_prometheus_text_format(self):
+        """Output has HELP/TYPE once per family and _bucket/_sum/_count per series."""
+        registry = Registry()
+        registry.histogram("x_seconds", "Time for X.", buckets=(0.5,), stage="blur").observe(0.25)
+        registry.histogram("x_seconds", "Time for X.", buckets=(0.5,), stage="contours").observe(2.0)
+        text = registry.render()
+
+        assert text.count("# HELP x_seconds Time for X.") == 1
+        assert text.count("# TYPE x_seconds histogram") == 1
+        assert 'x_seconds_bucket{stage="blur",le="0.5"} 1' in text
+        assert 'x_seconds_bucket{stage="blur",le="+Inf"} 1' in text
+        assert 'x_seconds_bucket{stage="contours",le="0.5"} 0' in text
+        assert 'x_seconds_sum{stage="contours"} 2.0' in text
+        assert 'x_seconds_count{stage="contours"} 1' in text
+        assert text.endswith("\n")
+
+    def test_unlabelled_series_and_escaping(self):
+        """Series without labels have no braces on _sum/_count; label values are escaped."""
+        registry = Registry()
+        registry.histogram("plain_seconds", "Plain.", buckets=(1.0,)).observe(0.5)
+        registry.histogram("odd_seconds", "Odd.", buckets=(1.0,), path='a"b\\c').observe(0.5)
+        text = registry.render()
+
+        assert "plain_seconds_count 1" in text
+        assert 'plain_seconds_bucket{le="1.0"} 1' in text
+        assert 'odd_seconds_count{path="a\\"b\\\\c"} 1' in text
+        for line in text.splitlines():
+            assert line.startswith("#") or re.match(r"^\w+(\{.*\})? \S+$", line)
+
+    def test_renders_counters(self):
+        """Counters render as a single sample per series under TYPE counter."""
+        registry = Registry()
+        registry.counter("drops_total", "Drops.").inc(3)
+        text = registry.render()
+
+        assert "# TYPE drops_total counter" in text
+        assert "drops_total 3.0" in text
+        assert registry.counter("drops_total", "Drops.").value == 3
@@ -0,0 +1,106 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from motion_cam import previews
+
+
+def _create_clip(data_dir: Path, timestamp: str) -> Path:
+    date_dir = data_dir / f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
+    date_dir.mkdir(parents=True, exist_ok=True)
+    mp4 = date_dir / f"{timestamp}.mp4"
+    mp4.write_bytes(b"\x00" * 64)
+    return mp4
+
+
+class FakePopen:
+    """Stands in for ffmpeg: writes the output file named last on the command line."""
+
+    calls: list[list[str]] = []
+
+    def __init__(self, cmd, **kwargs):
+        FakePopen.calls.append(cmd)
+        Path(cmd[-1]).write_bytes(b"\xff\xd8mosaic\xff\xd9")
+
+    def wait(self, timeout=None):
+        return 0
+
+
+class TestBuildTrack:
+    def test_maps_each_interval_to_a_tile(self):
+        """Cues should cover the clip and address tiles left to right, then down."""
+        track = previews.build_track("clip_scrub.jpg", duration=23.5, interval=2)
+        blocks = track.strip().split("\n\n")
+
+        assert blocks[0] == "WEBVTT"
+        assert len(blocks) == 1 + 12
+        assert blocks[1] == "00:00:00.000 --> 00:00:02.000\nclip_scrub.jpg#xywh=0,0,160,90"
+        assert blocks[11] == "00:00:20.000 --> 00:00:22.000\nclip_scrub.jpg#xywh=0,90,160,90"
+        assert blocks[12].startswith("00:00:22.000 --> 00:00:23.500\n")
+
+
+class TestGenerate:
+    def test_writes_mosaic_and_track_at_low_priority(self, tmp_path):
+        """ffmpeg should run niced on one thread, and the track should point at the mosaic."""
+        mp4 = _create_clip(tmp_path, "20260215_120000")
+        FakePopen.calls = []
+        with patch.object(previews, "_probe_duration", return_value=30.0), \
+                patch("motion_cam.previews.subprocess.Popen", FakePopen):
+            assert previews.generate(mp4, interval=2) is True
+
+        cmd = FakePopen.calls[0]
+        assert cmd[:3] == ["nice", "-n", "19"]
+        assert cmd[cmd.index("-threads") + 1] == "1"
+        assert "tile=10x2" in cmd[cmd.index("-vf") + 1]
+        mosaic, track = previews.preview_paths(mp4)
+        assert mosaic.read_bytes().startswith(b"\xff\xd8")
+        assert "20260215_120000_scrub.jpg#xywh=" in track.read_text()
+
+    def test_unreadable_clip_is_not_retried(self, tmp_path):
+        """A clip ffprobe cannot read should fail without running ffmpeg."""
+        mp4 = _create_clip(tmp_path, "20260215_120000")
+        with patch.object(previews, "_probe_duration", return_value=None), \
+                patch("motion_cam.previews.subprocess.Popen") as popen:
+            assert previews.generate(mp4, interval=2) is False
+        popen.assert_not_called()
+
+
+class TestYieldToRecorder:
+    def test_run_is_stopped_when_busy(self, monkeypatch):
+        """A running command should be killed as soon as the busy check turns true."""
+        monkeypatch.setattr(previews, "POLL_INTERVAL", 0.05)
+        cmd = [sys.executable, "-c", "import time; time.sleep(10)"]
+        assert previews._run_unless_busy(cmd, busy=lambda: True, timeout=30) is None
+
+    def test_waits_until_idle_before_starting(self, tmp_path, monkeypatch):
+        """Generation should not start while the recorder is busy."""
+        monkeypatch.setattr(previews, "POLL_INTERVAL", 0.01)
+        mp4 = _create_clip(tmp_path, "20260215_120000")
+        busy_checks = iter([True, True, False])
+        started = []
+
+        def fake_generate(path, interval, busy):
+            started.append(path)
+            return True
+
+        with patch.object(previews, "generate", fake_generate):
+            assert previews.generate_when_idle(mp4, 2, busy=lambda: next(busy_checks, False))
+        assert started == [mp4]
+
+    def test_retries_after_yielding(self, tmp_path, monkeypatch):
+        """A run abandoned for a recording should be attempted again."""
+        monkeypatch.setattr(previews, "POLL_INTERVAL", 0.01)
+        mp4 = _create_clip(tmp_path, "20260215_120000")
+        results = iter([None, True])
+        with patch.object(previews, "generate", lambda *a: next(results)):
+            assert previews.generate_when_idle(mp4, 2, busy=lambda: False)
+
+
+class TestMissing:
+    def test_lists_clips_without_a_track(self, tmp_path):
+        """Only clips lacking a scrub track should be queued for backfill."""
+        done = _create_clip(tmp_path, "20260214_100000")
+        previews.preview_paths(done)[1].write_text("WEBVTT\n")
+        todo = _create_clip(tmp_path, "20260215_100000")
+
+        assert previews.missing(str(tmp_path)) == [todo]
@@ -0,0 +1,62 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from motion_cam.profiler import ProfilerBusy, SamplingProfiler, collapse_stack, format_collapsed
+
+
+def _spin_in_marker_function(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestCollapseStack:
+    def test_root_first_with_thread_name(self):
+        """Stacks start at the thread name and end at the innermost frame."""
+        stack = collapse_stack("worker 1", sys._getframe())
+        parts = stack.split(";")
+        assert parts[0] == "worker_1"
+        assert parts[-1] == f"{__name__}:TestCollapseStack.test_root_first_with_thread_name"
+        assert " " not in stack
+
+
+class TestSamplingProfiler:
+    def test_samples_other_threads(self):
+        """A busy thread shows up with its function on the sampled stacks."""
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin_in_marker_function, args=(stop,), name="spinner")
+        worker.start()
+        try:
+            stacks, samples = SamplingProfiler().capture(0.2, hz=200)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert samples >= 10
+        spinner = {s: n for s, n in stacks.items() if s.startswith("spinner;")}
+        assert any("_spin_in_marker_function" in s for s in spinner)
+        # The sampling thread itself is left out
+        assert not any("SamplingProfiler._sample" in s for s in stacks)
+
+    def test_one_capture_at_a_time(self):
+        """A second capture while one is running is refused, not queued."""
+        profiler = SamplingProfiler()
+        worker = threading.Thread(target=profiler.capture, args=(0.3,))
+        worker.start()
+        time.sleep(0.05)
+        try:
+            assert profiler.busy
+            with pytest.raises(ProfilerBusy):
+                profiler.capture(0.1)
+        finally:
+            worker.join()
+        assert not profiler.busy
+
+    def test_format_collapsed_is_most_common_first(self):
+        """Output lines are 'stack count', heaviest stack first."""
+        from collections import Counter
+
+        text = format_collapsed(Counter({"a;b": 2, "a;c": 5}))
+        assert text == "a;c 5\na;b 2\n"
@@ -4,7 +4,9 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from motion_cam.config import DetectionConfig, StorageConfig
-from motion_cam.recorder import Recorder
+from motion_cam.manifest import COMPLETE
+from motion_cam.metrics import Registry
+from motion_cam.recorder import RECORDER_SECONDS, Recorder
 
 
 def _make_recorder(tmp_path: Path, max_clip_duration: int = 60) -> Recorder:
@@ -35,24 +37,48 @@ class TestStartRecording:
         assert snap_path.endswith("_snap.jpg")
 
 
+class TestRecorderMetrics:
+    def test_times_start_stop_and_finalize(self, tmp_path):
+        """Each recorder operation is observed under its own op label."""
+        registry = Registry()
+        recorder = Recorder(
+            MagicMock(), StorageConfig(data_dir=str(tmp_path)), DetectionConfig(), metrics=registry
+        )
+        with patch("motion_cam.recorder._generate_thumbnail"):
+            recorder.start_recording("20260215_120000")
+            recorder.stop_recording()
+
+        for op in ("start", "stop", "finalize"):
+            assert registry.histogram(RECORDER_SECONDS, "", op=op).snapshot()[2] == 1
+
+
 class TestStopRecording:
-    def test_converts_h264_to_mp4_via_ffmpeg(self, tmp_path):
-        """stop_recording should call ffmpeg to convert the .h264 file to .mp4."""
+    def test_finalize_faststarts_partial_then_publishes(self, tmp_path):
+        """The partial is rewritten moov-first, then renamed into place and marked complete."""
         recorder = _make_recorder(tmp_path)
         recorder.start_recording("20260215_120000")
-
-        with patch("motion_cam.recorder.subprocess.run") as mock_run:
-            mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0)
+        partial = recorder._camera.start_recording.call_args[0][0]
+        Path(partial).write_bytes(b"\x00" * 64)
+        mp4 = str(tmp_path / "2026-02-15" / "20260215_120000.mp4")
+
+        steps = []
+        real_replace = os.replace
+
+        def replace(src, dst):
+            # The manifest saves through os.replace too; only the clip's rename matters here
+            if str(src).endswith(".partial"):
+                steps.append(("replace", str(src), str(dst)))
+            real_replace(src, dst)
+
+        with patch("motion_cam.recorder._generate_thumbnail"), patch(
+            "motion_cam.faststart.faststart_in_place",
+            side_effect=lambda path: steps.append(("faststart", path)),
+        ), patch("motion_cam.recorder.os.replace", side_effect=replace):
             recorder.stop_recording()
 
-        assert recorder.is_recording is False
-        # Should have called ffmpeg at least once (conversion + thumbnail)
-        assert mock_run.call_count >= 1
-        # First call should be the H264 → MP4 conversion
-        first_call_args = mock_run.call_args_list[0][0][0]
-        assert "ffmpeg" in first_call_args
-        assert any(arg.endswith(".h264") for arg in first_call_args)
-        assert any(arg.endswith(".mp4") for arg in first_call_args)
+        assert steps == [("faststart", partial), ("replace", partial, mp4)]
+        assert os.path.exists(mp4)
+        assert recorder._manifest.state("20260215_120000") == COMPLETE
 
     def test_generates_thumbnail_from_video(self, tmp_path):
         """stop_recording should extract a thumbnail frame from the video via ffmpeg."""
@@ -84,3 +110,107 @@ class TestMaxClipDuration:
                 recorder.check_max_duration()
 
         assert recorder.is_recording is False
+
+
+    def test_updated_limit_applies_to_current_clip(self, tmp_path):
+        """A shorter limit set while recording ends the clip at the next check."""
+        recorder = _make_recorder(tmp_path, max_clip_duration=60)
+        recorder.start_recording("20260215_120000")
+        recorder.update_config(DetectionConfig(max_clip_duration=2))
+
+        with patch("motion_cam.recorder.time.time", return_value=recorder._start_time + 3):
+            with patch("motion_cam.recorder.subprocess.run") as mock_run:
+                mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0)
+                recorder.check_max_duration()
+
+        assert recorder.is_recording is False
+
+
+class TestClipLifecycle:
+    def test_records_to_partial_name(self, tmp_path):
+        """The camera should write to a .partial file until the clip is finalized."""
+        recorder = _make_recorder(tmp_path)
+        recorder.start_recording("20260215_120000")
+
+        path = recorder._camera.start_recording.call_args[0][0]
+        assert path.endswith("20260215_120000.mp4.partial")
+        assert recorder._manifest.state("20260215_120000") == "recording"
+
+    def test_stop_publishes_mp4_and_completes_manifest(self, tmp_path):
+        """Finalizing should atomically rename the partial and clear the manifest entry."""
+        recorder = _make_recorder(tmp_path)
+        recorder.start_recording("20260215_120000")
+        partial = Path(recorder._camera.start_recording.call_args[0][0])
+        partial.write_bytes(b"\x00" * 64)
+
+        with patch("motion_cam.recorder.subprocess.run") as mock_run:
+            mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0)
+            recorder.stop_recording()
+
+        assert not partial.exists()
+        assert (tmp_path / "2026-02-15" / "20260215_120000.mp4").exists()
+        assert recorder._manifest.pending() == {}
+
+    def test_notifies_when_clip_is_published(self, tmp_path):
+        """on_clip_complete should be called with the timestamp once the mp4 exists."""
+        completed = []
+        recorder = Recorder(
+            MagicMock(),
+            StorageConfig(data_dir=str(tmp_path)),
+            DetectionConfig(),
+            on_clip_complete=completed.append,
+        )
+        recorder.start_recording("20260215_120000")
+        Path(recorder._camera.start_recording.call_args[0][0]).write_bytes(b"\x00" * 64)
+
+        with patch("motion_cam.recorder.subprocess.run") as mock_run:
+            mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0)
+            recorder.stop_recording()
+
+        assert completed == ["20260215_120000"]
+
+
+class TestReconcile:
+    def _interrupted(self, tmp_path: Path, partial_bytes: bytes) -> Recorder:
+        """Simulate a crash mid-recording, then return a fresh recorder."""
+        crashed = _make_recorder(tmp_path)
+        crashed.start_recording("20260215_120000")
+        Path(crashed._camera.start_recording.call_args[0][0]).write_bytes(partial_bytes)
+        return _make_recorder(tmp_path)
+
+    def test_discards_empty_partial(self, tmp_path):
+        """An empty partial cannot be repaired and should be cleaned up."""
+        recorder = self._interrupted(tmp_path, b"")
+        (tmp_path / "2026-02-15" / "20260215_120000_snap.jpg").write_bytes(b"\xff")
+
+        assert recorder.reconcile() == 0
+        assert list((tmp_path / "2026-02-15").iterdir()) == []
+        assert recorder._manifest.pending() == {}
+
+    def test_repairs_non_empty_partial(self, tmp_path):
+        """A partial with data should be remuxed into a complete clip."""
+        recorder = self._interrupted(tmp_path, b"\x00" * 64)
+
+        def fake_ffmpeg(args, **kwargs):
+            if "-c" in args:
+                Path(args[-1]).write_bytes(b"\x00" * 64)
+            return subprocess.CompletedProcess(args=args, returncode=0)
+
+        with patch("motion_cam.recorder.subprocess.run", side_effect=fake_ffmpeg):
+            assert recorder.reconcile() == 1
+
+        date_dir = tmp_path / "2026-02-15"
+        assert (date_dir / "20260215_120000.mp4").exists()
+        assert not (date_dir / "20260215_120000.mp4.partial").exists()
+        assert recorder._manifest.pending() == {}
+
+    def test_only_manifest_entries_are_inspected(self, tmp_path):
+        """Complete clips on disk should not be touched by reconciliation."""
+        date_dir = tmp_path / "2026-02-14"
+        date_dir.mkdir()
+        (date_dir / "20260214_100000.mp4").write_bytes(b"\x00")
+        recorder = _make_recorder(tmp_path)
+
+        with patch("motion_cam.recorder.subprocess.run") as mock_run:
+            assert recorder.reconcile() == 0
+        mock_run.assert_not_called()
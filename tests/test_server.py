@@ -0,0 +1,87 @@
+import socket
+import time
+import urllib.request
+
+import pytest
+
+from motion_cam.config import StorageConfig, WebConfig
+from motion_cam.server import WebServer
+from motion_cam.storage import StorageManager
+from motion_cam.web import create_app
+
+
+def _make_app(tmp_path):
+    manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+    return create_app(manager, WebConfig(), data_dir=str(tmp_path))
+
+
+def _get(server: WebServer, path: str) -> tuple[int, bytes]:
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.port}{path}", timeout=5) as resp:
+        return resp.status, resp.read()
+
+
+class TestWebServer:
+    def test_dev_server_serves_app(self, tmp_path):
+        """The dev server mode should serve the same in-process app."""
+        server = WebServer(_make_app(tmp_path), WebConfig(host="127.0.0.1", port=0, server="dev"))
+        server.start()
+        try:
+            status, body = _get(server, "/api/status")
+        finally:
+            server.stop()
+        assert status == 200
+        assert b"clip_count" in body
+
+    def test_waitress_server_serves_app(self, tmp_path):
+        """The waitress mode should serve the app from its worker pool."""
+        pytest.importorskip("waitress")
+        config = WebConfig(host="127.0.0.1", port=0, server="waitress", threads=2)
+        server = WebServer(_make_app(tmp_path), config)
+        server.start()
+        try:
+            status, _ = _get(server, "/")
+        finally:
+            server.stop()
+        assert server.mode == "waitress"
+        assert status == 200
+
+    def test_waitress_stop_closes_open_connections(self, tmp_path):
+        """Stopping returns promptly even with a keep-alive connection still open."""
+        pytest.importorskip("waitress")
+        config = WebConfig(host="127.0.0.1", port=0, server="waitress", threads=2)
+        server = WebServer(_make_app(tmp_path), config)
+        server.start()
+        thread = server._thread
+        idle = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+        try:
+            started = time.monotonic()
+            server.stop()
+            assert time.monotonic() - started < 2
+            assert not thread.is_alive()
+            # The server closed its end of the connection (EOF, or a reset)
+            try:
+                assert idle.recv(1) == b""
+            except ConnectionResetError:
+                pass
+        finally:
+            idle.close()
+
+    def test_falls_back_to_dev_without_waitress(self, tmp_path, monkeypatch):
+        """A missing waitress install should not stop the portal from starting."""
+        import builtins
+
+        real_import = builtins.__import__
+
+        def no_waitress(name, *args, **kwargs):
+            if name == "waitress":
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", no_waitress)
+        server = WebServer(_make_app(tmp_path), WebConfig(host="127.0.0.1", port=0))
+        server.start()
+        try:
+            assert server.mode == "dev"
+            assert _get(server, "/api/status")[0] == 200
+        finally:
+            server.stop()
@@ -0,0 +1,81 @@
+import pytest
+
+from motion_cam.config import DetectionConfig
+from motion_cam.settings import DetectionSettings
+
+
+class TestUpdate:
+    def test_partial_update_keeps_other_values(self):
+        """Only the given settings change; the result is also what take_pending returns."""
+        settings = DetectionSettings(DetectionConfig(cooldown=9))
+        updated = settings.update({"min_contour_area": 120})
+        assert updated == DetectionConfig(min_contour_area=120, cooldown=9)
+        assert settings.current is updated
+        assert settings.take_pending() is updated
+
+    def test_pending_is_taken_once(self):
+        """The detection loop applies each change exactly once."""
+        settings = DetectionSettings(DetectionConfig())
+        assert settings.take_pending() is None
+        settings.update({"cooldown": 3})
+        settings.update({"cooldown": 4})
+        assert settings.take_pending().cooldown == 4
+        assert settings.take_pending() is None
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"blur_kernel_size": 4},
+            {"cooldown": 2.5},
+            {"cooldown": True},
+            {"cooldown": "3"},
+            {"fps": 30},
+            {"learning_rate": float("nan")},
+            {"learning_rate": float("-inf")},
+            {"min_contour_area": float("inf")},
+        ],
+    )
+    def test_rejected_updates_leave_settings_unchanged(self, changes):
+        settings = DetectionSettings(DetectionConfig())
+        with pytest.raises(ValueError):
+            settings.update(changes)
+        assert settings.current == DetectionConfig()
+        assert settings.take_pending() is None
+
+    def test_float_settings_accept_integers(self):
+        settings = DetectionSettings(DetectionConfig())
+        assert settings.update({"learning_rate": 0}).learning_rate == 0.0
+
+
+class TestReload:
+    def test_reads_detection_values_from_env_file(self, tmp_path):
+        """Keys absent from the file go back to their defaults, as on a restart."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("# tuned\nDETECTION_MIN_CONTOUR_AREA=300\nDETECTION_COOLDOWN='7'\nWEB_PORT=9000\n")
+        settings = DetectionSettings(DetectionConfig(blur_kernel_size=31), env_file=str(env_file))
+
+        reloaded = settings.reload()
+        assert reloaded == DetectionConfig(min_contour_area=300, cooldown=7)
+        assert settings.take_pending() == reloaded
+
+    def test_missing_or_invalid_file_keeps_current(self, tmp_path):
+        """A failed reload raises and leaves the running settings alone."""
+        settings = DetectionSettings(DetectionConfig(), env_file=str(tmp_path / "absent"))
+        with pytest.raises(OSError):
+            settings.reload()
+
+        bad = tmp_path / ".env"
+        bad.write_text("DETECTION_BLUR_KERNEL_SIZE=10\n")
+        settings = DetectionSettings(DetectionConfig(), env_file=str(bad))
+        with pytest.raises(ValueError):
+            settings.reload()
+        assert settings.take_pending() is None
+
+    @pytest.mark.parametrize("value", ["nan", "-inf", "inf"])
+    def test_non_finite_learning_rate_is_rejected(self, tmp_path, value):
+        env_file = tmp_path / ".env"
+        env_file.write_text(f"DETECTION_LEARNING_RATE={value}\n")
+        settings = DetectionSettings(DetectionConfig(), env_file=str(env_file))
+        with pytest.raises(ValueError):
+            settings.reload()
+        assert settings.current == DetectionConfig()
@@ -0,0 +1,180 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from motion_cam.camera import CameraProtocol, create_camera
+from motion_cam.config import PREVIEW_PROFILES, CameraConfig, DetectionConfig
+from motion_cam.detector import MotionDetector
+from motion_cam.simulator import SimulatedCamera, SyntheticScene, VideoSource
+
+
+def _sim_config(**overrides) -> CameraConfig:
+    fields = {
+        "main_resolution": (160, 120),
+        "lores_resolution": (80, 60),
+        "framerate": 15,
+        "backend": "sim",
+        "sim_speed": 1.0,
+    }
+    fields.update(overrides)
+    return CameraConfig(**fields)
+
+
+def _write_video(path, frames: int, size=(64, 48), fps=10) -> None:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+
+class TestCreateCamera:
+    def test_sim_backend_returns_simulated_camera(self):
+        """CAMERA_BACKEND=sim must select the simulator, which satisfies CameraProtocol."""
+        camera: CameraProtocol = create_camera(_sim_config())
+        assert isinstance(camera, SimulatedCamera)
+
+    def test_unknown_backend_is_rejected(self):
+        """A typo in the backend name should fail loudly, not fall back to hardware."""
+        with pytest.raises(ValueError, match="backend"):
+            create_camera(_sim_config(backend="webcam"))
+
+
+class TestSyntheticScene:
+    def test_frames_are_reproducible(self):
+        """The same time and seed must always give the same frame, noise included."""
+        a = SyntheticScene(seed=3).render(12.5, (80, 60))
+        b = SyntheticScene(seed=3).render(12.5, (80, 60))
+        assert a.shape == (60, 80)
+        assert np.array_equal(a, b)
+
+    def test_blobs_only_during_bursts(self):
+        """Blobs cross the frame during a burst and the scene is empty between bursts."""
+        scene = SyntheticScene(burst_every=60, burst_length=10)
+        assert len(scene.blobs_at(5.0)) == 3
+        assert scene.blobs_at(30.0) == []
+        assert len(scene.blobs_at(65.0)) == 3
+
+    def test_detector_sees_bursts_but_not_noise_or_lighting(self):
+        """Sensor noise and the lighting ramp stay below the detector; crossing blobs do not."""
+        scene = SyntheticScene(burst_every=20, burst_length=5)
+        detector = MotionDetector(DetectionConfig())
+        detected = []
+        for i in range(15 * 30):
+            t = i / 15
+            if detector.process_frame(scene.render(t, (320, 240))).detected:
+                detected.append(t)
+        assert any(t < 5 for t in detected)
+        assert any(20 <= t < 25 for t in detected)
+        assert not any(6 <= t < 20 for t in detected)
+
+
+class TestVideoSource:
+    def test_replays_frames_by_time_and_loops(self, tmp_path):
+        """Frames are chosen at the file's frame rate and the video wraps around."""
+        path = tmp_path / "source.mp4"
+        _write_video(path, frames=5, fps=10)
+        source = VideoSource(str(path))
+
+        first = source.render(0.0, (64, 48))
+        third = source.render(0.2, (64, 48))
+        looped = source.render(0.5, (64, 48))
+
+        assert abs(int(third.mean()) - 40) <= 3
+        assert abs(int(looped.mean()) - int(first.mean())) <= 3
+
+    def test_unreadable_file_is_rejected(self, tmp_path):
+        """A missing or non-video source should fail at startup."""
+        with pytest.raises(ValueError):
+            VideoSource(str(tmp_path / "missing.mp4"))
+
+
+class TestSimulatedCamera:
+    def test_lores_frame_is_grayscale_at_lores_resolution(self):
+        """The detector gets a Y-plane-like frame, as from the real lores stream."""
+        camera = SimulatedCamera(_sim_config(), source=SyntheticScene())
+        camera.start()
+        frame = camera.capture_lores_frame()
+        assert frame.shape == (60, 80)
+        assert frame.dtype == np.uint8
+
+    def test_capture_blocks_for_next_frame_and_drops_missed_ones(self):
+        """Consecutive captures are a frame period apart; a slow caller skips frames."""
+        camera = SimulatedCamera(_sim_config(framerate=50), source=SyntheticScene())
+        camera.start()
+        camera.capture_lores_frame()
+        started = time.monotonic()
+        camera.capture_lores_frame()
+        assert time.monotonic() - started >= 0.015
+
+        time.sleep(0.1)
+        before = camera._last_index
+        camera.capture_lores_frame()
+        assert camera._last_index - before >= 4
+
+    def test_capture_lores_numbers_frames_and_exposure_times(self):
+        """Sequence numbers jump over missed frames; timestamps are a frame period apart."""
+        camera = SimulatedCamera(_sim_config(framerate=50), source=SyntheticScene())
+        camera.start()
+        first = camera.capture_lores()
+        second = camera.capture_lores()
+        assert second.sequence == first.sequence + 1
+        assert abs(second.timestamp - first.timestamp - 0.02) < 1e-9
+
+        time.sleep(0.1)
+        third = camera.capture_lores()
+        assert third.sequence - second.sequence >= 4
+        assert third.timestamp <= time.monotonic()
+
+    def test_map_lores_releases_frame_after_block(self):
+        """The simulator enforces the same buffer lifetime as the real camera."""
+        camera = SimulatedCamera(_sim_config(), source=SyntheticScene())
+        camera.start()
+        with camera.map_lores() as frame:
+            assert frame.pixels.shape == (60, 80)
+        with pytest.raises(RuntimeError):
+            frame.pixels
+
+    def test_speed_scales_the_scene_clock(self):
+        """At speed 20 one wall second covers twenty scene seconds."""
+        camera = SimulatedCamera(_sim_config(sim_speed=20), source=SyntheticScene())
+        camera.start()
+        time.sleep(0.1)
+        assert 1.8 <= camera.scene_time() <= 4.0
+
+    def test_snapshot_and_preview_are_real_jpegs(self, tmp_path):
+        """capture_snapshot writes a main-resolution JPEG; previews follow their profile."""
+        camera = SimulatedCamera(_sim_config(), source=SyntheticScene())
+        camera.start()
+        snap = tmp_path / "snap.jpg"
+        camera.capture_snapshot(str(snap))
+        assert cv2.imread(str(snap)).shape == (120, 160, 3)
+
+        low = camera.capture_jpeg_frame(PREVIEW_PROFILES["low"])
+        decoded = cv2.imdecode(np.frombuffer(low, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        assert decoded.shape == (60, 80)
+
+    def test_recording_writes_mp4_under_requested_name(self, tmp_path):
+        """The recorder's .partial path receives a playable MP4 with one frame per scene frame."""
+        camera = SimulatedCamera(_sim_config(sim_speed=4), source=SyntheticScene())
+        camera.start()
+        partial = tmp_path / "20260215_120000.mp4.partial"
+        camera.start_recording(str(partial))
+        time.sleep(0.5)
+        camera.stop_recording()
+
+        assert partial.exists()
+        assert list(tmp_path.iterdir()) == [partial]
+        capture = cv2.VideoCapture(str(partial))
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        # 0.5 s at 4x and 15 fps is 30 scene frames
+        assert 20 <= frames <= 40
+
+    def test_set_controls_is_recorded(self):
+        """Tuner control writes are accepted and reported back."""
+        camera = SimulatedCamera(_sim_config(), source=SyntheticScene())
+        camera.set_controls({"Brightness": 0.2})
+        camera.set_controls({"Contrast": 1.5})
+        assert camera.controls == {"Brightness": 0.2, "Contrast": 1.5}
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from motion_cam import sprites
+
+
+def _create_clip(data_dir: Path, timestamp: str, shade: int = 128) -> None:
+    """Create a clip whose thumbnail is a solid 640x360 JPEG of the given shade."""
+    date_dir = data_dir / f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}"
+    date_dir.mkdir(parents=True, exist_ok=True)
+    (date_dir / f"{timestamp}.mp4").write_bytes(b"\x00" * 64)
+    thumb = np.full((360, 640, 3), shade, dtype=np.uint8)
+    cv2.imwrite(str(date_dir / f"{timestamp}_thumb.jpg"), thumb)
+
+
+def _sheet(data_dir: Path, day: str, index: int = 0) -> np.ndarray:
+    return cv2.imread(str(data_dir / day / "sprites" / f"sheet-{index}.jpg"))
+
+
+class TestAddClip:
+    def test_appends_tiles_in_arrival_order(self, tmp_path):
+        """Each new clip should take the next slot and bump the map version."""
+        _create_clip(tmp_path, "20260215_100000", shade=40)
+        _create_clip(tmp_path, "20260215_110000", shade=200)
+        assert sprites.add_clip(str(tmp_path), "20260215_100000")
+        assert sprites.add_clip(str(tmp_path), "20260215_110000")
+
+        sprite_map = sprites.load_map(tmp_path / "2026-02-15")
+        assert sprite_map["clips"] == {"20260215_100000": [0, 0], "20260215_110000": [0, 1]}
+        assert sprite_map["version"] == 2
+
+        sheet = _sheet(tmp_path, "2026-02-15")
+        w, h = sprites.TILE_SIZE
+        assert sheet.shape == (h, w * sprites.COLUMNS, 3)
+        assert abs(int(sheet[h // 2, w // 2, 0]) - 40) < 5
+        assert abs(int(sheet[h // 2, w + w // 2, 0]) - 200) < 5
+
+    def test_starts_a_new_sheet_when_full(self, tmp_path, monkeypatch):
+        """Clips beyond SHEET_TILES should go onto a second sheet."""
+        monkeypatch.setattr(sprites, "SHEET_TILES", 2)
+        for minute in range(3):
+            _create_clip(tmp_path, f"20260215_10{minute:02d}00")
+            sprites.add_clip(str(tmp_path), f"20260215_10{minute:02d}00")
+
+        sprite_map = sprites.load_map(tmp_path / "2026-02-15")
+        assert sprite_map["clips"]["20260215_100200"] == [1, 0]
+        assert [s["count"] for s in sprite_map["sheets"]] == [2, 1]
+
+    def test_skips_unreadable_thumbnail(self, tmp_path):
+        """A clip without a decodable thumbnail should be left to the <img> fallback."""
+        _create_clip(tmp_path, "20260215_100000")
+        (tmp_path / "2026-02-15" / "20260215_100000_thumb.jpg").write_bytes(b"\xff" * 16)
+        assert not sprites.add_clip(str(tmp_path), "20260215_100000")
+        assert sprites.load_map(tmp_path / "2026-02-15") is None
+
+
+class TestTileFor:
+    def test_positions_are_percentages_of_the_sheet(self):
+        """Background size and position should address the tile's cell in the grid."""
+        sprite_map = {"version": 3, "columns": 5, "sheets": [{"count": 7}], "clips": {"a": [0, 6]}}
+        tile = sprites.tile_for(sprite_map, "2026-02-15", "a")
+
+        assert tile.sheet == "2026-02-15/sprites/sheet-0.jpg"
+        assert tile.background_size == "500% 200%"
+        assert tile.background_position == "25% 100%"
+
+    def test_unknown_clip_has_no_tile(self):
+        """Clips missing from the map should return None."""
+        sprite_map = {"version": 1, "columns": 5, "sheets": [], "clips": {}}
+        assert sprites.tile_for(sprite_map, "2026-02-15", "b") is None
+
+
+class TestBackfill:
+    def test_builds_days_without_sprites(self, tmp_path):
+        """Existing clips should be packed on first run, and a second run is a no-op."""
+        _create_clip(tmp_path, "20260214_100000")
+        _create_clip(tmp_path, "20260215_100000")
+        _create_clip(tmp_path, "20260215_110000")
+
+        assert sprites.backfill(str(tmp_path)) == 2
+        assert len(sprites.load_map(tmp_path / "2026-02-15")["clips"]) == 2
+        assert sprites.backfill(str(tmp_path)) == 0
+
+    def test_repacks_day_after_deletions(self, tmp_path):
+        """Deleted clips should be dropped from the map and the sheet shrunk."""
+        for hour in (10, 11, 12):
+            _create_clip(tmp_path, f"20260215_{hour}0000")
+        sprites.backfill(str(tmp_path))
+        version = sprites.load_map(tmp_path / "2026-02-15")["version"]
+        (tmp_path / "2026-02-15" / "20260215_100000.mp4").unlink()
+
+        assert sprites.backfill(str(tmp_path)) == 1
+        sprite_map = sprites.load_map(tmp_path / "2026-02-15")
+        assert sprite_map["clips"] == {"20260215_110000": [0, 0], "20260215_120000": [0, 1]}
+        assert sprite_map["version"] > version
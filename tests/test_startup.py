@@ -0,0 +1,78 @@
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+ENV = {**os.environ, "PYTHONPATH": SRC}
+
+# Cumulative -X importtime of motion_cam.main, best of three. Around 60-90 ms on a
+# dev machine, mostly stdlib; lower this as the boot path gets faster, never raise it
+IMPORT_BUDGET_MS = 150
+# Not needed to analyze a frame; loaded after the first one, on the services thread
+DEFERRED_MODULES = ("flask", "werkzeug", "jinja2", "waitress", "cv2", "numpy", "PIL", "picamera2")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """{module: cumulative us} from -X importtime in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=ENV,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+class TestImports:
+    def test_main_does_not_import_heavy_modules(self):
+        """Importing the entry point must not pull in the web stack, OpenCV or NumPy."""
+        times = _import_times("motion_cam.main")
+        assert "motion_cam.main" in times
+        loaded = sorted(m for m in DEFERRED_MODULES if m in times)
+        assert loaded == []
+
+    def test_main_import_within_budget(self):
+        """The entry point's import time stays under the startup budget."""
+        best = min(_import_times("motion_cam.main")["motion_cam.main"] for _ in range(3))
+        assert best / 1000 < IMPORT_BUDGET_MS
+
+
+class TestBootOrder:
+    def test_first_frame_analyzed_before_portal_starts(self, tmp_path):
+        """Detection comes up first; the portal follows on a background thread."""
+        env = {
+            **ENV,
+            "CAMERA_BACKEND": "sim",
+            "STORAGE_DATA_DIR": str(tmp_path),
+            "WEB_HOST": "127.0.0.1",
+            "WEB_PORT": "0",
+        }
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "motion_cam.main"],
+            env=env,
+            stderr=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            text=True,
+        )
+        order = []
+        try:
+            for line in proc.stderr:
+                for milestone in ("First frame analyzed", "Web portal started on"):
+                    if milestone in line:
+                        order.append(milestone)
+                if len(order) == 2:
+                    break
+        finally:
+            proc.send_signal(signal.SIGINT)
+            rest = proc.communicate(timeout=30)[1]
+        assert order == ["First frame analyzed", "Web portal started on"]
+        assert proc.returncode == 0
+        assert "Shutdown complete" in rest
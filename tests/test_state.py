@@ -0,0 +1,80 @@
+import threading
+import time
+
+from motion_cam.state import MAX_EVENTS, LiveState
+
+
+class TestPublish:
+    def test_swaps_in_a_new_snapshot(self):
+        """publish should replace the snapshot and leave the old one untouched."""
+        live = LiveState()
+        before = live.snapshot()
+        live.publish(state="watching", fps=15.0)
+
+        after = live.snapshot()
+        assert after is not before
+        assert before.state == "starting"
+        assert after.state == "watching"
+        assert after.version == before.version + 1
+
+    def test_unchanged_values_keep_the_version(self):
+        """Publishing the same values should not look like a change to readers."""
+        live = LiveState()
+        live.publish(state="watching", fps=15.0)
+        version = live.snapshot().version
+        live.publish(state="watching", fps=15.0)
+        assert live.snapshot().version == version
+
+
+class TestEvents:
+    def test_events_since_returns_only_newer_events(self):
+        """Readers should see each event once by tracking the last sequence number."""
+        live = LiveState()
+        live.push_event("clip", {"timestamp": "20260215_120000"})
+        seen = live.event_seq
+        live.push_event("clip", {"timestamp": "20260215_120100"})
+
+        assert live.events_since(seen) == [(2, "clip", {"timestamp": "20260215_120100"})]
+
+    def test_event_history_is_bounded(self):
+        """Old events should be dropped once the buffer is full."""
+        live = LiveState()
+        for i in range(MAX_EVENTS + 10):
+            live.push_event("clip", {"n": i})
+        events = live.events_since(0)
+        assert len(events) == MAX_EVENTS
+        assert events[0][0] == 11
+
+
+class TestWaitForChange:
+    def test_times_out_when_nothing_changes(self):
+        live = LiveState()
+        started = time.monotonic()
+        assert live.wait_for_change(live.snapshot().version, live.event_seq, 0.05) is False
+        assert time.monotonic() - started >= 0.05
+
+    def test_returns_at_once_if_already_changed(self):
+        """A change made between reading and waiting is not missed."""
+        live = LiveState()
+        version = live.snapshot().version
+        live.publish(state="watching")
+        assert live.wait_for_change(version, live.event_seq, 5.0) is True
+
+    def test_wakes_on_publish_and_on_event(self):
+        """Feed clients sleep until the main loop or job thread signals a change."""
+        live = LiveState()
+        for change in (lambda: live.publish(fps=3.0), lambda: live.push_event("clip", {})):
+            version, seq = live.snapshot().version, live.event_seq
+            timer = threading.Timer(0.05, change)
+            timer.start()
+            started = time.monotonic()
+            assert live.wait_for_change(version, seq, 5.0) is True
+            assert time.monotonic() - started < 1.0
+            timer.join()
+
+    def test_unchanged_publish_does_not_wake(self):
+        live = LiveState()
+        live.publish(state="watching")
+        version = live.snapshot().version
+        threading.Timer(0.01, lambda: live.publish(state="watching")).start()
+        assert live.wait_for_change(version, live.event_seq, 0.1) is False
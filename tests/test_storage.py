@@ -1,8 +1,11 @@
+import os
 import time
 from pathlib import Path
+from unittest.mock import patch
 
 from motion_cam.config import StorageConfig
-from motion_cam.storage import StorageManager
+from motion_cam.metrics import Registry
+from motion_cam.storage import RETENTION_SECONDS, StorageManager
 
 
 def _create_clip(data_dir: Path, timestamp: str, mp4_size: int = 1024) -> None:
@@ -42,6 +45,59 @@ class TestGetClips:
         clips = manager.get_clips()
         assert clips == []
 
+    def test_ignores_partial_recordings(self, tmp_path):
+        """Clips still being recorded (.partial) should not be listed."""
+        _create_clip(tmp_path, "20260215_120000")
+        (tmp_path / "2026-02-15" / "20260215_130000.mp4.partial").write_bytes(b"\x00")
+
+        manager = _make_manager(tmp_path)
+        assert [c.timestamp for c in manager.get_clips()] == ["20260215_120000"]
+
+
+class TestClipIndex:
+    def test_unchanged_days_are_not_rescanned(self, tmp_path):
+        """Repeated listings should reuse cached days whose directory has not changed."""
+        _create_clip(tmp_path, "20260210_100000")
+        day = tmp_path / "2026-02-10"
+        old = time.time_ns() - 10_000_000_000
+        os.utime(day, ns=(old, old))
+        manager = _make_manager(tmp_path)
+        manager.get_clips()
+
+        with patch.object(manager, "_scan_day", wraps=manager._scan_day) as scan:
+            manager.get_clips()
+        scan.assert_not_called()
+
+    def test_new_clip_in_changed_day_is_picked_up(self, tmp_path):
+        """Adding a clip changes the day directory and must show up in the listing."""
+        _create_clip(tmp_path, "20260210_100000")
+        manager = _make_manager(tmp_path)
+        assert len(manager.get_clips()) == 1
+
+        _create_clip(tmp_path, "20260210_110000")
+        assert [c.timestamp for c in manager.get_clips()] == ["20260210_110000", "20260210_100000"]
+
+    def test_query_clips_filters_and_counts(self, tmp_path):
+        """query_clips should apply range, cursor and size filters and report the total."""
+        _create_clip(tmp_path, "20260210_100000", mp4_size=100)
+        _create_clip(tmp_path, "20260211_100000", mp4_size=5000)
+        _create_clip(tmp_path, "20260212_100000", mp4_size=5000)
+        manager = _make_manager(tmp_path)
+
+        page, total = manager.query_clips(before="20260212_100000", limit=1)
+        assert [c.timestamp for c in page] == ["20260211_100000"]
+        assert total == 2
+
+        page, total = manager.query_clips(since="20260210_000000", min_size=1000)
+        assert [c.timestamp for c in page] == ["20260212_100000", "20260211_100000"]
+        assert total == 2
+
+    def test_day_summaries(self, tmp_path):
+        _create_clip(tmp_path, "20260210_100000", mp4_size=100)
+        _create_clip(tmp_path, "20260210_110000", mp4_size=200)
+        summaries = _make_manager(tmp_path).get_day_summaries()
+        assert [(s.date, s.count, s.bytes) for s in summaries] == [("2026-02-10", 2, 300)]
+
 
 class TestGetClip:
     def test_returns_metadata_for_existing_clip(self, tmp_path):
@@ -75,6 +131,17 @@ class TestDeleteClip:
         assert not (date_dir / "20260215_120000_snap.jpg").exists()
         assert not (date_dir / "20260215_120000_thumb.jpg").exists()
 
+    def test_removes_scrub_preview(self, tmp_path):
+        """Deleting a clip should also remove its scrub mosaic and track."""
+        _create_clip(tmp_path, "20260215_120000")
+        date_dir = tmp_path / "2026-02-15"
+        (date_dir / "20260215_120000_scrub.jpg").write_bytes(b"\xff")
+        (date_dir / "20260215_120000_scrub.vtt").write_text("WEBVTT\n")
+
+        _make_manager(tmp_path).delete_clip("20260215_120000")
+
+        assert list(date_dir.iterdir()) == []
+
     def test_returns_false_for_missing_clip(self, tmp_path):
         """Deleting a nonexistent clip should return False."""
         manager = _make_manager(tmp_path)
@@ -99,6 +166,75 @@ class TestDeleteAllClips:
         assert manager.delete_all_clips() == 0
 
 
+class TestDeleteClips:
+    def test_deletes_only_listed_clips(self, tmp_path):
+        """delete_clips should remove the listed clips and skip missing ones."""
+        _create_clip(tmp_path, "20260210_100000")
+        _create_clip(tmp_path, "20260210_110000")
+        manager = _make_manager(tmp_path)
+
+        count = manager.delete_clips(["20260210_100000", "99990101_000000"])
+
+        assert count == 1
+        assert [c.timestamp for c in manager.get_clips()] == ["20260210_110000"]
+
+    def test_reports_progress(self, tmp_path):
+        """The progress callback should be called once per requested clip."""
+        _create_clip(tmp_path, "20260210_100000")
+        manager = _make_manager(tmp_path)
+        calls = []
+
+        manager.delete_clips(["20260210_100000", "20260210_110000"], lambda done, total: calls.append((done, total)))
+
+        assert calls == [(1, 2), (2, 2)]
+
+
+class TestDeleteRange:
+    def test_removes_whole_days_inside_range(self, tmp_path):
+        """Days entirely inside the range should be removed as a directory."""
+        _create_clip(tmp_path, "20260210_100000")
+        _create_clip(tmp_path, "20260211_100000")
+        _create_clip(tmp_path, "20260212_100000")
+        manager = _make_manager(tmp_path)
+
+        count = manager.delete_range("20260211_000000", "20260211_235959")
+
+        assert count == 1
+        assert not (tmp_path / "2026-02-11").exists()
+        assert len(manager.get_clips()) == 2
+
+    def test_boundary_days_are_filtered_by_timestamp(self, tmp_path):
+        """Clips on a partially covered day are deleted only if inside the range."""
+        _create_clip(tmp_path, "20260210_080000")
+        _create_clip(tmp_path, "20260210_200000")
+        manager = _make_manager(tmp_path)
+
+        count = manager.delete_range("20260210_120000", None)
+
+        assert count == 1
+        assert [c.timestamp for c in manager.get_clips()] == ["20260210_080000"]
+        assert (tmp_path / "2026-02-10" / "20260210_080000_snap.jpg").exists()
+
+    def test_keeps_day_with_recording_in_progress(self, tmp_path):
+        """A day holding a .partial recording is walked per clip, not removed whole."""
+        _create_clip(tmp_path, "20260215_120000")
+        partial = tmp_path / "2026-02-15" / "20260215_130000.mp4.partial"
+        partial.write_bytes(b"\x00")
+        manager = _make_manager(tmp_path)
+
+        assert manager.delete_all_clips() == 1
+        assert partial.exists()
+
+    def test_ignores_non_date_directories(self, tmp_path):
+        """Directories that are not YYYY-MM-DD should never be removed."""
+        (tmp_path / "other").mkdir()
+        _create_clip(tmp_path, "20260210_100000")
+        manager = _make_manager(tmp_path)
+
+        assert manager.delete_all_clips() == 1
+        assert (tmp_path / "other").exists()
+
+
 class TestEnforceRetention:
     def test_deletes_clips_exceeding_max_disk_usage(self, tmp_path):
         """When total size exceeds max_disk_usage_mb, oldest clips are deleted first."""
@@ -119,6 +255,36 @@ class TestEnforceRetention:
         # With max 0 MB, all clips should be deleted
         assert len(clips) == 0
 
+    def test_size_limit_removes_whole_oldest_days_first(self, tmp_path):
+        """Days that fit in the excess are removed outright, oldest first."""
+        for ts in ("20260210_100000", "20260212_120000", "20260215_140000"):
+            _create_clip(tmp_path, ts, mp4_size=600 * 1024)
+        manager = _make_manager(tmp_path, max_age_days=3650, max_disk_usage_mb=1)
+
+        manager.enforce_retention()
+
+        assert [c.timestamp for c in manager.get_clips()] == ["20260215_140000"]
+        assert not (tmp_path / "2026-02-10").exists()
+
+    def test_size_limit_trims_the_oldest_clips_of_a_day(self, tmp_path):
+        """Within a day, clips go oldest first and only until usage fits."""
+        for ts in ("20260215_100000", "20260215_120000", "20260215_140000"):
+            _create_clip(tmp_path, ts, mp4_size=450 * 1024)
+        manager = _make_manager(tmp_path, max_age_days=3650, max_disk_usage_mb=1)
+
+        manager.enforce_retention()
+
+        assert [c.timestamp for c in manager.get_clips()] == ["20260215_140000", "20260215_120000"]
+        assert not (tmp_path / "2026-02-15" / "20260215_100000_snap.jpg").exists()
+
+    def test_size_check_under_the_limit_does_not_walk_the_tree(self, tmp_path):
+        """The steady-state check reads the day index instead of statting every file."""
+        _create_clip(tmp_path, "20260215_120000")
+        manager = _make_manager(tmp_path, max_age_days=3650)
+        with patch.object(Path, "rglob", side_effect=AssertionError("full rescan")):
+            manager.enforce_retention()
+        assert len(manager.get_clips()) == 1
+
     def test_deletes_clips_older_than_max_age_days(self, tmp_path):
         """Clips older than max_age_days should be removed."""
         # Create an "old" clip by using a very old date
@@ -134,6 +300,16 @@ class TestEnforceRetention:
         assert clips[0].timestamp == "20260215_120000"
 
 
+class TestRetentionMetrics:
+    def test_each_retention_run_is_timed(self, tmp_path):
+        """enforce_retention records one observation per run when metrics are on."""
+        registry = Registry()
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)), metrics=registry)
+        manager.enforce_retention()
+        manager.enforce_retention()
+        assert registry.histogram(RETENTION_SECONDS, "").snapshot()[2] == 2
+
+
 class TestGetDiskUsage:
     def test_returns_total_bytes_of_data_directory(self, tmp_path):
         """Should return the sum of all file sizes in the data directory."""
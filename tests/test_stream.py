@@ -0,0 +1,92 @@
+import threading
+import time
+
+from motion_cam.stream import FrameBroadcaster
+
+
+class _CountingSource:
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> bytes:
+        with self._lock:
+            self.calls += 1
+            return f"frame-{self.calls}".encode()
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestFrameBroadcaster:
+    def test_idle_without_subscribers(self):
+        """No frames should be produced until a client subscribes."""
+        source = _CountingSource()
+        broadcaster = FrameBroadcaster(source, interval=0.01)
+        time.sleep(0.05)
+        assert source.calls == 0
+        assert not broadcaster.running
+
+    def test_subscribers_share_each_encoded_frame(self):
+        """Each frame should be produced once and delivered to every subscriber."""
+        source = _CountingSource()
+        broadcaster = FrameBroadcaster(source, interval=0.02)
+        received: dict[str, list[bytes]] = {"a": [], "b": []}
+
+        def read(name, sub):
+            for _ in range(5):
+                received[name].append(sub.next_frame(timeout=1))
+
+        with broadcaster.subscribe() as a, broadcaster.subscribe() as b:
+            threads = [
+                threading.Thread(target=read, args=("a", a)),
+                threading.Thread(target=read, args=("b", b)),
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            calls = source.calls
+
+        # Both clients saw the same encoded frames rather than encoding their own
+        assert set(received["a"]) & set(received["b"])
+        assert calls < len(received["a"]) + len(received["b"])
+
+    def test_slow_subscriber_skips_to_latest_frame(self):
+        """A slow reader should get the newest frame, not a backlog."""
+        source = _CountingSource()
+        broadcaster = FrameBroadcaster(source, interval=0.005)
+
+        with broadcaster.subscribe() as sub:
+            first = sub.next_frame(timeout=1)
+            assert _wait_until(lambda: source.calls >= 10)
+            latest = sub.next_frame(timeout=1)
+
+        assert int(latest.split(b"-")[1]) >= int(first.split(b"-")[1]) + 5
+
+    def test_next_frame_never_repeats(self):
+        """Successive reads should never return the same frame twice."""
+        broadcaster = FrameBroadcaster(_CountingSource(), interval=0.005)
+        with broadcaster.subscribe() as sub:
+            frames = [sub.next_frame(timeout=1) for _ in range(10)]
+        assert len(set(frames)) == len(frames)
+
+    def test_producer_stops_after_last_unsubscribe(self):
+        """Encoding should stop entirely once every client has gone."""
+        source = _CountingSource()
+        broadcaster = FrameBroadcaster(source, interval=0.005)
+
+        sub = broadcaster.subscribe()
+        sub.next_frame(timeout=1)
+        sub.close()
+
+        assert _wait_until(lambda: not broadcaster.running)
+        calls = source.calls
+        time.sleep(0.05)
+        assert source.calls == calls
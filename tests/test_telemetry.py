@@ -0,0 +1,160 @@
+import threading
+
+import numpy as np
+
+from motion_cam.telemetry import (
+    HISTORY_MINUTES,
+    MAX_THREAD_GROUPS,
+    RAW_SECONDS,
+    SERIES,
+    Ring,
+    Telemetry,
+    thread_group,
+)
+
+
+def _make_telemetry(
+    tmp_path,
+    detector=lambda: {"fps": 12.5, "dropped": 2, "latency_ms": 48.0},
+    temp="52300\n",
+    throttled="0x50005\n",
+) -> Telemetry:
+    (tmp_path / "temp").write_text(temp)
+    (tmp_path / "throttled").write_text(throttled)
+    (tmp_path / "freq").write_text("1000000\n")
+    return Telemetry(
+        str(tmp_path),
+        detector=detector,
+        thermal_path=str(tmp_path / "temp"),
+        throttled_path=str(tmp_path / "throttled"),
+        cpu_freq_path=str(tmp_path / "freq"),
+    )
+
+
+class TestRing:
+    def test_last_returns_newest_values_oldest_first(self):
+        """After wrapping, last(n) is still in time order."""
+        ring = Ring(4)
+        for v in range(6):
+            ring.append(v)
+        assert ring.last(3).tolist() == [3, 4, 5]
+        assert ring.last(10).tolist() == [2, 3, 4, 5]
+
+    def test_unfilled_slots_are_nan(self):
+        """A fresh ring reports missing history as NaN, not zero."""
+        ring = Ring(3)
+        ring.append(1.0)
+        values = ring.last(3)
+        assert np.isnan(values[:2]).all() and values[2] == 1.0
+
+
+class TestSample:
+    def test_reads_sysfs_and_callbacks(self, tmp_path):
+        """Temperature, throttle flags, clock, detector rates, RSS and free disk are recorded."""
+        telemetry = _make_telemetry(tmp_path)
+        telemetry.sample(now=0.0)
+        telemetry.sample(now=1.0)
+
+        series = telemetry.history(hours=1, points=1)["series"]
+        assert series["temp_c"] == [52.3]
+        assert series["throttled"] == [float(0x50005)]
+        assert series["cpu_mhz"] == [1000.0]
+        assert series["fps"] == [12.5]
+        assert series["dropped"] == [2.0]
+        assert series["latency_ms"] == [48.0]
+        assert series["rss_mb"][0] > 1
+        assert series["disk_free_mb"][0] > 0
+        assert series["cpu_percent"][0] >= 0
+
+    def test_missing_sources_are_null(self, tmp_path):
+        """Hosts without a thermal zone or Pi firmware report null, not an error."""
+        telemetry = Telemetry(
+            str(tmp_path),
+            thermal_path=str(tmp_path / "absent"),
+            throttled_path=str(tmp_path / "absent"),
+            cpu_freq_path=str(tmp_path / "absent"),
+        )
+        telemetry.sample(now=0.0)
+        series = telemetry.history(hours=1, points=1)["series"]
+        assert series["temp_c"] == [None]
+        assert series["throttled"] == [None]
+        assert series["fps"] == [None]
+        assert series["latency_ms"] == [None]
+
+    def test_cpu_is_reported_per_thread_group(self, tmp_path):
+        """Busy Python threads appear under their name without numeric suffixes."""
+        telemetry = _make_telemetry(tmp_path)
+        stop = threading.Event()
+
+        def spin():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=spin, name="spinner-3")
+        worker.start()
+        try:
+            telemetry.sample()
+            stop.wait(0.3)
+            telemetry.sample()
+        finally:
+            stop.set()
+            worker.join()
+
+        threads = telemetry.history(hours=1, points=1)["threads"]
+        assert "spinner" in threads
+        assert threads["spinner"][0] > 10
+
+    def test_thread_group_strips_numeric_suffixes(self):
+        assert thread_group("waitress-7") == "waitress"
+        assert thread_group("MainThread") == "MainThread"
+
+
+class TestHistory:
+    def test_downsamples_raw_seconds_within_an_hour(self, tmp_path):
+        """Up to an hour, points are built from 1 Hz samples."""
+        values = iter(range(600))
+        telemetry = _make_telemetry(tmp_path, detector=lambda: {"fps": next(values)})
+        for i in range(600):
+            telemetry.sample(now=float(i))
+
+        history = telemetry.history(hours=600 / 3600, points=10)
+        assert history["step"] == 60
+        assert history["series"]["fps"][0] == 29.5  # mean of 0..59
+        assert history["series"]["fps"][-1] == 569.5
+
+    def test_long_spans_use_minute_aggregates(self, tmp_path):
+        """Beyond an hour, points come from one-minute aggregates; flags are OR-ed, not averaged."""
+        flags = iter([0x1] * 60 + [0x4] * 60)
+        telemetry = _make_telemetry(tmp_path)
+        throttled = tmp_path / "throttled"
+        for i in range(120):
+            throttled.write_text(hex(next(flags)))
+            telemetry.sample(now=float(i))
+
+        history = telemetry.history(hours=24, points=24)
+        assert history["step"] == 3600
+        # Two minutes of data, both in the newest hour
+        assert history["series"]["throttled"][-1] == float(0x5)
+        assert history["series"]["throttled"][0] is None
+
+    def test_memory_is_bounded(self, tmp_path):
+        """Even with the maximum number of thread groups the rings stay well under 2 MB."""
+        telemetry = _make_telemetry(tmp_path)
+        stop = threading.Event()
+        workers = [
+            threading.Thread(target=stop.wait, name=f"group{chr(97 + i)}") for i in range(MAX_THREAD_GROUPS + 5)
+        ]
+        for w in workers:
+            w.start()
+        try:
+            telemetry.sample(now=0.0)
+            telemetry.sample(now=1.0)
+        finally:
+            stop.set()
+            for w in workers:
+                w.join()
+
+        threads = telemetry.history(hours=1, points=1)["threads"]
+        assert len(threads) <= MAX_THREAD_GROUPS + 1  # plus "other"
+        assert telemetry.nbytes < 2 * 2**20
+        assert telemetry.nbytes == (len(SERIES) + len(threads)) * (RAW_SECONDS + HISTORY_MINUTES) * 4
@@ -1,9 +1,24 @@
+import gzip
+import io
+import re
+import tarfile
+import threading
+import time
+import zipfile
 from pathlib import Path
+from unittest.mock import MagicMock
 
+import cv2
+import numpy as np
 import pytest
 
-from motion_cam.config import StorageConfig, WebConfig
+from motion_cam import sprites
+from motion_cam.config import PREVIEW_PROFILES, DetectionConfig, StorageConfig, WebConfig
+from motion_cam.metrics import Registry
+from motion_cam.settings import DetectionSettings
+from motion_cam.state import LiveState
 from motion_cam.storage import StorageManager
+from motion_cam.telemetry import Telemetry
 from motion_cam.web import create_app
 
 
@@ -18,6 +33,16 @@ def _create_clip(data_dir: Path, timestamp: str, mp4_size: int = 1024) -> None:
     (date_dir / f"{timestamp}_thumb.jpg").write_bytes(b"\xff" * 256)
 
 
+def _wait_for_job(client, job_id: str, timeout: float = 5.0) -> dict:
+    """Poll the job endpoint until the job finishes."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/jobs/{job_id}").get_json()
+        if job["state"] in ("done", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
 @pytest.fixture
 def app_with_clips(tmp_path):
     """Create a Flask test app with some fixture clips."""
@@ -56,26 +81,202 @@ class TestApiClips:
         # With only 3 clips and 20 per page, page 1 has all 3
         assert len(data) <= 20
 
+    def test_cursor_pagination_walks_all_clips(self, client):
+        """Following X-Next-Cursor should visit every clip exactly once, newest first."""
+        resp = client.get("/api/clips?limit=2")
+        first = [c["timestamp"] for c in resp.get_json()]
+        assert resp.headers["X-Total-Count"] == "3"
+        cursor = resp.headers["X-Next-Cursor"]
+        assert 'rel="next"' in resp.headers["Link"]
+
+        resp = client.get(f"/api/clips?limit=2&cursor={cursor}")
+        second = [c["timestamp"] for c in resp.get_json()]
+        assert "X-Next-Cursor" not in resp.headers
+        # Every page reports the size of the whole filtered listing
+        assert resp.headers["X-Total-Count"] == "3"
+
+        assert first + second == ["20260215_140000", "20260212_120000", "20260210_100000"]
+
+    def test_since_until_filters(self, client):
+        """since/until should bound the listing by timestamp or by date."""
+        resp = client.get("/api/clips?since=2026-02-11&until=20260214_000000")
+        assert [c["timestamp"] for c in resp.get_json()] == ["20260212_120000"]
+        assert resp.headers["X-Total-Count"] == "1"
+
+    def test_sync_new_clips_with_one_small_request(self, client):
+        """An automation client should fetch only new clip timestamps since its last sync."""
+        resp = client.get("/api/clips?since=20260212_120001&fields=timestamp")
+        assert resp.get_json() == [{"timestamp": "20260215_140000"}]
+
+    def test_min_size_filter(self, tmp_path, client):
+        _create_clip(tmp_path, "20260216_090000", mp4_size=4096)
+        resp = client.get("/api/clips?min_size=2000")
+        assert [c["timestamp"] for c in resp.get_json()] == ["20260216_090000"]
+
+    def test_rejects_bad_parameters(self, client):
+        assert client.get("/api/clips?since=yesterday").status_code == 400
+        assert client.get("/api/clips?fields=timestamp,secret").status_code == 400
+        assert client.get("/api/clips?limit=0").status_code == 400
+
+    def test_rejects_malformed_numbers(self, client):
+        """A non-numeric value is an error, not a silent fallback to the default."""
+        assert client.get("/api/clips?min_size=abc").status_code == 400
+        assert client.get("/api/clips?min_size=-1").status_code == 400
+        assert client.get("/api/clips?limit=ten").status_code == 400
+        assert client.get("/api/clips?page=x").status_code == 400
+
+
+class TestApiClipsSummary:
+    def test_returns_per_day_counts_and_bytes(self, client, tmp_path):
+        """GET /api/clips/summary should report per-day counts and MP4 bytes."""
+        _create_clip(tmp_path, "20260215_150000", mp4_size=2048)
+        data = client.get("/api/clips/summary").get_json()
+
+        assert data["days"][0] == {"date": "2026-02-15", "count": 2, "bytes": 3072}
+        assert [d["date"] for d in data["days"]] == ["2026-02-15", "2026-02-12", "2026-02-10"]
+        assert data["total_count"] == 4
+        assert data["total_bytes"] == 5120
+
+
+class TestApiExport:
+    def test_zip_of_a_day(self, client):
+        """GET /api/export?date= should stream that day's clip files as a ZIP."""
+        resp = client.get("/api/export?date=2026-02-15")
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/zip"
+        assert 'filename="motion-cam-2026-02-15.zip"' in resp.headers["Content-Disposition"]
+        with zipfile.ZipFile(io.BytesIO(resp.data)) as zf:
+            assert zf.namelist() == [
+                "2026-02-15/20260215_140000.mp4",
+                "2026-02-15/20260215_140000_snap.jpg",
+                "2026-02-15/20260215_140000_thumb.jpg",
+            ]
+
+    def test_tar_of_listed_timestamps(self, client):
+        """A timestamps list should export just those clips, oldest first."""
+        resp = client.get("/api/export?timestamps=20260215_140000,20260210_100000&format=tar")
+        assert resp.status_code == 200
+        assert resp.headers["Accept-Ranges"] == "bytes"
+        assert int(resp.headers["Content-Length"]) == len(resp.data)
+        with tarfile.open(fileobj=io.BytesIO(resp.data)) as tf:
+            names = tf.getnames()
+        assert names[0] == "2026-02-10/20260210_100000.mp4"
+        assert names[3] == "2026-02-15/20260215_140000.mp4"
+
+    def test_tar_resumes_with_range(self, client):
+        """A Range request on the TAR should return exactly that slice as a 206."""
+        full = client.get("/api/export?date=2026-02-15&format=tar")
+        resp = client.get(
+            "/api/export?date=2026-02-15&format=tar",
+            headers={"Range": "bytes=700-", "If-Range": full.headers["ETag"]},
+        )
+        assert resp.status_code == 206
+        assert resp.headers["Content-Range"] == f"bytes 700-{len(full.data) - 1}/{len(full.data)}"
+        assert resp.data == full.data[700:]
+
+    def test_stale_if_range_sends_whole_archive(self, client):
+        """If the clip set changed since the first attempt, the range is ignored."""
+        resp = client.get(
+            "/api/export?date=2026-02-15&format=tar",
+            headers={"Range": "bytes=700-", "If-Range": '"stale"'},
+        )
+        assert resp.status_code == 200
+
+    def test_dated_if_range_sends_whole_archive(self, client):
+        """A date can't validate the archive, so the range is ignored."""
+        full = client.get("/api/export?date=2026-02-15&format=tar")
+        resp = client.get(
+            "/api/export?date=2026-02-15&format=tar",
+            headers={"Range": "bytes=700-", "If-Range": "Wed, 21 Oct 2037 07:28:00 GMT"},
+        )
+        assert resp.status_code == 200
+        assert resp.data == full.data
+
+    def test_unsatisfiable_range(self, client):
+        """A range past the end should be a 416."""
+        resp = client.get(
+            "/api/export?date=2026-02-15&format=tar", headers={"Range": "bytes=99999999-"}
+        )
+        assert resp.status_code == 416
+
+    def test_rejects_bad_requests(self, client):
+        """Malformed dates, timestamps or formats should be 400; an empty day 404."""
+        assert client.get("/api/export").status_code == 400
+        assert client.get("/api/export?date=15-02-2026").status_code == 400
+        assert client.get("/api/export?timestamps=../etc").status_code == 400
+        assert client.get("/api/export?date=2026-02-15&format=rar").status_code == 400
+        assert client.get("/api/export?date=2026-01-01").status_code == 404
+
 
 class TestApiDeleteAllClips:
     def test_deletes_all_clips(self, client):
-        """DELETE /api/clips should remove all clips and return count."""
-        resp = client.delete("/api/clips")
-        assert resp.status_code == 200
+        """DELETE /api/clips should queue a job that removes all clips and reports the count."""
+        resp = client.delete("/api/clips", json={"all": True})
+        assert resp.status_code == 202
         data = resp.get_json()
-        assert data["status"] == "deleted"
-        assert data["count"] == 3
+        assert data["status"] == "queued"
+
+        job = _wait_for_job(client, data["job_id"])
+        assert job["state"] == "done"
+        assert job["result"] == 3
+        assert client.get("/api/clips").get_json() == []
 
     def test_returns_zero_when_no_clips(self, tmp_path):
-        """DELETE /api/clips should return count 0 when no clips exist."""
+        """DELETE /api/clips should finish with count 0 when no clips exist."""
         storage_config = StorageConfig(data_dir=str(tmp_path))
         manager = StorageManager(storage_config)
         web_config = WebConfig()
         app = create_app(manager, web_config, data_dir=str(tmp_path))
         app.config["TESTING"] = True
-        resp = app.test_client().delete("/api/clips")
-        assert resp.status_code == 200
-        assert resp.get_json()["count"] == 0
+        client = app.test_client()
+        resp = client.delete("/api/clips", json={"all": True})
+        assert resp.status_code == 202
+        assert _wait_for_job(client, resp.get_json()["job_id"])["result"] == 0
+
+    def test_deletes_explicit_list(self, client):
+        """DELETE /api/clips with a timestamp list should only remove those clips."""
+        resp = client.delete("/api/clips", json={"timestamps": ["20260210_100000"]})
+        job = _wait_for_job(client, resp.get_json()["job_id"])
+        assert job["result"] == 1
+        timestamps = [c["timestamp"] for c in client.get("/api/clips").get_json()]
+        assert timestamps == ["20260215_140000", "20260212_120000"]
+
+    def test_deletes_date_range(self, client):
+        """DELETE /api/clips with since/until should only remove clips in range."""
+        resp = client.delete(
+            "/api/clips", json={"since": "20260211_000000", "until": "20260215_235959"}
+        )
+        job = _wait_for_job(client, resp.get_json()["job_id"])
+        assert job["result"] == 2
+        timestamps = [c["timestamp"] for c in client.get("/api/clips").get_json()]
+        assert timestamps == ["20260210_100000"]
+
+    def test_rejects_malformed_timestamps(self, client):
+        """DELETE /api/clips should return 400 for timestamps in the wrong format."""
+        resp = client.delete("/api/clips", json={"timestamps": ["../etc"]})
+        assert resp.status_code == 400
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"data": '{"since": "20260211_000000"}'},
+            {"data": "{not json", "content_type": "application/json"},
+            {"json": ["20260210_100000"]},
+            {"json": {}},
+            {"json": {"all": "yes"}},
+        ],
+        ids=["no-body", "no-content-type", "malformed", "list", "empty", "all-not-true"],
+    )
+    def test_rejects_bodies_without_explicit_scope(self, client, kwargs):
+        """Anything short of a list, a bound or {"all": true} must not wipe the archive."""
+        resp = client.delete("/api/clips", **kwargs)
+        assert resp.status_code == 400
+        assert len(client.get("/api/clips").get_json()) == 3
+
+    def test_unknown_job_returns_404(self, client):
+        """GET /api/jobs/<id> should return 404 for an unknown job."""
+        assert client.get("/api/jobs/nope").status_code == 404
 
 
 class TestApiDeleteClip:
@@ -104,6 +305,129 @@ class TestApiStatus:
         assert "disk_usage" in data
         assert "clip_count" in data
         assert data["clip_count"] == 3
+        assert "detector" not in data
+
+    def test_includes_live_detector_state(self, tmp_path):
+        """With live state attached, /api/status should report the detector snapshot."""
+        live = LiveState()
+        live.publish(state="watching", fps=14.8)
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        app = create_app(manager, WebConfig(), data_dir=str(tmp_path), live_state=live)
+
+        detector = app.test_client().get("/api/status").get_json()["detector"]
+        assert detector["state"] == "watching"
+        assert detector["fps"] == 14.8
+
+
+class TestApiEvents:
+    def test_returns_503_without_live_state(self, client):
+        """GET /api/events should return 503 when no detector is attached."""
+        assert client.get("/api/events").status_code == 503
+
+    def test_streams_current_state_and_new_clips(self, tmp_path):
+        """The feed should open with the current state, then push clip events."""
+        live = LiveState()
+        live.publish(state="recording", recording_elapsed=3)
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        app = create_app(manager, WebConfig(), data_dir=str(tmp_path), live_state=live)
+
+        resp = app.test_client().get("/api/events?interval=0.2", buffered=False)
+        stream = iter(resp.response)
+        assert next(stream).startswith(b"retry: 200")
+        state = next(stream)
+        live.push_event("clip", {"timestamp": "20260215_120000"})
+        clip = next(stream)
+        resp.close()
+
+        assert resp.mimetype == "text/event-stream"
+        assert resp.headers["Cache-Control"] == "no-cache"
+        assert state.startswith(b"event: state\n")
+        assert b'"state": "recording"' in state
+        assert clip == b'id: 1\nevent: clip\ndata: {"timestamp": "20260215_120000"}\n\n'
+
+    def test_unchanged_state_is_not_resent(self, tmp_path):
+        """Only a changed snapshot should produce another state event."""
+        live = LiveState()
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        app = create_app(manager, WebConfig(), data_dir=str(tmp_path), live_state=live)
+
+        resp = app.test_client().get("/api/events?interval=0.2", buffered=False)
+        stream = iter(resp.response)
+        next(stream)  # retry
+        next(stream)  # initial state
+        live.publish(fps=9.5)
+        update = next(stream)
+        resp.close()
+
+        assert update.startswith(b"event: state\n")
+        assert b'"fps": 9.5' in update
+
+    def test_idle_feed_sleeps_until_a_change(self, tmp_path):
+        """With nothing new, a client neither wakes per interval nor re-reads the state."""
+        live = LiveState()
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        app = create_app(manager, WebConfig(), data_dir=str(tmp_path), live_state=live)
+        reads = []
+        snapshot = live.snapshot
+        live.snapshot = lambda: reads.append(1) or snapshot()
+
+        resp = app.test_client().get("/api/events?interval=0.2", buffered=False)
+        stream = iter(resp.response)
+        next(stream)  # retry
+        next(stream)  # initial state
+        received = []
+        reader = threading.Thread(target=lambda: received.append(next(stream)))
+        reader.start()
+        time.sleep(1.0)
+        idle_reads = len(reads)
+        live.push_event("clip", {"timestamp": "20260215_120000"})
+        reader.join(timeout=5)
+        resp.close()
+
+        # One read for the initial state and one after the rate-limit pause, then nothing
+        assert idle_reads <= 2
+        assert received and b"event: clip" in received[0]
+
+
+class TestStreamLimit:
+    """Tuner streams and event feeds share WebConfig.stream_limit slots."""
+
+    def _app(self, tmp_path, **web):
+        camera = MagicMock()
+        camera.capture_jpeg_frame.return_value = b"\xff\xd8jpeg\xff\xd9"
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        return create_app(
+            manager, WebConfig(**web), data_dir=str(tmp_path), camera=camera, live_state=LiveState()
+        )
+
+    def test_streams_beyond_the_limit_get_503(self, tmp_path):
+        """A stream over the limit is turned away instead of taking another worker."""
+        client = self._app(tmp_path, threads=4, max_streams=1).test_client()
+        first = client.get("/tuner/stream?profile=low", buffered=False)
+        try:
+            assert first.status_code == 200
+            refused = client.get("/api/events", buffered=False)
+            assert refused.status_code == 503
+            assert refused.headers["Retry-After"] == "5"
+        finally:
+            first.close()
+
+    def test_slot_is_released_when_the_stream_closes(self, tmp_path):
+        client = self._app(tmp_path, threads=4, max_streams=1).test_client()
+        client.get("/api/events", buffered=False).close()
+        again = client.get("/api/events", buffered=False)
+        assert again.status_code == 200
+        again.close()
+
+    def test_limit_leaves_a_worker_free(self, tmp_path):
+        """max_streams at or above threads still keeps one worker for other requests."""
+        assert WebConfig(threads=2, max_streams=4).stream_limit == 1
+        client = self._app(tmp_path, threads=2, max_streams=4).test_client()
+        first = client.get("/api/events", buffered=False)
+        try:
+            assert client.get("/api/events", buffered=False).status_code == 503
+        finally:
+            first.close()
 
 
 class TestGalleryPage:
@@ -111,6 +435,30 @@ class TestGalleryPage:
         """GET / should return an HTML page."""
         resp = client.get("/")
         assert resp.status_code == 200
+
+    def test_gallery_is_compressed_when_accepted(self, client):
+        """The gallery HTML should be gzipped for clients that accept it."""
+        resp = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert b"Motion Cam" in gzip.decompress(resp.data)
+
+    def test_falls_back_to_thumbnails_without_sprites(self, client):
+        """Clips that are not in a sprite sheet should use their own thumbnail."""
+        resp = client.get("/")
+        assert b'src="/media/2026-02-15/20260215_140000_thumb.jpg"' in resp.data
+
+    def test_renders_from_sprite_sheet(self, tmp_path):
+        """Clips in a sprite sheet should be drawn from it, versioned for caching."""
+        _create_clip(tmp_path, "20260215_140000")
+        thumb = tmp_path / "2026-02-15" / "20260215_140000_thumb.jpg"
+        cv2.imwrite(str(thumb), np.zeros((360, 640, 3), dtype=np.uint8))
+        sprites.add_clip(str(tmp_path), "20260215_140000")
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        app = create_app(manager, WebConfig(), data_dir=str(tmp_path))
+
+        resp = app.test_client().get("/")
+        assert b"url('/media/2026-02-15/sprites/sheet-0.jpg?v=1')" in resp.data
+        assert b"_thumb.jpg" not in resp.data
         assert b"<html" in resp.data.lower() or b"<!doctype" in resp.data.lower()
 
 
@@ -125,6 +473,14 @@ class TestClipDetailPage:
         resp = client.get("/clip/99990101_000000")
         assert resp.status_code == 404
 
+    def test_scrub_preview_only_when_track_exists(self, client, tmp_path):
+        """The hover preview should be wired up once the clip's track has been generated."""
+        assert b"scrub_frame" not in client.get("/clip/20260215_140000").data
+
+        (tmp_path / "2026-02-15" / "20260215_140000_scrub.vtt").write_text("WEBVTT\n")
+        resp = client.get("/clip/20260215_140000")
+        assert b"'/media/2026-02-15/20260215_140000_scrub.vtt'" in resp.data
+
 
 class TestMediaServing:
     def test_serves_mp4_from_data_directory(self, client):
@@ -132,6 +488,101 @@ class TestMediaServing:
         resp = client.get("/media/2026-02-15/20260215_140000.mp4")
         assert resp.status_code == 200
 
+    def test_sets_immutable_cache_headers_and_strong_etag(self, client, tmp_path):
+        """Media responses should be cacheable forever with an inode/size/mtime ETag."""
+        resp = client.get("/media/2026-02-15/20260215_140000_thumb.jpg")
+        st = (tmp_path / "2026-02-15" / "20260215_140000_thumb.jpg").stat()
+
+        assert resp.cache_control.max_age == 365 * 24 * 3600
+        assert resp.cache_control.immutable
+        assert resp.cache_control.public
+        etag, weak = resp.get_etag()
+        assert not weak
+        assert etag == f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+
+    def test_returns_304_for_matching_etag(self, client):
+        """A conditional request with the current ETag should get an empty 304."""
+        url = "/media/2026-02-15/20260215_140000.mp4"
+        etag = client.get(url).headers["ETag"]
+
+        resp = client.get(url, headers={"If-None-Match": etag})
+
+        assert resp.status_code == 304
+        assert resp.data == b""
+
+    def test_etag_changes_when_file_is_replaced(self, client, tmp_path):
+        """Replacing a file should invalidate the old ETag."""
+        url = "/media/2026-02-15/20260215_140000_thumb.jpg"
+        etag = client.get(url).headers["ETag"]
+        thumb = tmp_path / "2026-02-15" / "20260215_140000_thumb.jpg"
+        replacement = thumb.with_name("new.jpg")
+        replacement.write_bytes(b"\xff" * 300)
+        replacement.replace(thumb)
+
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_serves_byte_ranges(self, client):
+        """Range requests should return only the requested bytes for video seeking."""
+        resp = client.get(
+            "/media/2026-02-15/20260215_140000.mp4", headers={"Range": "bytes=100-199"}
+        )
+        assert resp.status_code == 206
+        assert resp.headers["Content-Range"] == "bytes 100-199/1024"
+        assert resp.headers["Accept-Ranges"] == "bytes"
+        assert len(resp.data) == 100
+
+    def test_rejects_unsatisfiable_range(self, client):
+        resp = client.get(
+            "/media/2026-02-15/20260215_140000.mp4", headers={"Range": "bytes=5000-6000"}
+        )
+        assert resp.status_code == 416
+
+    def test_repeat_gallery_load_transfers_no_media_bytes(self, client):
+        """Revalidating every thumbnail on a second page load should cost zero body bytes."""
+        html = client.get("/").data.decode()
+        urls = re.findall(r'src="(/media/[^"]+)"', html)
+        assert urls
+        etags = {url: client.get(url).headers["ETag"] for url in urls}
+
+        transferred = 0
+        for url in urls:
+            resp = client.get(url, headers={"If-None-Match": etags[url]})
+            assert resp.status_code == 304
+            transferred += len(resp.data)
+        assert transferred == 0
+
+    def test_rejects_path_traversal(self, client):
+        assert client.get("/media/../etc/passwd").status_code == 404
+
+    def test_missing_file_returns_404(self, client):
+        assert client.get("/media/2026-02-15/missing.mp4").status_code == 404
+
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "2026-02-15/20260216_090000.mp4.partial",
+            ".clips.json",
+            ".background.npy",
+            "2026-02-15/.hidden.jpg",
+            "2026-02-15/20260215_140000_scrub.jpg.tmp.jpg",
+            "2026-02-15/sprites/index.json",
+        ],
+        ids=["partial", "manifest", "background", "dotfile", "temp-mosaic", "sprite-map"],
+    )
+    def test_unpublished_files_return_404(self, client, tmp_path, name):
+        """In-flight and internal files exist on disk but must never be served or cached."""
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\x00" * 64)
+        assert client.get(f"/media/{name}").status_code == 404
+
+    def test_serves_sprite_sheets_and_scrub_tracks(self, client, tmp_path):
+        for name in ("2026-02-15/sprites/sheet-0.jpg", "2026-02-15/20260215_140000_scrub.vtt"):
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"\x00" * 64)
+            assert client.get(f"/media/{name}").status_code == 200
+
 
 class TestTunerPage:
     def test_tuner_returns_html(self, client):
@@ -140,11 +591,36 @@ class TestTunerPage:
         assert resp.status_code == 200
         assert b"Camera Tuner" in resp.data
 
+    def test_tuner_page_selects_preview_profile(self, client):
+        """GET /tuner?profile= should point the stream at the chosen profile."""
+        resp = client.get("/tuner?profile=low")
+        assert b'src="/tuner/stream?profile=low"' in resp.data
+
+    def test_tuner_rejects_unknown_profile(self, client):
+        """An unknown preview profile should be a 400."""
+        assert client.get("/tuner?profile=ultra").status_code == 400
+
     def test_tuner_stream_returns_503_without_camera(self, client):
         """GET /tuner/stream should return 503 when no camera is available."""
         resp = client.get("/tuner/stream")
         assert resp.status_code == 503
 
+    def test_tuner_stream_serves_mjpeg_from_shared_broadcaster(self, tmp_path):
+        """GET /tuner/stream should stream multipart JPEG frames from the camera."""
+        camera = MagicMock()
+        camera.capture_jpeg_frame.return_value = b"\xff\xd8jpeg\xff\xd9"
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        app = create_app(manager, WebConfig(), data_dir=str(tmp_path), camera=camera)
+
+        resp = app.test_client().get("/tuner/stream?profile=low", buffered=False)
+        chunk = next(resp.response)
+        resp.close()
+
+        camera.capture_jpeg_frame.assert_called_with(PREVIEW_PROFILES["low"])
+        assert resp.mimetype == "multipart/x-mixed-replace"
+        assert chunk.startswith(b"--frame\r\nContent-Type: image/jpeg")
+        assert b"jpeg" in chunk
+
     def test_tuner_control_returns_503_without_camera(self, client):
         """POST /api/tuner/control should return 503 when no camera."""
         resp = client.post(
@@ -153,6 +629,23 @@ class TestTunerPage:
         )
         assert resp.status_code == 503
 
+    def test_tuner_control_is_queued_and_applied_off_thread(self, tmp_path):
+        """POST /api/tuner/control should return the queued state and write controls later."""
+        camera = MagicMock()
+        manager = StorageManager(StorageConfig(data_dir=str(tmp_path)))
+        app = create_app(manager, WebConfig(), data_dir=str(tmp_path), camera=camera)
+        client = app.test_client()
+
+        resp = client.post("/api/tuner/control", json={"brightness": 0.5, "contrast": 2.0})
+        data = resp.get_json()
+        assert data["status"] == "queued"
+        assert sorted(data["queued"]) == ["brightness", "contrast"]
+
+        deadline = time.monotonic() + 5
+        while not camera.set_controls.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        camera.set_controls.assert_called_once_with({"Brightness": 0.5, "Contrast": 2.0})
+
     def test_tuner_af_mode_returns_503_without_camera(self, client):
         """POST /api/tuner/af_mode should return 503 when no camera."""
         resp = client.post(
@@ -165,3 +658,203 @@ class TestTunerPage:
         """POST /api/tuner/trigger_af should return 503 when no camera."""
         resp = client.post("/api/tuner/trigger_af")
         assert resp.status_code == 503
+
+
+class TestMetrics:
+    def test_metrics_404_when_disabled(self, client):
+        """Without a registry the endpoint does not exist."""
+        assert client.get("/metrics").status_code == 404
+
+    def test_metrics_exposes_request_timings(self, tmp_path):
+        """Handled requests show up as histograms labelled by endpoint and method."""
+        _create_clip(tmp_path, "20260215_140000")
+        registry = Registry()
+        app = create_app(
+            StorageManager(StorageConfig(data_dir=str(tmp_path))),
+            WebConfig(),
+            data_dir=str(tmp_path),
+            metrics=registry,
+        )
+        client = app.test_client()
+        client.get("/")
+        client.get("/api/clips")
+        client.get("/api/clips")
+
+        resp = client.get("/metrics")
+
+        assert resp.status_code == 200
+        assert resp.content_type.startswith("text/plain; version=0.0.4")
+        text = resp.get_data(as_text=True)
+        assert "# TYPE motion_cam_http_request_seconds histogram" in text
+        assert 'motion_cam_http_request_seconds_count{endpoint="gallery",method="GET"} 1' in text
+        assert 'motion_cam_http_request_seconds_count{endpoint="api_clips",method="GET"} 2' in text
+
+
+class TestDebugProfile:
+    @pytest.fixture
+    def profiled_client(self, tmp_path):
+        app = create_app(
+            StorageManager(StorageConfig(data_dir=str(tmp_path))),
+            WebConfig(),
+            data_dir=str(tmp_path),
+            profile_token="s3cret",
+        )
+        return app.test_client()
+
+    def test_404_without_configured_token(self, client):
+        """The endpoint does not exist unless PROFILE_TOKEN is set."""
+        assert client.get("/debug/profile?seconds=0.1").status_code == 404
+
+    def test_403_with_wrong_or_missing_token(self, profiled_client):
+        """Only requests bearing the configured token may profile."""
+        assert profiled_client.get("/debug/profile?seconds=0.1").status_code == 403
+        resp = profiled_client.get(
+            "/debug/profile?seconds=0.1", headers={"Authorization": "Bearer nope"}
+        )
+        assert resp.status_code == 403
+
+    def test_token_in_query_string_is_refused(self, profiled_client):
+        """The secret must not travel in the URL, where logs and Referer headers keep it."""
+        assert profiled_client.get("/debug/profile?seconds=0.1&token=s3cret").status_code == 403
+
+    def test_400_for_out_of_range_duration(self, profiled_client):
+        """Captures are bounded so a typo cannot tie up a worker for long."""
+        resp = profiled_client.get(
+            "/debug/profile?seconds=600", headers={"Authorization": "Bearer s3cret"}
+        )
+        assert resp.status_code == 400
+
+    def test_returns_collapsed_stacks(self, profiled_client):
+        """A capture returns 'stack count' lines covering the process's threads."""
+        stop = threading.Event()
+        worker = threading.Thread(target=stop.wait, name="idle-worker")
+        worker.start()
+        try:
+            resp = profiled_client.get(
+                "/debug/profile?seconds=0.2&hz=100", headers={"Authorization": "Bearer s3cret"}
+            )
+        finally:
+            stop.set()
+            worker.join()
+
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/plain"
+        assert int(resp.headers["X-Profile-Samples"]) >= 5
+        lines = resp.get_data(as_text=True).splitlines()
+        assert any(line.startswith("idle-worker;") for line in lines)
+        assert all(re.match(r"^\S+ \d+$", line) for line in lines)
+
+    def test_409_while_a_capture_is_running(self, profiled_client):
+        """Concurrent captures are refused rather than queued."""
+        auth = {"Authorization": "Bearer s3cret"}
+        first = threading.Thread(
+            target=profiled_client.get, args=("/debug/profile?seconds=0.5",), kwargs={"headers": auth}
+        )
+        first.start()
+        time.sleep(0.1)
+        try:
+            resp = profiled_client.get("/debug/profile?seconds=0.1", headers=auth)
+        finally:
+            first.join()
+        assert resp.status_code == 409
+
+
+class TestTelemetry:
+    @pytest.fixture
+    def telemetry_client(self, tmp_path):
+        telemetry = Telemetry(str(tmp_path), detector=lambda: {"fps": 9.5})
+        telemetry.sample(now=0.0)
+        telemetry.sample(now=1.0)
+        app = create_app(
+            StorageManager(StorageConfig(data_dir=str(tmp_path))),
+            WebConfig(),
+            data_dir=str(tmp_path),
+            telemetry=telemetry,
+        )
+        return app.test_client()
+
+    def test_404_when_disabled(self, client):
+        """Without a sampler there is no history endpoint and no charts."""
+        assert client.get("/api/telemetry").status_code == 404
+        assert b'id="charts"' not in client.get("/status").data
+
+    def test_history_json(self, telemetry_client):
+        """History is compact JSON with one list of points per series."""
+        resp = telemetry_client.get("/api/telemetry?hours=1&points=60")
+        assert resp.status_code == 200
+        assert b", " not in resp.data
+        data = resp.get_json()
+        assert data["step"] == 60
+        assert len(data["series"]["fps"]) == 60
+        assert data["series"]["fps"][-1] == 9.5
+
+    def test_rejects_out_of_range_window(self, telemetry_client):
+        """Only up to 24 hours of history is kept."""
+        assert telemetry_client.get("/api/telemetry?hours=48").status_code == 400
+        assert telemetry_client.get("/api/telemetry?points=0").status_code == 400
+
+    def test_status_page_has_charts(self, telemetry_client):
+        """The status page includes the resource charts when telemetry is on."""
+        html = telemetry_client.get("/status").get_data(as_text=True)
+        assert 'id="charts"' in html
+        assert "/api/telemetry?hours=" in html
+
+
+class TestSettings:
+    @pytest.fixture
+    def settings(self):
+        return DetectionSettings(DetectionConfig())
+
+    @pytest.fixture
+    def settings_client(self, tmp_path, settings):
+        app = create_app(
+            StorageManager(StorageConfig(data_dir=str(tmp_path))),
+            WebConfig(),
+            data_dir=str(tmp_path),
+            settings=settings,
+        )
+        return app.test_client()
+
+    def test_404_when_not_wired(self, client):
+        """Apps created without live settings have no settings page or API."""
+        assert client.get("/settings").status_code == 404
+        assert client.get("/api/settings").status_code == 404
+
+    def test_get_returns_current_values(self, settings_client):
+        data = settings_client.get("/api/settings").get_json()
+        assert data["detection"]["min_contour_area"] == 500
+        assert data["detection"]["blur_kernel_size"] == 21
+
+    def test_post_queues_change_for_next_frame(self, settings_client, settings):
+        """A valid update is returned and waits for the detection loop to pick it up."""
+        resp = settings_client.post("/api/settings", json={"min_contour_area": 250, "cooldown": 8})
+        assert resp.status_code == 200
+        assert resp.get_json()["detection"]["min_contour_area"] == 250
+        pending = settings.take_pending()
+        assert (pending.min_contour_area, pending.cooldown) == (250, 8)
+        assert pending.blur_kernel_size == 21
+
+    def test_invalid_values_are_400_and_change_nothing(self, settings_client, settings):
+        """Validation errors come back as a message; the running settings are untouched."""
+        for body in ({"blur_kernel_size": 20}, {"min_contour_area": "big"}, {"gain": 2}, [1, 2]):
+            resp = settings_client.post("/api/settings", json=body)
+            assert resp.status_code == 400
+            assert resp.get_json()["error"]
+        assert settings.current == DetectionConfig()
+        assert settings.take_pending() is None
+
+    @pytest.mark.parametrize(
+        "body",
+        ['{"learning_rate": NaN}', '{"learning_rate": -Infinity}', '{"min_contour_area": 1e400}'],
+    )
+    def test_non_finite_numbers_are_400(self, settings_client, settings, body):
+        """Python's JSON parser accepts these; they must not reach the detector or the reply."""
+        resp = settings_client.post("/api/settings", data=body, content_type="application/json")
+        assert resp.status_code == 400
+        assert "finite" in resp.get_json()["error"]
+        assert settings.current == DetectionConfig()
+
+    def test_settings_page_shows_values(self, settings_client):
+        html = settings_client.get("/settings").get_data(as_text=True)
+        assert 'name="blur_kernel_size"' in html
+        assert 'value="21"' in html